@@ -1,25 +1,135 @@
-import re
+import ipaddress
+from collections import defaultdict
+from dataclasses import dataclass, field
 from typing import Any
 
 from infrahub_sdk.checks import InfrahubCheck
 
-IS_SLASH_32 = re.compile(r".*\/32$")
+from ..helpers.query_cache import QUERY_AT, query_cache, repository_commit
+
+LOOPBACK_PAGE_SIZE = 1000
+
+
+@dataclass
+class Loopback:
+    device: str
+    interface: str
+    address: str
+
+
+@dataclass
+class LoopbackIndex:
+    """
+    Index of the loopback addresses of the fleet by IP address, regardless of prefix length,
+    so that an address configured on several devices or interfaces is found in one pass.
+    """
+
+    addresses: dict[ipaddress.IPv4Address | ipaddress.IPv6Address, list[Loopback]] = field(
+        default_factory=lambda: defaultdict(list)
+    )
+
+    def add(self, ip: ipaddress.IPv4Interface | ipaddress.IPv6Interface, loopback: Loopback) -> None:
+        self.addresses[ip.ip].append(loopback)
+
+    def duplicates(self) -> dict[ipaddress.IPv4Address | ipaddress.IPv6Address, list[Loopback]]:
+        return {address: loopbacks for address, loopbacks in self.addresses.items() if len(loopbacks) > 1}
+
+
+def parse_loopback(
+    check: InfrahubCheck, loopback: Loopback
+) -> ipaddress.IPv4Interface | ipaddress.IPv6Interface | None:
+    """Parses the address of a loopback, logging an error on `check` unless it is a valid host prefix."""
+    try:
+        ip = ipaddress.ip_interface(loopback.address)
+    except ValueError:
+        check.log_error(
+            message=f"Loopback IP {loopback.address} on device {loopback.device} is not a valid IP address",
+            object_id=loopback.address,
+            object_type="InfraInterfaceL3",
+        )
+        return None
+
+    if ip.network.prefixlen != ip.max_prefixlen:
+        check.log_error(
+            message=f"Loopback IP {loopback.address} on device {loopback.device} must be a /{ip.max_prefixlen}",
+            object_id=loopback.address,
+            object_type="InfraInterfaceL3",
+        )
+    return ip
 
 
 class LoopbackCheck(InfrahubCheck):
     query: str = "device_loopback_query"
+    at: str | None = QUERY_AT
+
+    async def collect_data(self) -> dict[str, Any]:
+        return await query_cache.query(
+            client=self.client,
+            name=self.query,
+            branch_name=self.branch_name,
+            variables=self.params,
+            revision=repository_commit(self.root_directory),
+            at=self.at,
+        )
 
     def validate(self, data: dict[str, Any]):
         device = data["InfraDevice"]["edges"][0]
+        device_name = device["node"]["name"]["value"]
 
         for interface in device["node"]["interfaces"]["edges"]:
             for ip in interface["node"]["ip_addresses"]["edges"]:
                 value = ip["node"]["address"].get("value")
-                device = device["node"]["name"]["value"]
-
-                if value and not IS_SLASH_32.match(value):
-                    self.log_error(
-                        message=f"Loopback IP {value} on device {device} must be a /32: {value}",
-                        object_id=value,
-                        object_type="InfraInterfaceL3",
-                    )
+                if value:
+                    parse_loopback(self, Loopback(device=device_name, interface="", address=value))
+
+
+class LoopbackFleetCheck(InfrahubCheck):
+    """
+    Validates the loopbacks of every device at once: the loopback interfaces of the whole fleet
+    are fetched with `loopback_query`, one page at a time, instead of one query per device. Each
+    address is parsed once, and an address used more than once across the fleet, such as a
+    duplicate router ID, is reported.
+    """
+
+    query: str = "loopback_query"
+    page_size: int = LOOPBACK_PAGE_SIZE
+    at: str | None = QUERY_AT
+
+    async def collect_data(self) -> dict[str, Any]:
+        edges: list[dict[str, Any]] = []
+        while True:
+            data = await query_cache.query(
+                client=self.client,
+                name=self.query,
+                branch_name=self.branch_name,
+                variables={**self.params, "offset": len(edges), "limit": self.page_size},
+                revision=repository_commit(self.root_directory),
+                at=self.at,
+            )
+            page = (data.get("data") or data)["InfraInterfaceL3"]
+            edges.extend(page["edges"])
+            if not page["edges"] or len(edges) >= page["count"]:
+                return {"InfraInterfaceL3": {"count": page["count"], "edges": edges}}
+
+    def validate(self, data: dict[str, Any]):
+        index = LoopbackIndex()
+
+        for interface in data["InfraInterfaceL3"]["edges"]:
+            device = interface["node"]["device"]["node"]["name"]["value"]
+            name = interface["node"]["name"]["value"]
+            for ip in interface["node"]["ip_addresses"]["edges"]:
+                value = ip["node"]["address"].get("value")
+                if not value:
+                    continue
+                loopback = Loopback(device=device, interface=name, address=value)
+                parsed = parse_loopback(self, loopback)
+                if parsed is not None:
+                    index.add(parsed, loopback)
+
+        for address, loopbacks in index.duplicates().items():
+            users = ", ".join(f"{loopback.device} {loopback.interface}" for loopback in loopbacks)
+            self.log_error(
+                message=f"Loopback IP {address} is configured more than once: {users}",
+                object_id=str(address),
+                object_type="InfraInterfaceL3",
+            )
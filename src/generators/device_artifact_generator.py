@@ -1,12 +1,38 @@
+import os
 from typing import Any
 
-from infrahub_sdk import InfrahubClientSync
 from infrahub_sdk.generator import InfrahubGenerator
 
+from ..helpers.artifacts import get_coalescer
+from ..helpers.query_cache import QUERY_AT, query_cache, repository_commit
+
+ARTIFACT_NAME = "Device config YAML"
+
+# Seconds to wait for further interface changes on the same device before regenerating its artifact.
+# Every regeneration waits this long, even for a single change, so keep it short.
+COALESCE_WINDOW = float(os.getenv("DEVICE_ARTIFACT_COALESCE_WINDOW", "0.1"))
+
 
 class DeviceArtifactGenerator(InfrahubGenerator):
+    coalesce_window: float = COALESCE_WINDOW
+    at: str | None = QUERY_AT
+
+    async def collect_data(self) -> dict[str, Any]:
+        # Always fetched, as the query registers the generator's group membership, then shared with the other callers.
+        data = await query_cache.query(
+            client=self._init_client,
+            name=self.query,
+            branch_name=self.branch_name,
+            variables=self.params,
+            revision=repository_commit(self.root_directory),
+            at=self.at,
+            shared=False,
+            update_group=True,
+            subscribers=self.subscribers,
+        )
+        return data.get("data") or data
+
     async def generate(self, data: dict[str, Any]) -> None:
         device_name = data["InfraInterfaceL3"]["edges"][0]["node"]["device"]["node"]["name"]["value"]
-        client = InfrahubClientSync()
-        device = client.get(kind="InfraDevice", name__value=device_name)
-        device.artifact_generate(name="Device config YAML")
+        coalescer = get_coalescer(artifact_name=ARTIFACT_NAME, window=self.coalesce_window)
+        await coalescer.request(client=self.client, device_name=device_name)
@@ -1,13 +1,66 @@
+import os
 from typing import Any
 
 from infrahub_sdk.generator import InfrahubGenerator
+from infrahub_sdk.node import InfrahubNode
+
+from ..helpers.batch import SaveResult, describe, save_all
+from ..helpers.query_cache import QUERY_AT, query_cache, repository_commit
+
+# Maximum number of objects saved at the same time.
+GENERATOR_CONCURRENCY = int(os.getenv("DEVICE_GENERATOR_CONCURRENCY", "10"))
+
+# Number of times an object is saved again after a write conflict.
+GENERATOR_RETRIES = int(os.getenv("DEVICE_GENERATOR_RETRIES", "3"))
 
 
 class DeviceGenerator(InfrahubGenerator):
+    """
+    Creates the core device of every site in the query response: one site with `sites_query`,
+    every site at once with `all_sites_query`. The devices of all the sites are collected first,
+    then saved concurrently.
+    """
+
+    concurrency: int = GENERATOR_CONCURRENCY
+    retries: int = GENERATOR_RETRIES
+    retry_backoff: float = 0.5
+    at: str | None = QUERY_AT
+
+    async def collect_data(self) -> dict[str, Any]:
+        # Always fetched, as the query registers the generator's group membership, then shared with the other callers.
+        data = await query_cache.query(
+            client=self._init_client,
+            name=self.query,
+            branch_name=self.branch_name,
+            variables=self.params,
+            revision=repository_commit(self.root_directory),
+            at=self.at,
+            shared=False,
+            update_group=True,
+            subscribers=self.subscribers,
+        )
+        return data.get("data") or data
+
     async def generate(self, data: dict[str, Any]) -> None:
-        site = data["LocationSite"]["edges"][0]["node"]
+        nodes = [await self.core_device(site["node"]) for site in data["LocationSite"]["edges"]]
+        self.results: list[SaveResult] = await save_all(
+            nodes, concurrency=self.concurrency, retries=self.retries, backoff=self.retry_backoff
+        )
+
+        failures = [result for result in self.results if not result.ok]
+        for result in self.results:
+            if result.ok:
+                self.logger.info("Saved %s in %d attempt(s)", describe(result.node), result.attempts)
+            else:
+                self.logger.error("Failed to save %s: %s", describe(result.node), result.error)
+        if failures:
+            raise RuntimeError(
+                f"{len(failures)} of {len(self.results)} objects could not be saved: "
+                + ", ".join(describe(result.node) for result in failures)
+            )
 
-        device_obj = await self.client.create(
+    async def core_device(self, site: dict[str, Any]) -> InfrahubNode:
+        return await self.client.create(
             kind="InfraDevice",
             name=f"{site['name']['value']}-core5",
             description=f"Core router in {site['city']['value']}",
@@ -16,4 +69,3 @@ class DeviceGenerator(InfrahubGenerator):
             type="MX204",
             site=site["name"]["value"],
         )
-        await device_obj.save(allow_upsert=True)
@@ -0,0 +1,97 @@
+import asyncio
+import weakref
+from dataclasses import dataclass
+from typing import Any
+
+from infrahub_sdk import InfrahubClient
+
+
+@dataclass
+class PendingRequest:
+    future: asyncio.Future
+    waiters: int = 0
+
+
+class ArtifactRequestCoalescer:
+    """
+    Coalesces artifact regeneration requests for the same device.
+
+    The first request opens a window of `window` seconds; every device requested during the window
+    is regenerated once, with one query for all the devices and the `artifact_generate` calls sent
+    as a single batch. Each caller waits until its device has been regenerated, and a device whose
+    callers were all cancelled before the flush is left out.
+
+    The devices are fetched and regenerated with a clone of the first caller's client: the clients
+    of generators track the nodes they touch in the group of their generator, which must not pick
+    up the devices of the other callers.
+
+    A coalescer belongs to one event loop, as its futures and flush task do: `get_coalescer` returns
+    one per running loop, so only the requests of generators run in the same loop are coalesced.
+    """
+
+    def __init__(self, artifact_name: str, window: float) -> None:
+        self.artifact_name: str = artifact_name
+        self.window: float = window
+        self._pending: dict[str, PendingRequest] = {}
+        self._flush: asyncio.Task | None = None
+
+    async def request(self, client: InfrahubClient, device_name: str) -> None:
+        pending = self._pending.get(device_name)
+        if pending is None:
+            pending = PendingRequest(future=asyncio.get_running_loop().create_future())
+            self._pending[device_name] = pending
+        if self._flush is None:
+            self._flush = asyncio.create_task(self._flush_after_window(client.clone()))
+
+        pending.waiters += 1
+        try:
+            await asyncio.shield(pending.future)
+        except asyncio.CancelledError:
+            pending.waiters -= 1
+            if not pending.waiters:
+                pending.future.cancel()
+            raise
+
+    async def _flush_after_window(self, client: InfrahubClient) -> None:
+        await asyncio.sleep(self.window)
+        requests, self._pending, self._flush = self._pending, {}, None
+        pending = {
+            device_name: request.future for device_name, request in requests.items() if not request.future.done()
+        }
+        if not pending:
+            return
+
+        try:
+            devices = await client.filters(kind="InfraDevice", name__values=list(pending))
+            batch = await client.create_batch(return_exceptions=True)
+            for device in devices:
+                batch.add(task=device.artifact_generate, node=device, name=self.artifact_name)
+
+            async for device, result in batch.execute():
+                future = pending.pop(device.name.value)
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(None)
+        except Exception as exc:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for device_name, future in pending.items():
+            if not future.done():
+                future.set_exception(ValueError(f"Device {device_name} not found"))
+
+
+_coalescers: weakref.WeakKeyDictionary[Any, dict[str, ArtifactRequestCoalescer]] = weakref.WeakKeyDictionary()
+
+
+def get_coalescer(artifact_name: str, window: float) -> ArtifactRequestCoalescer:
+    """Returns the coalescer shared by every request for `artifact_name` in the running event loop."""
+    coalescers = _coalescers.setdefault(asyncio.get_running_loop(), {})
+    if artifact_name not in coalescers:
+        coalescers[artifact_name] = ArtifactRequestCoalescer(artifact_name=artifact_name, window=window)
+    return coalescers[artifact_name]
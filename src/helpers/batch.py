@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from infrahub_sdk.batch import InfrahubBatch
+from infrahub_sdk.exceptions import GraphQLError, ServerNotResponsiveError
+from infrahub_sdk.node import InfrahubNode
+
+log = logging.getLogger(__name__)
+
+# Fragments of the GraphQL error messages returned when concurrent upserts of the same object collide.
+CONFLICT_MARKERS = ("conflict", "already exist", "lock")
+
+
+@dataclass
+class SaveResult:
+    node: InfrahubNode
+    attempts: int
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def is_conflict(exc: Exception) -> bool:
+    """Returns True for errors worth retrying: write conflicts between concurrent upserts and timeouts."""
+    if isinstance(exc, ServerNotResponsiveError):
+        return True
+    if isinstance(exc, GraphQLError):
+        return any(
+            marker in str(error.get("message", "")).lower() for error in exc.errors for marker in CONFLICT_MARKERS
+        )
+    return False
+
+
+async def save_with_retry(node: InfrahubNode, retries: int, backoff: float) -> SaveResult:
+    """Upserts `node`, retrying up to `retries` times with exponential backoff when it conflicts."""
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            await node.save(allow_upsert=True)
+        except Exception as exc:
+            if attempt > retries or not is_conflict(exc):
+                return SaveResult(node=node, attempts=attempt, error=exc)
+            log.debug("Retrying %s after conflict: %s", node, exc)
+            await asyncio.sleep(backoff * 2 ** (attempt - 1))
+            continue
+        return SaveResult(node=node, attempts=attempt)
+
+
+async def save_all(
+    nodes: list[InfrahubNode], concurrency: int, retries: int = 3, backoff: float = 0.5
+) -> list[SaveResult]:
+    """
+    Upserts `nodes` concurrently through an SDK batch, at most `concurrency` at a time, and returns
+    the result of each one. A failed node does not stop the others.
+    """
+    batch = InfrahubBatch(max_concurrent_execution=concurrency, return_exceptions=True)
+    for node in nodes:
+        batch.add(node, task=save_with_retry, node=node, retries=retries, backoff=backoff)
+
+    results: list[SaveResult] = []
+    async for node, result in batch.execute():
+        results.append(result if isinstance(result, SaveResult) else SaveResult(node=node, attempts=1, error=result))
+    return results
+
+
+def describe(node: InfrahubNode) -> str:
+    name: Any = getattr(node, "name", None)
+    return f"{node.get_kind()} {getattr(name, 'value', node.id)}"
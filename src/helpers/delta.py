@@ -0,0 +1,121 @@
+from typing import Any
+
+from .merge import LIST_MERGE_KEYS, find_id_key
+
+# A path from the root of a config tree: mapping keys, and `{id key: id}` for the items of identified lists.
+Path = list[str | dict[str, Any]]
+
+
+def list_id_key(
+    old: list[Any], new: list[Any], path: tuple[str, ...], list_keys: dict[tuple, str | None]
+) -> str | None:
+    """
+    Returns the identity key of the list at `path`, the same one merging uses, if every item of both
+    lists is a dict with a distinct value for it. Lists without one are compared as a whole.
+    """
+    id_key = list_keys[path] if path in list_keys else find_id_key(new) or find_id_key(old)
+    if id_key is None:
+        return None
+
+    for items in (old, new):
+        ids = [item.get(id_key) if isinstance(item, dict) else None for item in items]
+        if None in ids or len(set(ids)) != len(ids):
+            return None
+    return id_key
+
+
+def diff_trees(old: Any, new: Any, list_keys: dict[tuple, str | None] | None = None) -> list[dict[str, Any]]:
+    """
+    Returns the changes turning the config tree `old` into `new`, as a list of operations:
+
+        {"op": "add", "path": [...], "value": ...}
+        {"op": "replace", "path": [...], "value": ...}
+        {"op": "remove", "path": [...]}
+
+    Mappings are compared key by key. Items of the lists merging identifies by key, such as
+    interfaces by `name` or BGP neighbors by `peer-address`, are compared by that key and addressed
+    as `{"name": "ethernet-1/1"}` in paths; their order is not compared. Other lists, and values
+    whose type changed, are replaced as a whole.
+    """
+    operations: list[dict[str, Any]] = []
+    _diff(old, new, [], (), LIST_MERGE_KEYS if list_keys is None else list_keys, operations)
+    return operations
+
+
+def _diff(
+    old: Any, new: Any, path: Path, key_path: tuple[str, ...], list_keys: dict, operations: list[dict[str, Any]]
+) -> None:
+    if old is new:
+        return
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, new_value in new.items():
+            if key in old:
+                _diff(old[key], new_value, [*path, key], (*key_path, key), list_keys, operations)
+            else:
+                operations.append({"op": "add", "path": [*path, key], "value": new_value})
+        for key in old:
+            if key not in new:
+                operations.append({"op": "remove", "path": [*path, key]})
+        return
+
+    if isinstance(old, list) and isinstance(new, list):
+        id_key = list_id_key(old, new, key_path, list_keys)
+        if id_key is not None:
+            old_items = {item[id_key]: item for item in old}
+            new_ids = set()
+            for item in new:
+                item_path = [*path, {id_key: item[id_key]}]
+                new_ids.add(item[id_key])
+                if item[id_key] in old_items:
+                    _diff(old_items[item[id_key]], item, item_path, key_path, list_keys, operations)
+                else:
+                    operations.append({"op": "add", "path": item_path, "value": item})
+            for item_id in old_items:
+                if item_id not in new_ids:
+                    operations.append({"op": "remove", "path": [*path, {id_key: item_id}]})
+            return
+
+    if type(old) is not type(new) or old != new:
+        operations.append({"op": "replace", "path": path, "value": new})
+
+
+def apply_delta(tree: Any, operations: list[dict[str, Any]]) -> Any:
+    """
+    Applies operations from `diff_trees` to a copy of `tree` and returns it. Only the containers
+    on the changed paths are copied. Items added to identified lists are appended, and removing
+    what is not in `tree` leaves it unchanged, as the result has it absent either way.
+    """
+    for operation in operations:
+        tree = _apply(tree, operation["path"], operation)
+    return tree
+
+
+def _apply(node: Any, path: Path, operation: dict[str, Any]) -> Any:
+    if not path:
+        return operation.get("value")
+
+    segment, rest = path[0], path[1:]
+    removing = operation["op"] == "remove"
+    if isinstance(segment, dict):
+        ((id_key, item_id),) = segment.items()
+        items = list(node or ())
+        position = next((index for index, item in enumerate(items) if item.get(id_key) == item_id), None)
+        if position is None and removing:
+            return node
+        if not rest and removing:
+            del items[position]
+        elif position is None:
+            items.append(_apply(None, rest, operation))
+        else:
+            items[position] = _apply(items[position], rest, operation)
+        return items
+
+    if removing and (node is None or segment not in node):
+        return node
+    mapping = dict(node or {})
+    if not rest and removing:
+        del mapping[segment]
+    else:
+        mapping[segment] = _apply(mapping.get(segment), rest, operation)
+    return mapping
@@ -0,0 +1,139 @@
+"""
+Lists the devices whose config depends on the objects changed in a branch or on changed templates.
+
+    python -m src.helpers.dependencies <index> [--branch BRANCH] [--object ID ...] [--template PATH ...]
+
+Templates are given relative to the templates directory, such as `leaf.yaml` or `sites/paris.yaml`.
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+from typing import Any, Iterable
+
+from infrahub_sdk import InfrahubClient
+
+# Dependencies looked up per statement, below the SQLite limit on the number of parameters.
+LOOKUP_CHUNK_SIZE = 500
+
+
+def node_ids(tree: Any) -> set[str]:
+    """Returns the id of every node of a GraphQL response or part of one."""
+    ids: set[str] = set()
+    stack = [tree]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            node_id = item.get("id")
+            if isinstance(node_id, str):
+                ids.add(node_id)
+            stack.extend(value for value in item.values() if isinstance(value, (dict, list)))
+        elif isinstance(item, list):
+            stack.extend(value for value in item if isinstance(value, (dict, list)))
+    return ids
+
+
+class DependencyIndex:
+    """
+    Persistent reverse index of what each rendered artifact was built from: the ids of the objects
+    of its query response and the templates it was merged from, missing layers included as
+    creating one changes the render.
+
+    Each render replaces the dependencies of its artifact, and `impacted` returns the artifacts
+    depending on any of a set of changed objects or templates. Objects created since an artifact
+    was rendered are not in the index, but the existing objects they are linked to, such as the
+    device of a new interface, are changed with them.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS dependencies (artifact TEXT NOT NULL, kind TEXT NOT NULL,"
+                " dependency TEXT NOT NULL, PRIMARY KEY (artifact, kind, dependency)) WITHOUT ROWID"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS dependencies_by_dependency ON dependencies (kind, dependency)"
+            )
+
+    def record(self, artifact: str, object_ids: Iterable[str], templates: Iterable[str]) -> None:
+        """Replaces the dependencies of `artifact` with the objects and templates of its last render."""
+        rows = [(artifact, "object", object_id) for object_id in set(object_ids)]
+        rows += [(artifact, "template", template) for template in set(templates)]
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM dependencies WHERE artifact = ?", (artifact,))
+            self._connection.executemany("INSERT INTO dependencies (artifact, kind, dependency) VALUES (?, ?, ?)", rows)
+
+    def dependencies(self, artifact: str) -> tuple[set[str], set[str]]:
+        """Returns the object ids and the templates `artifact` was last rendered from."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT kind, dependency FROM dependencies WHERE artifact = ?", (artifact,)
+            ).fetchall()
+        object_ids = {value for kind, value in rows if kind == "object"}
+        templates = {value for kind, value in rows if kind == "template"}
+        return object_ids, templates
+
+    def impacted(self, object_ids: Iterable[str] = (), templates: Iterable[str] = ()) -> set[str]:
+        """Returns the artifacts depending on any of `object_ids` or `templates`."""
+        artifacts: set[str] = set()
+        for kind, values in (("object", list(set(object_ids))), ("template", list(set(templates)))):
+            for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+                chunk = values[start : start + LOOKUP_CHUNK_SIZE]
+                with self._lock:
+                    rows = self._connection.execute(
+                        "SELECT DISTINCT artifact FROM dependencies"
+                        f" WHERE kind = ? AND dependency IN ({', '.join('?' * len(chunk))})",
+                        (kind, *chunk),
+                    ).fetchall()
+                artifacts.update(row[0] for row in rows)
+        return artifacts
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+_indexes: dict[str, DependencyIndex] = {}
+
+
+def open_dependency_index(path: str) -> DependencyIndex:
+    """Returns the process-wide index at `path`, opening it on first use."""
+    path = os.path.abspath(path)
+    if path not in _indexes:
+        _indexes[path] = DependencyIndex(path)
+    return _indexes[path]
+
+
+async def impacted_by_branch(
+    client: InfrahubClient, branch: str, index: DependencyIndex, templates: Iterable[str] = ()
+) -> set[str]:
+    """Returns the artifacts depending on an object changed in `branch`, or on one of `templates`."""
+    diff = await client.get_diff_summary(branch=branch)
+    return index.impacted(object_ids={node["id"] for node in diff}, templates=templates)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("index", help="Path of the dependency index written by the device transform.")
+    parser.add_argument("--branch", help="Branch whose changes to look up, through its diff.")
+    parser.add_argument("--object", action="append", default=[], help="Id of a changed object.")
+    parser.add_argument("--template", action="append", default=[], help="Changed template.")
+    args = parser.parse_args()
+
+    index = DependencyIndex(args.index)
+    artifacts = index.impacted(object_ids=args.object, templates=args.template)
+    if args.branch:
+        artifacts |= asyncio.run(impacted_by_branch(InfrahubClient(), branch=args.branch, index=index))
+    for artifact in sorted(artifacts):
+        print(artifact)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
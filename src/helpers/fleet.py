@@ -0,0 +1,192 @@
+"""
+Offline render of a whole fleet from recorded `device_query` responses, spread over every core.
+
+    python -m src.helpers.fleet SOURCE [--output DIRECTORY] [--format yaml|json|msgpack] [--workers N] [--trusted]
+
+SOURCE is a JSONL file with one response per line, or a directory of `*.json` / `*.jsonl` files.
+Every device is written to `<output>/<device name>.<format>`, then a throughput summary is printed.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from ..models.config import platforms
+from ..models.device import Device
+from .emit import OUTPUT_FORMATS
+from .templates import template_cache
+
+TEMPLATES_PATH = str(Path(__file__).resolve().parents[1] / "transforms" / "templates")
+
+# Responses sent to a worker at a time, large enough to amortise the inter-process round-trip.
+SNAPSHOTS_PER_CHUNK = 8
+
+
+@dataclass
+class DeviceRender:
+    name: str
+    output_bytes: int = 0
+    error: str | None = None
+
+
+@dataclass
+class FleetRenderSummary:
+    workers: int
+    seconds: float = 0.0
+    rendered: int = 0
+    output_bytes: int = 0
+    failures: list[DeviceRender] = field(default_factory=list)
+
+    @property
+    def devices_per_second(self) -> float:
+        return self.rendered / self.seconds if self.seconds else 0.0
+
+
+def read_snapshots(source: str) -> Iterator[str]:
+    """Yields the JSON text of every response of a JSONL file or of a directory of JSON/JSONL files."""
+    path = Path(source)
+    files = sorted(item for item in path.iterdir() if item.suffix in (".json", ".jsonl")) if path.is_dir() else [path]
+
+    for file in files:
+        if file.suffix == ".json":
+            yield file.read_text()
+            continue
+        with file.open() as lines:
+            for line in lines:
+                if line.strip():
+                    yield line
+
+
+class SnapshotRenderer:
+    """Renders responses and writes each device to the output directory, one instance per worker."""
+
+    def __init__(self, templates_path: str, output: str, validate: bool = True, output_format: str = "yaml") -> None:
+        self.templates_path: str = templates_path
+        self.output: Path = Path(output)
+        self.validate: bool = validate
+        self.output_format: str = output_format
+
+        # Parse every template and import every platform builder up front, once per worker.
+        for template in Path(templates_path).glob("*.yaml"):
+            template_cache.entry(str(template)).emitter()
+        platforms.warm()
+
+    def render(self, snapshot: str) -> list[DeviceRender]:
+        try:
+            data = json.loads(snapshot)
+            edges = (data.get("data") or data)["InfraDevice"]["edges"]
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            return [DeviceRender(name="<snapshot>", error=f"Invalid device_query response: {exc!r}")]
+
+        results = []
+        for edge in edges:
+            try:
+                device_data = Device.decode(infra_device=edge["node"], validate=self.validate)
+                device = Device(device_data=device_data, templates_path=self.templates_path)
+                output = device.output(output_format=self.output_format)
+                output = output.encode() if isinstance(output, str) else output
+                file_name = f"{device_data.name.replace(os.sep, '_')}.{self.output_format}"
+                (self.output / file_name).write_bytes(output)
+            except Exception as exc:
+                name = str(edge.get("node", {}).get("name", {}).get("value", "<unnamed>"))
+                results.append(DeviceRender(name=name, error=repr(exc)))
+                continue
+            results.append(DeviceRender(name=device_data.name, output_bytes=len(output)))
+        return results
+
+
+_renderer: SnapshotRenderer | None = None
+
+
+def _init_worker(templates_path: str, output: str, validate: bool, output_format: str) -> None:
+    global _renderer
+    _renderer = SnapshotRenderer(
+        templates_path=templates_path, output=output, validate=validate, output_format=output_format
+    )
+
+
+def _render_in_worker(snapshot: str) -> list[DeviceRender]:
+    return _renderer.render(snapshot)
+
+
+def render_snapshots(
+    source: str,
+    output: str,
+    templates_path: str = TEMPLATES_PATH,
+    workers: int = 0,
+    validate: bool = True,
+    output_format: str = "yaml",
+) -> FleetRenderSummary:
+    """
+    Renders every device of the responses in `source` into `output`, with `workers` processes
+    (every core when 0). A single worker renders in the current process.
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output, exist_ok=True)
+    summary = FleetRenderSummary(workers=workers)
+    start = time.perf_counter()
+
+    if workers == 1:
+        renderer = SnapshotRenderer(
+            templates_path=templates_path, output=output, validate=validate, output_format=output_format
+        )
+        results = map(renderer.render, read_snapshots(source))
+        _collect(summary, results)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(templates_path, output, validate, output_format)
+        ) as executor:
+            results = executor.map(_render_in_worker, read_snapshots(source), chunksize=SNAPSHOTS_PER_CHUNK)
+            _collect(summary, results)
+
+    summary.seconds = time.perf_counter() - start
+    return summary
+
+
+def _collect(summary: FleetRenderSummary, results: Iterator[list[DeviceRender]]) -> None:
+    """Adds the device renders of every response to the summary, keeping the failed ones."""
+    for renders in results:
+        for render in renders:
+            if render.error is not None:
+                summary.failures.append(render)
+                continue
+            summary.rendered += 1
+            summary.output_bytes += render.output_bytes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="JSONL file or directory of recorded device_query responses.")
+    parser.add_argument("--output", default="rendered", help="Directory the device configs are written to.")
+    parser.add_argument("--format", default="yaml", choices=list(OUTPUT_FORMATS), help="Output format.")
+    parser.add_argument("--workers", type=int, default=0, help="Number of worker processes, every core when 0.")
+    parser.add_argument("--templates", default=TEMPLATES_PATH, help="Directory of the role templates.")
+    parser.add_argument("--trusted", action="store_true", help="Skip validating the recorded responses.")
+    args = parser.parse_args()
+
+    summary = render_snapshots(
+        source=args.source,
+        output=args.output,
+        templates_path=args.templates,
+        workers=args.workers,
+        validate=not args.trusted,
+        output_format=args.format,
+    )
+
+    for failure in summary.failures:
+        print(f"FAILED {failure.name}: {failure.error}")
+    print(
+        f"Rendered {summary.rendered} devices ({summary.output_bytes / 1024:.1f} KiB) in {summary.seconds:.2f} s "
+        f"with {summary.workers} workers: {summary.devices_per_second:.1f} devices/s, {len(summary.failures)} failed"
+    )
+    return 1 if summary.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
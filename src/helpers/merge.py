@@ -45,7 +45,7 @@ def merge_lists(base_list, override_list):
         # If a corresponding item exists in the override list, merge them.
         if item_id is not None and item_id in override_map:
             override_item = override_map.pop(item_id)  # Pop to track new items.
-            final_list.append(deep_merge(base_item, override_item))
+            final_list.append(_merge_dicts(base_item, override_item))
         else:
             # Otherwise, keep the base item as is.
             final_list.append(base_item)
@@ -56,20 +56,29 @@ def merge_lists(base_list, override_list):
     return final_list
 
 
-def deep_merge(base, override):
+def deep_merge(base, override, independent=False):
     """
     Recursively merges two data structures (dictionaries or lists).
     - 'override' values take precedence over 'base' values.
     - Dictionaries are merged recursively.
     - Lists are merged using the `merge_lists` function.
+
+    Neither input is modified. Only the containers on the paths touched by 'override' are copied,
+    every other subtree of 'base' is shared with the result. Pass `independent=True` when the
+    caller needs a result that shares nothing with its inputs, e.g. to mutate it afterwards.
     """
-    merged = copy.deepcopy(base)
+    merged = _merge_dicts(base, override)
+    return copy.deepcopy(merged) if independent else merged
+
+
+def _merge_dicts(base, override):
+    merged = dict(base)
 
     for key, override_value in override.items():
         if key in merged:
             base_value = merged[key]
             if isinstance(base_value, dict) and isinstance(override_value, dict):
-                merged[key] = deep_merge(base_value, override_value)
+                merged[key] = _merge_dicts(base_value, override_value)
             elif isinstance(base_value, list) and isinstance(override_value, list):
                 merged[key] = merge_lists(base_value, override_value)
             else:
@@ -78,3 +87,123 @@ def deep_merge(base, override):
             merged[key] = override_value
 
     return merged
+
+
+# Identity key of the lists in the device templates, by path of mapping keys from the template root.
+# A key of None means an override list replaces the template list. Lists that are not declared here
+# fall back to `find_id_key` on the override list.
+NOKIA_NETWORK_INSTANCE = "srl_nokia-network-instance:network-instance"
+LIST_MERGE_KEYS = {
+    ("srl_nokia-acl:acl", "acl-filter"): "name",
+    ("srl_nokia-acl:acl", "acl-filter", "entry"): "sequence-id",
+    ("srl_nokia-acl:acl", "policers", "system-cpu-policer"): "name",
+    ("srl_nokia-interfaces:interface",): "name",
+    ("srl_nokia-interfaces:interface", "subinterface"): "index",
+    ("srl_nokia-interfaces:interface", "subinterface", "ipv4", "address"): None,
+    ("srl_nokia-interfaces:interface", "subinterface", "ipv6", "address"): None,
+    (NOKIA_NETWORK_INSTANCE,): "name",
+    (NOKIA_NETWORK_INSTANCE, "interface"): "name",
+    (NOKIA_NETWORK_INSTANCE, "protocols", "srl_nokia-bgp:bgp", "group"): "group-name",
+    (NOKIA_NETWORK_INSTANCE, "protocols", "srl_nokia-bgp:bgp", "neighbor"): "peer-address",
+    (NOKIA_NETWORK_INSTANCE, "protocols", "srl_nokia-isis:isis", "instance"): "name",
+    (NOKIA_NETWORK_INSTANCE, "protocols", "srl_nokia-isis:isis", "instance", "net"): None,
+}
+
+
+def index_list(list_of_dicts, id_key):
+    """Maps the identifier of each dict in a list to the position of its first occurrence."""
+    index = {}
+    for position, item in enumerate(list_of_dicts):
+        if isinstance(item, dict) and item.get(id_key) is not None:
+            index.setdefault(item[id_key], position)
+    return index
+
+
+class CompiledTemplate:
+    """
+    A template tree with the identity key of each list resolved and its items pre-indexed.
+
+    Compiling walks the template once. `merge` then gives the same result as `deep_merge`, but
+    only visits the paths present in the override and finds base list items by key instead of
+    scanning the list, so a merge costs O(size of override) rather than O(size of template).
+    The template tree is shared with every merge result and must not be modified.
+
+    A tree merged from a compiled `base`, such as a template stack with one more layer, can be
+    compiled from it: the subtrees it shares with `base` keep their indexes and are not walked
+    again, so only the paths the merge changed are compiled.
+    """
+
+    def __init__(self, tree, list_keys=None, base=None):
+        self.tree = tree
+        self.list_keys = LIST_MERGE_KEYS if list_keys is None else list_keys
+        if base is not None and base.list_keys is not self.list_keys:
+            base = None
+        # Keeps the shared subtrees indexed by id alive with the base.
+        self._base = base
+        self._indexes = {} if base is None else dict(base._indexes)
+        self._compile(tree, (), None if base is None else base.tree)
+
+    def _compile(self, node, path, base_node=None):
+        if node is base_node:
+            return
+        if isinstance(node, dict):
+            base_items = base_node if isinstance(base_node, dict) else {}
+            for key, value in node.items():
+                self._compile(value, (*path, key), base_items.get(key))
+        elif isinstance(node, list):
+            id_key = self.list_keys.get(path)
+            if id_key is not None:
+                self._indexes[id(node)] = index_list(node, id_key)
+            shared = {id(item) for item in base_node} if isinstance(base_node, list) else set()
+            for item in node:
+                self._compile(item, path, item if id(item) in shared else None)
+
+    def merge(self, override, independent=False):
+        """Merges 'override' into the template, see `deep_merge`."""
+        merged = self._merge_dicts(self.tree, override, ())
+        return copy.deepcopy(merged) if independent else merged
+
+    def _merge_dicts(self, base, override, path):
+        merged = dict(base)
+
+        for key, override_value in override.items():
+            if key in merged:
+                base_value = merged[key]
+                if isinstance(base_value, dict) and isinstance(override_value, dict):
+                    merged[key] = self._merge_dicts(base_value, override_value, (*path, key))
+                elif isinstance(base_value, list) and isinstance(override_value, list):
+                    merged[key] = self._merge_lists(base_value, override_value, (*path, key))
+                else:
+                    merged[key] = override_value
+            else:
+                merged[key] = override_value
+
+        return merged
+
+    def _merge_lists(self, base_list, override_list, path):
+        if path not in self.list_keys:
+            return merge_lists(base_list, override_list)
+
+        if not override_list:
+            return base_list
+
+        id_key = self.list_keys[path]
+        if id_key is None:
+            return override_list
+
+        index = self._indexes.get(id(base_list))
+        if index is None:
+            # The base list did not come from the template, e.g. it was added by an earlier override.
+            index = index_list(base_list, id_key)
+
+        override_map = {item.get(id_key): item for item in override_list if isinstance(item, dict) and id_key in item}
+        final_list = list(base_list)
+
+        for item_id, override_item in override_map.items():
+            position = index.get(item_id)
+            if position is None:
+                final_list.append(override_item)
+            else:
+                final_list[position] = self._merge_dicts(base_list[position], override_item, path)
+
+        return final_list
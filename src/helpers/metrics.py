@@ -0,0 +1,233 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Protocol
+
+log = logging.getLogger(__name__)
+
+# Number of durations kept per stage by MemorySink to compute percentiles.
+SAMPLES_PER_STAGE = 10000
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    device: str
+    duration_ms: float
+    allocated_blocks: int
+    sizes: dict[str, int] = field(default_factory=dict)
+
+
+class MetricsSink(Protocol):
+    def record(self, record: StageRecord) -> None: ...
+
+
+class LogSink:
+    """Writes every stage record as a JSON log line."""
+
+    def __init__(self, logger: logging.Logger = log, level: int = logging.INFO) -> None:
+        self.logger: logging.Logger = logger
+        self.level: int = level
+
+    def record(self, record: StageRecord) -> None:
+        self.logger.log(self.level, json.dumps(asdict(record), separators=(",", ":")))
+
+
+@dataclass
+class StageSummary:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    allocated_blocks: int = 0
+    samples: deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLES_PER_STAGE), repr=False)
+
+
+class MemorySink:
+    """Aggregates stage records in memory: counts, totals, maxima and duration percentiles per stage."""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageSummary] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(self, record: StageRecord) -> None:
+        with self._lock:
+            summary = self.stages.get(record.stage)
+            if summary is None:
+                summary = self.stages[record.stage] = StageSummary()
+            summary.count += 1
+            summary.total_ms += record.duration_ms
+            summary.max_ms = max(summary.max_ms, record.duration_ms)
+            summary.allocated_blocks += record.allocated_blocks
+            summary.samples.append(record.duration_ms)
+
+    def percentile(self, stage: str, percentile: float) -> float:
+        """Returns the given percentile (0-100) of the recent durations of `stage`, in milliseconds."""
+        with self._lock:
+            samples = sorted(self.stages[stage].samples)
+        index = min(len(samples) - 1, max(0, round(percentile / 100 * len(samples)) - 1))
+        return samples[index]
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            stages = list(self.stages)
+        return {
+            stage: {
+                "count": self.stages[stage].count,
+                "total_ms": self.stages[stage].total_ms,
+                "max_ms": self.stages[stage].max_ms,
+                "allocated_blocks": self.stages[stage].allocated_blocks,
+                "p50_ms": self.percentile(stage, 50),
+                "p95_ms": self.percentile(stage, 95),
+                "p99_ms": self.percentile(stage, 99),
+            }
+            for stage in stages
+        }
+
+
+class PrometheusFileSink(MemorySink):
+    """
+    Aggregates stage records in memory and writes them as a Prometheus text file, e.g. for the
+    node exporter textfile collector. The file is rewritten at most every `interval` seconds.
+    """
+
+    def __init__(self, path: str, interval: float = 10.0) -> None:
+        super().__init__()
+        self.path: str = path
+        self.interval: float = interval
+        self._written: float = 0.0
+
+    def record(self, record: StageRecord) -> None:
+        super().record(record)
+        if time.monotonic() - self._written >= self.interval:
+            self.flush()
+
+    def flush(self) -> None:
+        lines = [
+            "# HELP device_render_stage_seconds Time spent in each stage of the device render pipeline.",
+            "# TYPE device_render_stage_seconds summary",
+        ]
+        blocks = [
+            "# HELP device_render_stage_allocated_blocks_total Memory blocks allocated by each stage.",
+            "# TYPE device_render_stage_allocated_blocks_total counter",
+        ]
+        for stage, summary in self.summary().items():
+            for quantile in ("0.5", "0.95", "0.99"):
+                value = summary[f"p{round(float(quantile) * 100)}_ms"] / 1000
+                lines.append(f'device_render_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {value}')
+            lines.append(f'device_render_stage_seconds_sum{{stage="{stage}"}} {summary["total_ms"] / 1000}')
+            lines.append(f'device_render_stage_seconds_count{{stage="{stage}"}} {summary["count"]}')
+            blocks.append(
+                f'device_render_stage_allocated_blocks_total{{stage="{stage}"}} {summary["allocated_blocks"]}'
+            )
+
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as file:
+            file.write("\n".join(lines + blocks) + "\n")
+        os.replace(temporary, self.path)
+        self._written = time.monotonic()
+
+
+class Stage:
+    """Times one stage of a render and reports it to a sink on exit."""
+
+    __slots__ = ("_blocks", "_sink", "_start", "device", "name", "sizes")
+
+    def __init__(self, sink: MetricsSink, name: str, device: str, sizes: dict[str, int]) -> None:
+        self._sink = sink
+        self.name = name
+        self.device = device
+        self.sizes = sizes
+
+    def size(self, **sizes: int) -> None:
+        """Records input sizes of the stage, such as the interface count."""
+        self.sizes.update(sizes)
+
+    def __enter__(self) -> "Stage":
+        self._blocks = sys.getallocatedblocks()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        self._sink.record(
+            StageRecord(
+                stage=self.name,
+                device=self.device,
+                duration_ms=duration_ms,
+                allocated_blocks=max(0, sys.getallocatedblocks() - self._blocks),
+                sizes=self.sizes,
+            )
+        )
+
+
+class NullStage:
+    """Stand-in for Stage while instrumentation is disabled."""
+
+    __slots__ = ("device",)
+
+    def size(self, **sizes: int) -> None:
+        pass
+
+    def __enter__(self) -> "NullStage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+NULL_STAGE = NullStage()
+
+
+class Instrumentation:
+    """
+    Switchable per-stage instrumentation of the render pipeline.
+
+    Disabled, `stage` returns a shared no-op context manager. Enabled, every stage reports its wall
+    time, the memory blocks it allocated and its input sizes to the configured sink.
+    """
+
+    def __init__(self) -> None:
+        self.sink: MetricsSink | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sink is not None
+
+    def enable(self, sink: MetricsSink) -> None:
+        self.sink = sink
+
+    def disable(self) -> None:
+        self.sink = None
+
+    def configure(self, spec: str) -> None:
+        """
+        Configures the sink from a specification: `log`, `memory` or `prometheus:<path>`.
+        An empty specification disables the instrumentation.
+        """
+        kind, _, argument = spec.partition(":")
+        match kind:
+            case "":
+                self.disable()
+            case "log":
+                self.enable(LogSink())
+            case "memory":
+                self.enable(MemorySink())
+            case "prometheus" if argument:
+                self.enable(PrometheusFileSink(path=argument))
+            case _:
+                raise ValueError(f"Unknown metrics sink {spec!r}, expected log, memory or prometheus:<path>")
+
+    def stage(self, name: str, device: str = "", **sizes: int) -> Stage | NullStage:
+        sink = self.sink
+        if sink is None:
+            return NULL_STAGE
+        return Stage(sink=sink, name=name, device=device, sizes=sizes)
+
+
+metrics = Instrumentation()
+metrics.configure(os.getenv("DEVICE_METRICS", ""))
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+# Fetches the page of `limit` nodes from `offset` of a paginated root field: `{"count": ..., "edges": [...]}`.
+PageFetcher = Callable[[int, int], Awaitable[dict[str, Any]]]
+
+
+async def fetch_pages(
+    fetch_page: PageFetcher, page_size: int, concurrency: int
+) -> AsyncIterator[tuple[int, list[dict[str, Any]]]]:
+    """
+    Yields `(offset, edges)` for every page of a paginated root field, in the order they arrive.
+
+    The first page is fetched alone to learn the node count. The other ones are then fetched
+    concurrently, at most `concurrency` at a time, and the next one is only requested once a page
+    has been consumed, so no more than `concurrency` pages are held in memory whatever the count.
+    """
+    if page_size < 1 or concurrency < 1:
+        raise ValueError("The page size and the concurrency must be at least 1")
+
+    first = await fetch_page(0, page_size)
+    count = first["count"]
+    if not first["edges"]:
+        return
+    yield 0, first["edges"]
+    del first
+
+    offsets = iter(range(page_size, count, page_size))
+    pending: dict[asyncio.Task, int] = {}
+    try:
+        while True:
+            while len(pending) < concurrency:
+                offset = next(offsets, None)
+                if offset is None:
+                    break
+                pending[asyncio.ensure_future(fetch_page(offset, page_size))] = offset
+            if not pending:
+                return
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield pending.pop(task), task.result()["edges"]
+    finally:
+        for task in pending:
+            task.cancel()
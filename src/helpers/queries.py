@@ -0,0 +1,77 @@
+from typing import Any, Iterator
+
+from graphql import FieldNode, InlineFragmentNode, SelectionSetNode
+
+# A GraphQL selection set as nested dicts: leaf fields map to None, inline fragments are keyed `... on <Type>`.
+Selection = dict[str, Any]
+
+VALUE: Selection = {"value": None}
+
+
+def node(selection: Selection) -> Selection:
+    """Selection of a relationship of cardinality one, with the id of the node for the dependency index."""
+    return {"node": {"id": None, **selection}}
+
+
+def edges(selection: Selection) -> Selection:
+    """Selection of a relationship of cardinality many, with the id of every node for the dependency index."""
+    return {"edges": {"node": {"id": None, **selection}}}
+
+
+def format_selection(selection: Selection, indent: int = 0) -> Iterator[str]:
+    """Yields the lines of `selection`, indented by two spaces per level as the checked-in queries are."""
+    padding = "  " * indent
+    for field, children in selection.items():
+        if children is None:
+            yield f"{padding}{field}"
+            continue
+        yield f"{padding}{field} {{"
+        yield from format_selection(children, indent + 1)
+        yield f"{padding}}}"
+
+
+def parse_selection(selection_set: SelectionSetNode, duplicates: list[str], path: str = "") -> Selection:
+    """
+    Converts a parsed selection set to a `Selection`. Fields and fragments selected more than once
+    at the same level are merged and their paths appended to `duplicates`.
+    """
+    selection: Selection = {}
+    for item in selection_set.selections:
+        if isinstance(item, FieldNode):
+            field = item.name.value
+        elif isinstance(item, InlineFragmentNode):
+            field = f"... on {item.type_condition.name.value}"
+        else:
+            raise ValueError(
+                f"Unsupported selection {item.kind} at {path or '<root>'}, only fields and inline fragments"
+            )
+
+        field_path = f"{path}.{field}" if path else field
+        children = None if item.selection_set is None else parse_selection(item.selection_set, duplicates, field_path)
+        if field in selection:
+            duplicates.append(field_path)
+            if children is not None:
+                children = merge_selections(selection[field], children)
+        selection[field] = children
+    return selection
+
+
+def merge_selections(first: Selection | None, second: Selection | None) -> Selection | None:
+    if first is None or second is None:
+        return first if second is None else second
+    merged = dict(first)
+    for field, children in second.items():
+        merged[field] = merge_selections(merged[field], children) if field in merged else children
+    return merged
+
+
+def selection_paths(selection: Selection, path: str = "") -> set[str]:
+    """Returns the path of every leaf field of `selection`, such as `interfaces.edges.node.name.value`."""
+    paths = set()
+    for field, children in selection.items():
+        field_path = f"{path}.{field}" if path else field
+        if children is None:
+            paths.add(field_path)
+        else:
+            paths |= selection_paths(children, field_path)
+    return paths
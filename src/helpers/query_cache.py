@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import os
+import subprocess
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
+from typing import Any, Awaitable, Callable
+
+from infrahub_sdk import InfrahubClient
+
+# Seconds a response of the latest data is reused for by the transforms, checks and generators of a
+# process. Off by default: the latest data of a branch can change at any time, and a cached response
+# would then be served after an edit.
+QUERY_CACHE_TTL = float(os.getenv("DEVICE_QUERY_CACHE_TTL", "0"))
+
+# Time the queries read the data at, such as "2024-01-01T00:00:00Z", the latest data when unset.
+QUERY_AT = os.getenv("DEVICE_QUERY_AT") or None
+
+
+@dataclass
+class QueryCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    replays: int = 0
+
+
+def query_key(
+    name: str, variables: dict[str, Any] | None, branch: str | None, revision: str | None = None, at: str | None = None
+) -> str:
+    """Returns the cache key of a query: a digest of its name, variables, branch, commit and time."""
+    payload = {"name": name, "variables": variables or {}, "branch": branch, "revision": revision, "at": at}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+@cache
+def repository_commit(root_directory: str) -> str | None:
+    """
+    Returns the commit checked out in `root_directory`, which defines the queries, or None when it
+    is not a git repository. Infrahub runs each commit of a repository from its own worktree.
+    """
+    if not root_directory:
+        return None
+    try:
+        result = subprocess.run(
+            ["git", "-C", root_directory, "rev-parse", "HEAD"], capture_output=True, text=True, timeout=10
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class QueryCache:
+    """
+    Cache of GraphQL query responses shared by the transforms, checks and generators of a process.
+
+    Responses are keyed by the query name, variables and branch, the `revision` of the repository
+    defining the queries and the time `at` the data is read at, which callers pass when they know
+    them. A response read at a given `at` never changes and is kept until evicted, at most
+    `maxsize` responses, least recently used first out. A response of the latest data is only kept
+    for `ttl` seconds, which bounds how stale it can be, as nothing in its key changes when the
+    data does; the default `ttl` of 0 keeps none, but still shares one request between concurrent
+    callers.
+
+    In `record` mode every response fetched is also written to `path`, and in `replay` mode
+    responses are only read from there, so a run can be repeated without an Infrahub server.
+    Recordings are keyed by the data they hold, without the revision, so that another revision of
+    the code can replay them. Cached responses are shared between callers and must not be modified.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = QUERY_CACHE_TTL) -> None:
+        self.maxsize: int = maxsize
+        self.ttl: float = ttl
+        self.mode: str = ""
+        self.path: str = ""
+        self.stats: QueryCacheStats = QueryCacheStats()
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+
+    def configure(self, mode: str = "", path: str = "") -> None:
+        """Sets the mode: "" to only cache in memory, `record` or `replay` with the directory `path`."""
+        if mode not in ("", "record", "replay"):
+            raise ValueError(f"Unknown query cache mode {mode!r}, expected record or replay")
+        if mode and not path:
+            raise ValueError(f"The {mode} mode of the query cache needs a directory")
+        self.mode = mode
+        self.path = path
+        if mode == "record":
+            os.makedirs(path, exist_ok=True)
+
+    async def query(
+        self,
+        client: InfrahubClient,
+        name: str,
+        branch_name: str | None = None,
+        variables: dict[str, Any] | None = None,
+        revision: str | None = None,
+        at: str | None = None,
+        shared: bool = True,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Returns the response of `client.query_gql_query`, from the cache when possible."""
+
+        def fetch() -> Awaitable[dict[str, Any]]:
+            return client.query_gql_query(
+                name=name, branch_name=branch_name, variables=variables or {}, at=at, **kwargs
+            )
+
+        return await self.fetch(
+            name=name, variables=variables, branch=branch_name, fetch=fetch, revision=revision, at=at, shared=shared
+        )
+
+    async def fetch(
+        self,
+        name: str,
+        variables: dict[str, Any] | None,
+        branch: str | None,
+        fetch: Callable[[], Awaitable[dict[str, Any]]],
+        revision: str | None = None,
+        at: str | None = None,
+        shared: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Returns the response of the query identified by `name`, `variables`, `branch`, `revision` and
+        `at`, calling `fetch` when it is not cached. With `shared=False` the response is always
+        fetched, for queries with side effects on the server, then cached for the other callers.
+        """
+        key = query_key(name, variables, branch, revision, at)
+        record_key = query_key(name, variables, branch, at=at)
+
+        if self.mode == "replay":
+            self.stats.replays += 1
+            return self._read(record_key, name=name, variables=variables, branch=branch)
+
+        if not shared:
+            self.stats.misses += 1
+            response = self._record(record_key, name, variables, branch, await fetch())
+            self._put(key, response, pinned=at is not None)
+            return response
+
+        response = self._get(key)
+        if response is not None:
+            self.stats.hits += 1
+            return response
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.stats.hits += 1
+            return await asyncio.shield(pending)
+
+        self.stats.misses += 1
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            response = self._record(record_key, name, variables, branch, await fetch())
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark the exception as retrieved in case no concurrent caller is waiting for it.
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            self._put(key, response, pinned=at is not None)
+        finally:
+            del self._pending[key]
+        return response
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _get(self, key: str) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put(self, key: str, response: dict[str, Any], pinned: bool = False) -> None:
+        if pinned:
+            expiry = float("inf")
+        elif self.ttl > 0:
+            expiry = time.monotonic() + self.ttl
+        else:
+            return
+        self._entries[key] = (expiry, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _record(
+        self, key: str, name: str, variables: dict[str, Any] | None, branch: str | None, response: dict[str, Any]
+    ) -> dict[str, Any]:
+        if self.mode == "record":
+            record = {"name": name, "variables": variables or {}, "branch": branch, "response": response}
+            path = os.path.join(self.path, f"{key}.json")
+            with open(f"{path}.tmp", "w") as file:
+                json.dump(record, file, sort_keys=True)
+            os.replace(f"{path}.tmp", path)
+        return response
+
+    def _read(self, key: str, name: str, variables: dict[str, Any] | None, branch: str | None) -> dict[str, Any]:
+        try:
+            with open(os.path.join(self.path, f"{key}.json")) as file:
+                return json.load(file)["response"]
+        except FileNotFoundError:
+            raise LookupError(
+                f"No recorded response for query {name} with variables {variables or {}} on branch {branch}"
+            ) from None
+
+
+query_cache = QueryCache(maxsize=int(os.getenv("DEVICE_QUERY_CACHE_SIZE", "256")))
+query_cache.configure(mode=os.getenv("DEVICE_QUERY_CACHE_MODE", ""), path=os.getenv("DEVICE_QUERY_CACHE_PATH", ""))
@@ -0,0 +1,211 @@
+"""
+Long-lived render service keeping the models, compiled templates and caches warm between renders.
+
+    python -m src.helpers.render_service [--listen HOST:PORT | --listen unix:PATH] [--trusted] [--render-store PATH]
+
+POST /render with a `device_query` response, or a JSON list of them, returns the config of every
+device; `?format=json` renders JSON instead of YAML. GET /stats returns the render latency
+percentiles and GET /health answers once the service is warm.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+from ..models.config import platforms
+from ..models.device import Device
+from .fleet import TEMPLATES_PATH
+from .metrics import MemorySink, Stage, metrics
+from .render_store import RenderStore, open_render_store
+from .templates import template_cache
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+# Formats served as text in the JSON responses of the service.
+SERVICE_FORMATS = ("yaml", "json")
+
+
+class RenderService:
+    """
+    Renders `device_query` responses in a warm process: every template is parsed and every platform
+    builder imported once at start-up, and the template cache and render store stay open between
+    requests. Renders are serialised, as they are CPU bound, while stats stay available meanwhile.
+    """
+
+    def __init__(
+        self, templates_path: str = TEMPLATES_PATH, validate: bool = True, render_store_path: str = ""
+    ) -> None:
+        self.templates_path: str = templates_path
+        self.validate: bool = validate
+        self.render_store: RenderStore | None = open_render_store(render_store_path) if render_store_path else None
+        self.latency: MemorySink = MemorySink()
+        self._lock: threading.Lock = threading.Lock()
+
+        for template in Path(templates_path).rglob("*.yaml"):
+            template_cache.entry(str(template)).emitter()
+        platforms.warm()
+
+    def render(self, payload: dict[str, Any] | list[dict[str, Any]], output_format: str = "yaml") -> dict[str, Any]:
+        """
+        Renders every device of one response or a list of them, returning `{"configs": {name: config}}`
+        and `{"errors": {name: error}}` for the devices that failed.
+        """
+        if output_format not in SERVICE_FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r}, expected one of {', '.join(SERVICE_FORMATS)}")
+
+        responses = payload if isinstance(payload, list) else [payload]
+        configs: dict[str, str] = {}
+        errors: dict[str, str] = {}
+        with self._lock, Stage(self.latency, name="request", device="", sizes={}) as request:
+            for response in responses:
+                for edge in (response.get("data") or response)["InfraDevice"]["edges"]:
+                    name = str(edge.get("node", {}).get("name", {}).get("value", "<unnamed>"))
+                    try:
+                        with Stage(self.latency, name="device", device=name, sizes={}):
+                            device_data = Device.decode(infra_device=edge["node"], validate=self.validate)
+                            device = Device(device_data=device_data, templates_path=self.templates_path)
+                            configs[name] = device.output(output_format=output_format, render_store=self.render_store)
+                    except Exception as exc:
+                        errors[name] = repr(exc)
+            request.size(devices=len(configs) + len(errors))
+        return {"configs": configs, "errors": errors}
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the latency percentiles of requests and devices, and the cache statistics."""
+        stats: dict[str, Any] = {"latency": self.latency.summary(), "template_cache": vars(template_cache.stats)}
+        if self.render_store is not None:
+            stats["render_store"] = vars(self.render_store.stats)
+        if isinstance(metrics.sink, MemorySink):
+            stats["stages"] = metrics.sink.summary()
+        return stats
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    server: "RenderHTTPServer | RenderUnixServer"
+
+    def do_GET(self) -> None:
+        match urlparse(self.path).path:
+            case "/health":
+                self._reply(200, {"status": "ok"})
+            case "/stats":
+                self._reply(200, self.server.service.stats())
+            case _:
+                self._reply(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+            return
+
+        output_format = parse_qs(url.query).get("format", ["yaml"])[0]
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            result = self.server.service.render(payload, output_format=output_format)
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            self._reply(400, {"error": f"Invalid render request: {exc!r}"})
+            return
+        self._reply(200, result)
+
+    def address_string(self) -> str:
+        # Unix socket clients have no address.
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _reply(self, status: int, content: dict[str, Any]) -> None:
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class RenderHTTPServer(ThreadingHTTPServer):
+    def __init__(self, address: tuple[str, int], service: RenderService) -> None:
+        super().__init__(address, RenderRequestHandler)
+        self.service: RenderService = service
+
+
+class RenderUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: RenderService) -> None:
+        if os.path.exists(path):
+            os.unlink(path)
+        super().__init__(path, RenderRequestHandler)
+        self.service: RenderService = service
+
+
+def create_server(address: str, service: RenderService) -> RenderHTTPServer | RenderUnixServer:
+    """Returns a server for `service` listening on `host:port` or `unix:<path>`."""
+    if address.startswith("unix:"):
+        return RenderUnixServer(address.removeprefix("unix:"), service)
+    host, _, port = address.rpartition(":")
+    return RenderHTTPServer((host or "127.0.0.1", int(port)), service)
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+def request(
+    address: str, method: str, path: str, payload: Any = None, timeout: float = 60.0
+) -> tuple[int, dict[str, Any]]:
+    """Sends a request to the service at `address` and returns the status and the JSON response."""
+    if address.startswith("unix:"):
+        connection: http.client.HTTPConnection = _UnixConnection(address.removeprefix("unix:"), timeout=timeout)
+    else:
+        host, _, port = address.rpartition(":")
+        connection = http.client.HTTPConnection(host or "127.0.0.1", int(port), timeout=timeout)
+    try:
+        body = None if payload is None else json.dumps(payload).encode()
+        connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listen", default=DEFAULT_ADDRESS, help="HOST:PORT, or unix:PATH for a Unix socket.")
+    parser.add_argument("--templates", default=TEMPLATES_PATH, help="Directory of the device templates.")
+    parser.add_argument("--trusted", action="store_true", help="Skip validating the responses.")
+    parser.add_argument("--render-store", default="", help="Render store to skip unchanged renders.")
+    args = parser.parse_args()
+
+    service = RenderService(
+        templates_path=args.templates, validate=not args.trusted, render_store_path=args.render_store
+    )
+    server = create_server(args.listen, service)
+    print(f"Render service listening on {args.listen}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
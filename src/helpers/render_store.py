@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Callable
+
+
+@dataclass
+class RenderStoreStats:
+    skipped: int = 0
+    rendered: int = 0
+
+
+def source_digest(*sources: ModuleType | str) -> str:
+    """Returns a digest of the source files of modules or file paths, used as the version of the code they contain."""
+    digest = hashlib.sha256()
+    for source in sources:
+        with open(source if isinstance(source, str) else source.__file__, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def render_fingerprint(data: dict[str, Any], *digests: str) -> str:
+    """Returns a fingerprint of the render inputs: the normalised device data and the template/code digests."""
+    digest = hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode())
+    for item in digests:
+        digest.update(item.encode())
+    return digest.hexdigest()
+
+
+class RenderStore:
+    """
+    Persistent store of the last rendered output of each device, keyed by its render fingerprint.
+
+    A render whose fingerprint matches the stored one returns the stored output without merging
+    or serialising anything.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self.stats: RenderStoreStats = RenderStoreStats()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock: threading.Lock = threading.Lock()
+        self._connection: sqlite3.Connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS renders (key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, output BLOB)"
+            )
+
+    def get(self, key: str, fingerprint: str) -> Any | None:
+        """Returns the stored output for `key` if it was rendered from the same fingerprint."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT output FROM renders WHERE key = ? AND fingerprint = ?", (key, fingerprint)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def last(self, key: str) -> tuple[str, Any] | None:
+        """Returns the fingerprint and output of the last render stored for `key`, whatever its inputs."""
+        with self._lock:
+            row = self._connection.execute("SELECT fingerprint, output FROM renders WHERE key = ?", (key,)).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def put(self, key: str, fingerprint: str, output: Any) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO renders (key, fingerprint, output) VALUES (?, ?, ?)", (key, fingerprint, output)
+            )
+
+    def render(self, key: str, fingerprint: str, render: Callable[[], Any]) -> Any:
+        """Returns the stored output for `key`, calling `render()` and storing its result if it is stale."""
+        output = self.get(key, fingerprint)
+        if output is not None:
+            self.stats.skipped += 1
+            return output
+
+        output = render()
+        self.put(key, fingerprint, output)
+        self.stats.rendered += 1
+        return output
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+_stores: dict[str, RenderStore] = {}
+
+
+def open_render_store(path: str) -> RenderStore:
+    """Returns the process-wide store at `path`, opening it on first use."""
+    path = os.path.abspath(path)
+    if path not in _stores:
+        _stores[path] = RenderStore(path)
+    return _stores[path]
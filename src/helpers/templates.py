@@ -0,0 +1,216 @@
+import copy
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+import yaml
+
+from .emit import YamlTemplateEmitter
+from .merge import CompiledTemplate
+
+TEMPLATE_CACHE_SIZE = 32
+
+# Merged template stacks share every subtree their top layer does not override with the stack below,
+# so they are cheap to keep: enough for a stack per device with its own layer in a large site. A stack
+# evicted is rebuilt from the cached stack below it, compiling and emitting only its top layer.
+TEMPLATE_STACK_CACHE_SIZE = int(os.getenv("DEVICE_TEMPLATE_STACK_CACHE_SIZE", "1024"))
+
+# The C loader is an order of magnitude faster than the pure-Python one and builds the same tree.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@dataclass
+class TemplateCacheStats:
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class TemplateEntry:
+    stat_key: tuple[int, int]
+    digest: str
+    tree: Any
+    # For a stack, the stack below it and the tree of its top layer.
+    base: "TemplateEntry | None" = field(default=None, repr=False)
+    layer: Any = field(default=None, repr=False)
+    _compiled: CompiledTemplate | None = field(default=None, repr=False)
+    _emitter: YamlTemplateEmitter | None = field(default=None, repr=False)
+
+    @property
+    def size(self) -> int:
+        """Size of the template file in bytes, or of all the layers of a stack."""
+        return self.stat_key[1]
+
+    def compiled(self) -> CompiledTemplate:
+        """Returns the template compiled for merging, compiling it on first use."""
+        if self._compiled is None:
+            self._compiled = CompiledTemplate(self.tree, base=None if self.base is None else self.base.compiled())
+        return self._compiled
+
+    def emitter(self) -> YamlTemplateEmitter:
+        """Returns the YAML emitter of the compiled template, creating it on first use."""
+        if self._emitter is None:
+            if self.base is None:
+                self._emitter = YamlTemplateEmitter(self.compiled())
+            else:
+                self._emitter = YamlTemplateEmitter(self.compiled(), base=self.base.emitter(), layer=self.layer)
+        return self._emitter
+
+
+class TemplateCache:
+    """
+    Bounded, process-wide cache of parsed YAML templates keyed by path.
+
+    Entries are revalidated on every lookup: an unchanged mtime/size is a hit, a changed
+    mtime/size triggers a content hash and the template is only re-parsed if the hash differs.
+    """
+
+    def __init__(self, maxsize: int = TEMPLATE_CACHE_SIZE, stack_maxsize: int = TEMPLATE_STACK_CACHE_SIZE) -> None:
+        self.maxsize: int = maxsize
+        self.stack_maxsize: int = stack_maxsize
+        self.stats: TemplateCacheStats = TemplateCacheStats()
+        self._entries: OrderedDict[str, TemplateEntry] = OrderedDict()
+        self._stacks: OrderedDict[tuple[str, ...], TemplateEntry] = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entry(self, path: str) -> TemplateEntry:
+        """Returns the cache entry for a template, loading or refreshing it as required."""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.stat_key == stat_key:
+                self._entries.move_to_end(path)
+                self.stats.hits += 1
+                return entry
+
+        with open(path, "rb") as file:
+            content = file.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        with self._lock:
+            if entry is not None and entry.digest == digest:
+                # Touched but not modified, keep the parsed tree.
+                entry.stat_key = stat_key
+                self._entries.move_to_end(path)
+                self.stats.hits += 1
+                self.stats.revalidations += 1
+                return entry
+
+        entry = TemplateEntry(stat_key=stat_key, digest=digest, tree=yaml.load(content, Loader=YAML_LOADER))
+
+        with self._lock:
+            self.stats.misses += 1
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+        return entry
+
+    def stack(self, paths: list[str], required: tuple[str, ...] = ()) -> TemplateEntry:
+        """
+        Returns the entry of the templates at `paths` merged in order, each one overriding the
+        previous ones as `deep_merge` does. Paths that do not exist are skipped, unless they are
+        `required`, and a FileNotFoundError is raised if none does.
+
+        Every layer is revalidated like a single template. The merged stacks are cached by the
+        digests of their layers, prefixes included, so the layers shared by many devices are only
+        merged once and each device only merges its own layers onto them. A stack is compiled and
+        emitted from the stack below it, so a layer of its own costs a device that layer only.
+        """
+        layers = []
+        for path in paths:
+            try:
+                layers.append(self.entry(path))
+            except FileNotFoundError:
+                if path in required:
+                    raise
+                continue
+        if not layers:
+            raise FileNotFoundError(f"None of the templates {', '.join(paths)} exists")
+        return self._stack(tuple(layers))
+
+    def _stack(self, layers: tuple[TemplateEntry, ...]) -> TemplateEntry:
+        if len(layers) == 1:
+            return layers[0]
+
+        key = tuple(layer.digest for layer in layers)
+        with self._lock:
+            entry = self._stacks.get(key)
+            if entry is not None:
+                self._stacks.move_to_end(key)
+                return entry
+
+        base = self._stack(layers[:-1])
+        entry = TemplateEntry(
+            stat_key=(0, base.size + layers[-1].size),
+            digest=hashlib.sha256("".join(key).encode()).hexdigest(),
+            tree=base.compiled().merge(layers[-1].tree),
+            base=base,
+            layer=layers[-1].tree,
+        )
+
+        with self._lock:
+            self._stacks[key] = entry
+            while len(self._stacks) > self.stack_maxsize:
+                self._stacks.popitem(last=False)
+
+        return entry
+
+    def load(self, path: str, copy_tree: bool = True) -> Any:
+        """
+        Returns the parsed template at `path`.
+
+        The cached tree is shared by every caller, so unless the caller guarantees it will not
+        mutate the result a private deep copy is handed out.
+        """
+        tree = self.entry(path).tree
+        return copy.deepcopy(tree) if copy_tree else tree
+
+    def compiled(self, path: str) -> CompiledTemplate:
+        """Returns the template at `path` compiled for merging, compiling it on first use."""
+        return self.entry(path).compiled()
+
+    def emitter(self, path: str) -> YamlTemplateEmitter:
+        """Returns the YAML emitter of the compiled template at `path`, creating it on first use."""
+        return self.entry(path).emitter()
+
+    def digest(self, path: str) -> str:
+        """Returns the SHA-256 of the template content at `path`."""
+        return self.entry(path).digest
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stacks.clear()
+            self.stats = TemplateCacheStats()
+
+
+template_cache = TemplateCache()
+
+
+def load_template(path: str, copy_tree: bool = True) -> Any:
+    """Loads a YAML template through the process-wide template cache."""
+    return template_cache.load(path, copy_tree=copy_tree)
+
+
+def load_compiled_template(path: str) -> CompiledTemplate:
+    """Loads a compiled YAML template through the process-wide template cache."""
+    return template_cache.compiled(path)
+
+
+def load_template_emitter(path: str) -> YamlTemplateEmitter:
+    """Loads the YAML emitter of a compiled template through the process-wide template cache."""
+    return template_cache.emitter(path)
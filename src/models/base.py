@@ -1,5 +1,9 @@
+from typing import Any, Self
+
 from pydantic import BaseModel, ConfigDict
 
+_object_setattr = object.__setattr__
+
 
 class BaseDeviceConfigModel(BaseModel):
     model_config = ConfigDict(extra="forbid", populate_by_name=True)
@@ -14,3 +18,17 @@ class BaseConfigModel(BaseModel):
 
 class BaseDataModel(BaseModel):
     model_config = ConfigDict(extra="forbid")
+
+    @classmethod
+    def trusted(cls, values: dict[str, Any]) -> Self:
+        """
+        Builds a model from values that are already valid, with every field given, without validating them.
+
+        A leaner `model_construct`: no defaults are filled in and `values` becomes the model's `__dict__`.
+        """
+        model = object.__new__(cls)
+        _object_setattr(model, "__dict__", values)
+        _object_setattr(model, "__pydantic_fields_set__", set(values))
+        _object_setattr(model, "__pydantic_extra__", None)
+        _object_setattr(model, "__pydantic_private__", None)
+        return model
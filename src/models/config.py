@@ -1,202 +1,87 @@
-from typing import Literal, Self
+import importlib
+import importlib.util
+import threading
+from typing import Any
 
-from pydantic import Field
-from typing_extensions import Annotated
-
-from .base import BaseConfigModel, BaseDeviceConfigModel
+from .base import BaseDeviceConfigModel
 from .data import DeviceData
 
 
-class NokiaVlanIdConfig(BaseConfigModel):
-    vlan_id: Annotated[int, Field(None, alias="vlan-id")]
-
-
-class NokiaEncapConfig(BaseConfigModel):
-    single_tagged: Annotated[NokiaVlanIdConfig, Field(None, alias="single-tagged")]
-
-
-class NokiaVlanConfig(BaseConfigModel):
-    encap: NokiaEncapConfig
-
-
-class NokiaIpPrefixConfig(BaseConfigModel):
-    ip_prefix: Annotated[str, Field(None, alias="ip-prefix")]
+class PlatformRegistry:
+    """
+    Maps platform names to the config builder of the platform, as `"<module>:<class>"` relative to
+    this package, and imports each builder module only the first time a device of that platform is
+    built. Importing the models and building their pydantic schemas is paid per platform in use
+    instead of for every platform on every cold start; `warm` pays it upfront for selected ones.
+    """
+
+    def __init__(self, builders: dict[str, str]) -> None:
+        self._paths: dict[str, str] = dict(builders)
+        self._builders: dict[str, type[BaseDeviceConfigModel]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def platforms(self) -> list[str]:
+        return list(self._paths)
+
+    def register(self, platform: str, path: str) -> None:
+        with self._lock:
+            self._paths[platform] = path
+            self._builders.pop(platform, None)
+
+    def builder(self, platform: str) -> type[BaseDeviceConfigModel] | None:
+        """Returns the builder of `platform`, importing it on first use, or None for unknown platforms."""
+        builder = self._builders.get(platform)
+        if builder is not None or platform not in self._paths:
+            return builder
+
+        with self._lock:
+            if platform not in self._builders:
+                module_name, _, class_name = self._paths[platform].partition(":")
+                module = importlib.import_module(module_name, package=__package__)
+                self._builders[platform] = getattr(module, class_name)
+            return self._builders[platform]
+
+    def warm(self, *platforms: str) -> None:
+        """Imports the builders of `platforms`, or of every registered platform when none is given."""
+        for platform in platforms or self.platforms:
+            if platform not in self._paths:
+                raise ValueError(f"Unknown platform {platform!r}, expected one of {', '.join(self.platforms)}")
+            self.builder(platform)
+
+    def source_paths(self) -> list[str]:
+        """Returns the source files of the builder modules, without importing them."""
+        paths = []
+        for path in sorted(set(self._paths.values())):
+            spec = importlib.util.find_spec(path.partition(":")[0], package=__package__)
+            if spec is not None and spec.origin:
+                paths.append(spec.origin)
+        return paths
+
+
+platforms = PlatformRegistry(
+    {
+        "Nokia SR Linux": ".platforms.nokia_srl:NokiaDeviceConfig",
+    }
+)
 
 
-class NokiaIpAddressConfig(BaseConfigModel):
-    address: list[NokiaIpPrefixConfig]
-
-
-class NokiaSubinterfaceConfig(BaseConfigModel):
-    match_field: str = "index"
-    index: int
-    type: Literal["bridged"] | None = None
-    admin_state: Annotated[Literal["enable", "disable"] | None, Field(None, alias="admin-state")] = None
-    vlan: NokiaVlanConfig | None = None
-    ipv4: NokiaIpAddressConfig | None = None
-    ipv6: NokiaIpAddressConfig | None = None
-
+class DeviceConfig(BaseDeviceConfigModel):
+    """
+    Entry point of the platform config builders.
 
-class NokiaInterfaceConfig(BaseConfigModel):
-    match_field: str = "name"
-    name: str
-    description: str = ""
-    admin_state: Annotated[Literal["enable", "disable"] | None, Field(None, alias="admin-state")] = None
-    vlan_tagging: Annotated[bool | None, Field(None, alias="vlan-tagging")] = None
-    subinterface: list[NokiaSubinterfaceConfig] | None = None
-
-    @classmethod
-    def create(cls, device_data: DeviceData) -> list[Self]:
-        interfaces: list[Self] = []
-
-        for interface in device_data.interfaces:
-            match interface.role:
-                case "uplink":
-                    interfaces.append(
-                        cls(
-                            name=interface.name,
-                            description=interface.description,
-                            admin_state="enable" if interface.status == "active" else "disable",
-                        )
-                    )
-                case "loopback":
-                    interfaces.append(
-                        cls(
-                            name=interface.name,
-                            subinterface=[
-                                NokiaSubinterfaceConfig(
-                                    index=0,
-                                    ipv4=NokiaIpAddressConfig(
-                                        address=[
-                                            NokiaIpPrefixConfig(
-                                                ip_prefix=ip.address,
-                                            )
-                                            for ip in interface.ip_addresses
-                                            if ip.address.endswith("/32")
-                                        ]
-                                    ),
-                                    ipv6=NokiaIpAddressConfig(
-                                        address=[
-                                            NokiaIpPrefixConfig(
-                                                ip_prefix=ip.address,
-                                            )
-                                            for ip in interface.ip_addresses
-                                            if ip.address.endswith("/128")
-                                        ]
-                                    ),
-                                )
-                            ],
-                        )
-                    )
-
-        return interfaces
-
-
-class NokiaIsisInstanceConfig(BaseConfigModel):
-    name: str
-    net: list[str]
-
-
-class NokiaIsisConfig(BaseConfigModel):
-    instance: list[NokiaIsisInstanceConfig]
-
-
-class NokiaBgpNeighborConfig(BaseConfigModel):
-    peer_address: Annotated[str, Field(None, alias="peer-address")]
-    admin_state: Annotated[Literal["enable", "disable"], Field(None, alias="admin-state")]
-    peer_group: Annotated[str, Field(None, alias="peer-group")]
-
-
-class NokiaBgpGroupConfig(BaseConfigModel):
-    group_name: Annotated[str, Field(None, alias="group-name")]
-    peer_as: Annotated[int, Field(None, alias="peer-as")]
-
-
-class NokiaBgpConfig(BaseConfigModel):
-    router_id: Annotated[str, Field(None, alias="router-id")]
-    autonomous_system: Annotated[int, Field(None, alias="autonomous-system")]
-    neighbor: list[NokiaBgpNeighborConfig]
-    group: list[NokiaBgpGroupConfig]
-
-
-class NokiaProtocolsConfig(BaseConfigModel):
-    bgp: Annotated[NokiaBgpConfig, Field(None, alias="srl_nokia-bgp:bgp")]
-    isis: Annotated[NokiaIsisConfig, Field(None, alias="srl_nokia-isis:isis")]
-
-
-class NokiaNetworkInstanceConfig(BaseConfigModel):
-    match_field: str = "name"
-    name: str
-    protocols: NokiaProtocolsConfig
-
-    @classmethod
-    def create(cls, device_data: DeviceData) -> list[Self]:
-        network_instances: list[Self] = []
-        router_id = ""
-        isis_net_id = ""
-
-        for interface in device_data.interfaces:
-            if interface.role == "loopback":
-                for ip in interface.ip_addresses:
-                    if "/32" in ip.address:
-                        ip = ip.address.replace("/32", "")
-                        last_octet = ip.split(".")[-1]
-                        router_id = ip
-                        isis_net_id = f"49.0001.0000.0000.{last_octet.zfill(4)}.00"
-                        break
-
-        if device_data.bgp_sessions:
-            network_instances.append(
-                cls(
-                    name="default",
-                    protocols=NokiaProtocolsConfig(
-                        isis=NokiaIsisConfig(
-                            instance=[NokiaIsisInstanceConfig(name="ISIS", net=[isis_net_id])],
-                        ),
-                        bgp=NokiaBgpConfig(
-                            router_id=router_id,
-                            autonomous_system=device_data.bgp_sessions[0].local_as,
-                            group=[
-                                NokiaBgpGroupConfig(
-                                    group_name=bgp_session.peer_group,
-                                    peer_as=bgp_session.remote_as,
-                                )
-                                for bgp_session in device_data.bgp_sessions
-                                if bgp_session.status == "active"
-                            ],
-                            neighbor=[
-                                NokiaBgpNeighborConfig(
-                                    admin_state="enable",
-                                    peer_address=bgp_session.remote_ip.replace("/128", ""),
-                                    peer_group=bgp_session.peer_group,
-                                )
-                                for bgp_session in device_data.bgp_sessions
-                                if bgp_session.status == "active"
-                            ],
-                        ),
-                    ),
-                )
-            )
-
-        return network_instances
-
-
-class NokiaDeviceConfig(BaseDeviceConfigModel):
-    interface: Annotated[list[NokiaInterfaceConfig], Field(None, alias="srl_nokia-interfaces:interface")]
-    network_instance: Annotated[
-        list[NokiaNetworkInstanceConfig], Field(None, alias="srl_nokia-network-instance:network-instance")
-    ]
-
-    @classmethod
-    def create(cls, device_data: DeviceData) -> Self:
-        interface: NokiaInterfaceConfig = NokiaInterfaceConfig.create(device_data=device_data)
-        network_instance: NokiaNetworkInstanceConfig = NokiaNetworkInstanceConfig.create(device_data=device_data)
-        return cls(interface=interface, network_instance=network_instance)
+    `emit` returns the config directly in the form it is merged into the templates: keyed by alias,
+    without the fields left at their default. `create` builds the same config separately, through the
+    pydantic models, and `model_dump(by_alias=True, exclude_defaults=True)` of the result must give
+    back what `emit` returns; the unit tests compare both on varied devices.
+    """
 
+    @staticmethod
+    def create(device_data: DeviceData) -> BaseDeviceConfigModel | None:
+        builder = platforms.builder(device_data.platform)
+        return None if builder is None else builder.create(device_data)
 
-class DeviceConfig(BaseDeviceConfigModel):
     @staticmethod
-    def create(device_data: DeviceData) -> BaseDeviceConfigModel:
-        match device_data.platform:
-            case "Nokia SR Linux":
-                return NokiaDeviceConfig.create(device_data)
+    def emit(device_data: DeviceData) -> dict[str, Any] | None:
+        builder = platforms.builder(device_data.platform)
+        return None if builder is None else builder.emit(device_data)
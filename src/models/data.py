@@ -1,15 +1,42 @@
-from typing import Any, Literal, Self
+import gc
+import ipaddress
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Any, ClassVar, Iterator, Literal, Self
 
+from ..helpers.queries import VALUE, Selection, edges, node
 from .base import BaseDataModel
 
 
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Pauses the garbage collector while building models, none of which can form a cycle."""
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _edges(infra_device: dict[str, Any], relationship: str) -> list[dict[str, Any]]:
+    related = infra_device.get(relationship)
+    return related["edges"] if related else []
+
+
 class IpAddressData(BaseDataModel):
     address: str
 
+    selection: ClassVar[Selection] = {"address": VALUE}
+
 
 class VlanData(BaseDataModel):
     vlan_id: int
 
+    selection: ClassVar[Selection] = {"vlan_id": VALUE}
+
 
 class InterfaceData(BaseDataModel):
     name: str
@@ -21,35 +48,23 @@ class InterfaceData(BaseDataModel):
     ip_addresses: list[IpAddressData]
     vlans: list[VlanData]
 
-
-class BgpSessionData(BaseDataModel):
-    status: Literal["active", "provisioning", "maintenance"]
-    local_ip: str
-    remote_ip: str
-    local_as: int
-    remote_as: int
-    peer_group: str
-
-
-class DeviceData(BaseDataModel):
-    name: str
-    description: str | None
-    platform: str
-    type: str
-    role: str
-    interfaces: list[InterfaceData]
-    bgp_sessions: list[BgpSessionData]
+    selection: ClassVar[Selection] = {
+        "name": VALUE,
+        "description": VALUE,
+        "enabled": VALUE,
+        "role": VALUE,
+        "status": VALUE,
+        "... on InfraLagInterfaceL2": {"l2_mode": VALUE},
+        "... on InfraInterfaceL3": {"ip_addresses": edges(IpAddressData.selection)},
+        "... on InfraInterfaceL2": {"l2_mode": VALUE, "tagged_vlan": edges(VlanData.selection)},
+    }
 
     @classmethod
-    def create(cls, infra_device: dict[str, Any]) -> Self:
-        return cls(
-            name=infra_device["name"]["value"],
-            description=infra_device["description"]["value"],
-            platform=infra_device["platform"]["node"]["name"]["value"],
-            type=infra_device["type"]["value"],
-            role=infra_device["role"]["value"],
-            interfaces=[
-                InterfaceData(
+    def create_all(cls, edges: list[dict[str, Any]], validate: bool = True) -> list[Self]:
+        """Builds the interfaces of `edges`, from the device query or a page of its interfaces."""
+        if validate:
+            return [
+                cls(
                     name=interface["node"]["name"]["value"],
                     description=interface["node"]["description"]["value"],
                     enabled=interface["node"]["enabled"]["value"],
@@ -69,12 +84,90 @@ class DeviceData(BaseDataModel):
                     if interface["node"].get("tagged_vlan")
                     else [],
                 )
-                for interface in infra_device["interfaces"]["edges"]
+                for interface in edges
             ]
-            if infra_device.get("interfaces")
-            else [],
-            bgp_sessions=[
-                BgpSessionData(
+
+        interfaces: list[Self] = []
+        with _gc_paused():
+            for edge in edges:
+                node = edge["node"]
+                l2_mode = node.get("l2_mode")
+                ip_addresses = node.get("ip_addresses")
+                tagged_vlan = node.get("tagged_vlan")
+                interfaces.append(
+                    cls.trusted(
+                        {
+                            "name": node["name"]["value"],
+                            "description": node["description"]["value"],
+                            "enabled": node["enabled"]["value"],
+                            "status": node["status"]["value"],
+                            "role": node["role"]["value"],
+                            "l2_mode": l2_mode["value"] if l2_mode else None,
+                            "ip_addresses": [
+                                IpAddressData.trusted({"address": ip["node"]["address"]["value"]})
+                                for ip in ip_addresses["edges"]
+                            ]
+                            if ip_addresses
+                            else [],
+                            "vlans": [
+                                VlanData.trusted({"vlan_id": vlan["node"]["vlan_id"]["value"]})
+                                for vlan in tagged_vlan["edges"]
+                            ]
+                            if tagged_vlan
+                            else [],
+                        }
+                    )
+                )
+        return interfaces
+
+    @cached_property
+    def parsed_ip_addresses(self) -> list[tuple[str, ipaddress.IPv4Interface | ipaddress.IPv6Interface]]:
+        """The addresses of the interface with their parsed form, leaving out the ones that do not parse."""
+        parsed = []
+        for ip in self.ip_addresses:
+            try:
+                parsed.append((ip.address, ipaddress.ip_interface(ip.address)))
+            except ValueError:
+                continue
+        return parsed
+
+    @cached_property
+    def ipv4_host_addresses(self) -> list[str]:
+        """
+        The IPv4 addresses of the interface given with an explicit /32, as given. An address without
+        a prefix length is not a host address, although it parses as one.
+        """
+        return [address for address, ip in self.parsed_ip_addresses if ip.version == 4 and address.endswith("/32")]
+
+    @cached_property
+    def ipv6_host_addresses(self) -> list[str]:
+        """The IPv6 addresses of the interface given with an explicit /128, as given."""
+        return [address for address, ip in self.parsed_ip_addresses if ip.version == 6 and address.endswith("/128")]
+
+
+class BgpSessionData(BaseDataModel):
+    status: Literal["active", "provisioning", "maintenance"]
+    local_ip: str
+    remote_ip: str
+    local_as: int
+    remote_as: int
+    peer_group: str
+
+    selection: ClassVar[Selection] = {
+        "status": VALUE,
+        "local_ip": node({"address": VALUE}),
+        "remote_ip": node({"address": VALUE}),
+        "local_as": node({"asn": VALUE}),
+        "remote_as": node({"asn": VALUE}),
+        "peer_group": node({"display_label": None}),
+    }
+
+    @classmethod
+    def create_all(cls, edges: list[dict[str, Any]], validate: bool = True) -> list[Self]:
+        """Builds the BGP sessions of `edges`, from the device query or a page of its sessions."""
+        if validate:
+            return [
+                cls(
                     status=bgp_session["node"]["status"]["value"],
                     local_ip=bgp_session["node"]["local_ip"]["node"]["address"]["value"].replace("/32", ""),
                     remote_ip=bgp_session["node"]["remote_ip"]["node"]["address"]["value"].replace("/32", ""),
@@ -82,8 +175,145 @@ class DeviceData(BaseDataModel):
                     remote_as=bgp_session["node"]["remote_as"]["node"]["asn"]["value"],
                     peer_group=bgp_session["node"]["peer_group"]["node"]["display_label"],
                 )
-                for bgp_session in infra_device["bgp_sessions"]["edges"]
+                for bgp_session in edges
             ]
-            if infra_device.get("bgp_sessions")
-            else [],
+
+        bgp_sessions: list[Self] = []
+        with _gc_paused():
+            for edge in edges:
+                node = edge["node"]
+                bgp_sessions.append(
+                    cls.trusted(
+                        {
+                            "status": node["status"]["value"],
+                            "local_ip": node["local_ip"]["node"]["address"]["value"].replace("/32", ""),
+                            "remote_ip": node["remote_ip"]["node"]["address"]["value"].replace("/32", ""),
+                            "local_as": node["local_as"]["node"]["asn"]["value"],
+                            "remote_as": node["remote_as"]["node"]["asn"]["value"],
+                            "peer_group": node["peer_group"]["node"]["display_label"],
+                        }
+                    )
+                )
+        return bgp_sessions
+
+
+def _site_name(infra_device: dict[str, Any]) -> str | None:
+    site = infra_device.get("site")
+    return site["node"]["name"]["value"] if site and site.get("node") else None
+
+
+def _group_by(items: list[Any], attribute: str) -> dict[str, list[Any]]:
+    groups: defaultdict[str, list[Any]] = defaultdict(list)
+    for item in items:
+        groups[getattr(item, attribute)].append(item)
+    return dict(groups)
+
+
+class DeviceData(BaseDataModel):
+    name: str
+    description: str | None
+    platform: str
+    type: str
+    role: str
+    site: str | None = None
+    interfaces: list[InterfaceData]
+    bgp_sessions: list[BgpSessionData]
+
+    # Fields of the `InfraDevice` node read by `create`, from which the device queries are generated.
+    # `header_selection` leaves out the children, which `assemble` takes already decoded.
+    header_selection: ClassVar[Selection] = {
+        "name": VALUE,
+        "description": VALUE,
+        "role": VALUE,
+        "platform": node({"name": VALUE}),
+        "type": VALUE,
+        "site": node({"name": VALUE}),
+    }
+    selection: ClassVar[Selection] = {
+        **header_selection,
+        "interfaces": edges(InterfaceData.selection),
+        "bgp_sessions": edges(BgpSessionData.selection),
+    }
+
+    # Lookup indexes for the config builders, built on first use. The models are not mutated once
+    # created, so they never need to be invalidated.
+
+    @cached_property
+    def interfaces_by_role(self) -> dict[str, list[InterfaceData]]:
+        return _group_by(self.interfaces, "role")
+
+    @cached_property
+    def router_id(self) -> str:
+        """
+        The first IPv4 host address of the last loopback that has one, without its prefix length,
+        or "" if there is none.
+        """
+        router_id = ""
+        for interface in self.interfaces_by_role.get("loopback", ()):
+            if interface.ipv4_host_addresses:
+                router_id = interface.ipv4_host_addresses[0].removesuffix("/32")
+        return router_id
+
+    @cached_property
+    def active_bgp_sessions(self) -> list[BgpSessionData]:
+        return self.bgp_sessions_by_status.get("active", [])
+
+    @cached_property
+    def bgp_sessions_by_status(self) -> dict[str, list[BgpSessionData]]:
+        return _group_by(self.bgp_sessions, "status")
+
+    @cached_property
+    def active_bgp_sessions_by_peer_group(self) -> dict[str, list[BgpSessionData]]:
+        return _group_by(self.active_bgp_sessions, "peer_group")
+
+    @classmethod
+    def create(cls, infra_device: dict[str, Any], validate: bool = True) -> Self:
+        if not validate:
+            return cls.construct_trusted(infra_device=infra_device)
+
+        return cls.assemble(
+            infra_device=infra_device,
+            interfaces=InterfaceData.create_all(_edges(infra_device, "interfaces")),
+            bgp_sessions=BgpSessionData.create_all(_edges(infra_device, "bgp_sessions")),
         )
+
+    @classmethod
+    def construct_trusted(cls, infra_device: dict[str, Any]) -> Self:
+        """
+        Builds the device data in a single pass over the GraphQL response without validating it.
+
+        Only for data that has already been validated against the schema by Infrahub: field types
+        and literals are not checked, so malformed input gives malformed models instead of errors.
+        The garbage collector is paused meanwhile as none of the objects created can form a cycle.
+        """
+        with _gc_paused():
+            return cls.assemble(
+                infra_device=infra_device,
+                interfaces=InterfaceData.create_all(_edges(infra_device, "interfaces"), validate=False),
+                bgp_sessions=BgpSessionData.create_all(_edges(infra_device, "bgp_sessions"), validate=False),
+                validate=False,
+            )
+
+    @classmethod
+    def assemble(
+        cls,
+        infra_device: dict[str, Any],
+        interfaces: list[InterfaceData],
+        bgp_sessions: list[BgpSessionData],
+        validate: bool = True,
+    ) -> Self:
+        """
+        Builds the device data from the fields of `header_selection` in `infra_device` and children
+        already decoded, such as the ones fetched page by page.
+        """
+        values = {
+            "name": infra_device["name"]["value"],
+            "description": infra_device["description"]["value"],
+            "platform": infra_device["platform"]["node"]["name"]["value"],
+            "type": infra_device["type"]["value"],
+            "role": infra_device["role"]["value"],
+            "site": _site_name(infra_device),
+            "interfaces": interfaces,
+            "bgp_sessions": bgp_sessions,
+        }
+        return cls(**values) if validate else cls.trusted(values)
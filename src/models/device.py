@@ -1,35 +1,183 @@
-from typing import Any, Self
+import os
+import sys
+from functools import cached_property
+from typing import Any, Iterator, Self
 
 import yaml
 
-from ..helpers.merge import deep_merge
+from ..helpers import emit, merge, templates
+from ..helpers.delta import diff_trees
+from ..helpers.emit import OUTPUT_FORMATS, dump_yaml
+from ..helpers.metrics import metrics
+from ..helpers.render_store import RenderStore, render_fingerprint, source_digest
+from ..helpers.templates import YAML_LOADER, TemplateEntry, template_cache
+from . import base, config, data
 from .base import BaseDeviceConfigModel
 from .config import DeviceConfig
 from .data import DeviceData
 
+# Version of the code a render depends on, part of every render fingerprint: the models, the template
+# loading, merging and serialisation. Platform builders are hashed from their source files, so that
+# computing it does not import them. Deltas are not stored, so the delta code is left out.
+RENDER_CODE_VERSION = source_digest(
+    base, config, data, emit, merge, templates, sys.modules[__name__], *config.platforms.source_paths()
+)
+
 
 class Device:
-    def __init__(self, device_data: DeviceData, templates_path: str) -> None:
+    def __init__(self, device_data: DeviceData, templates_path: str, validate_config: bool = False) -> None:
         self._templates_path: str = templates_path
         self._device_data: DeviceData = device_data
-        self._device_config: BaseDeviceConfigModel = DeviceConfig.create(device_data)
+        self._validate_config: bool = validate_config
         self.name: str = device_data.name
         self.type: str = device_data.type
         self.role: str = device_data.role
 
     @classmethod
-    def create(cls, data: dict[str, Any], templates_path: str) -> Self:
+    def create(
+        cls, data: dict[str, Any], templates_path: str, validate: bool = True, validate_config: bool = False
+    ) -> Self:
         infra_device: dict[str, Any] = data["InfraDevice"]["edges"][0]["node"]
-        device_data: DeviceData = DeviceData.create(infra_device=infra_device)
-        return cls(device_data=device_data, templates_path=templates_path)
+        device_data: DeviceData = cls.decode(infra_device=infra_device, validate=validate)
+        return cls(device_data=device_data, templates_path=templates_path, validate_config=validate_config)
+
+    @classmethod
+    def create_all(
+        cls, data: dict[str, Any], templates_path: str, validate: bool = True, validate_config: bool = False
+    ) -> Iterator[Self]:
+        for edge in data["InfraDevice"]["edges"]:
+            device_data: DeviceData = cls.decode(infra_device=edge["node"], validate=validate)
+            yield cls(device_data=device_data, templates_path=templates_path, validate_config=validate_config)
+
+    @staticmethod
+    def decode(infra_device: dict[str, Any], validate: bool = True) -> DeviceData:
+        with metrics.stage("decode") as stage:
+            device_data: DeviceData = DeviceData.create(infra_device=infra_device, validate=validate)
+            stage.device = device_data.name
+            stage.size(interfaces=len(device_data.interfaces), bgp_sessions=len(device_data.bgp_sessions))
+        return device_data
+
+    @property
+    def template_path(self) -> str:
+        return f"{self._templates_path}/{self.role}.yaml"
+
+    @property
+    def template_layers(self) -> list[str]:
+        """
+        The templates merged for the device, each overriding the previous ones: global, role,
+        platform, site and device. Layers without a template file are skipped, except the role
+        template, without which the device has no config.
+        """
+        platform = self._device_data.platform.lower().replace(" ", "-")
+        layers = [f"{self._templates_path}/global.yaml", self.template_path]
+        layers.append(f"{self._templates_path}/platforms/{platform}.yaml")
+        if self._device_data.site:
+            layers.append(f"{self._templates_path}/sites/{self._device_data.site}.yaml")
+        layers.append(f"{self._templates_path}/devices/{self.name}.yaml")
+        return layers
 
-    def yaml_config(self) -> dict[str, Any]:
-        config = self._device_config.dict(by_alias=True, exclude_defaults=True)
+    def template(self) -> TemplateEntry:
+        """Returns the merged template layers, raising FileNotFoundError without a role template."""
+        return template_cache.stack(self.template_layers, required=(self.template_path,))
 
+    @property
+    def template_dependencies(self) -> list[str]:
+        """The template layers of the device relative to the templates directory, for the dependency index."""
+        return [os.path.relpath(layer, self._templates_path) for layer in self.template_layers]
+
+    @cached_property
+    def device_config(self) -> BaseDeviceConfigModel:
+        return DeviceConfig.create(self._device_data)
+
+    def config(self) -> dict[str, Any]:
+        """
+        Returns the device config to merge into the template. It is emitted directly by the config
+        builders, or built and validated through the config models when `validate_config` is set.
+        """
+        with metrics.stage("config", device=self.name):
+            if self._validate_config:
+                return self.device_config.model_dump(by_alias=True, exclude_defaults=True)
+            return DeviceConfig.emit(self._device_data)
+
+    def fingerprint(self) -> str:
+        """
+        Returns a fingerprint of everything the rendered config depends on: the device data,
+        the template content and the render code.
+        """
         try:
-            with open(f"{self._templates_path}/{self.role}.yaml", "r") as file:
-                template = yaml.safe_load(file)
+            template_digest = self.template().digest
         except FileNotFoundError:
-            return "---"
+            template_digest = ""
+
+        return render_fingerprint(self._device_data.model_dump(mode="json"), template_digest, RENDER_CODE_VERSION)
+
+    def yaml_config(self, render_store: RenderStore | None = None) -> str:
+        return self.output(output_format="yaml", render_store=render_store)
+
+    def json_config(self, render_store: RenderStore | None = None) -> str:
+        return self.output(output_format="json", render_store=render_store)
+
+    def msgpack_config(self, render_store: RenderStore | None = None) -> bytes:
+        return self.output(output_format="msgpack", render_store=render_store)
+
+    def output(self, output_format: str = "yaml", render_store: RenderStore | None = None) -> str | bytes:
+        """
+        Returns the config serialised in one of `OUTPUT_FORMATS`. Every format is serialised from
+        the same merged tree; YAML reuses the cached fragments of the template sections.
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r}, expected one of {', '.join(OUTPUT_FORMATS)}")
+
+        def render() -> str | bytes:
+            return self._render(output_format)[1]
+
+        if render_store is None:
+            return render()
+
+        # YAML renders are stored under the device name, which the delta output diffs against.
+        key = self.name if output_format == "yaml" else f"{self.name}.{output_format}"
+        return render_store.render(key=key, fingerprint=self.fingerprint(), render=render)
+
+    def yaml_delta(self, render_store: RenderStore) -> str:
+        """
+        Returns the changes to the config since the last render stored for the device, as YAML
+        operations from `diff_trees`. The full config is rendered and stored, to diff the next
+        render against, and an empty list is returned when the inputs have not changed.
+        Without a previous render, the delta replaces the whole config.
+        """
+        fingerprint = self.fingerprint()
+        previous = render_store.last(self.name)
+        if previous is not None and previous[0] == fingerprint:
+            render_store.stats.skipped += 1
+            return dump_yaml([])
+
+        merged, output = self._render()
+        render_store.put(self.name, fingerprint, output)
+        render_store.stats.rendered += 1
+
+        with metrics.stage("delta", device=self.name) as stage:
+            old = yaml.load(previous[1], Loader=YAML_LOADER) if previous is not None else None
+            operations = diff_trees(old, merged)
+            stage.size(operations=len(operations))
+            return dump_yaml(operations)
+
+    def _render(self, output_format: str = "yaml") -> tuple[dict[str, Any] | None, str | bytes]:
+        """Returns the merged config tree and its serialisation."""
+        with metrics.stage("template", device=self.name) as stage:
+            try:
+                template = self.template()
+            except FileNotFoundError:
+                return None, "---" if output_format == "yaml" else OUTPUT_FORMATS[output_format](None)
+            emitter = template.emitter()
+            stage.size(template_bytes=template.size)
+
+        config = self.config()
+
+        with metrics.stage("merge", device=self.name):
+            merged = emitter.template.merge(config)
+
+        with metrics.stage("dump", device=self.name) as stage:
+            output = emitter.dump(merged) if output_format == "yaml" else OUTPUT_FORMATS[output_format](merged)
+            stage.size(output_bytes=len(output))
 
-        return yaml.dump(deep_merge(template, config), sort_keys=False)
+        return merged, output
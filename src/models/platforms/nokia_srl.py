@@ -0,0 +1,271 @@
+from typing import Any, Literal, Self
+
+from pydantic import Field
+from typing_extensions import Annotated
+
+from ..base import BaseConfigModel, BaseDeviceConfigModel
+from ..data import DeviceData
+
+
+class NokiaVlanIdConfig(BaseConfigModel):
+    vlan_id: Annotated[int, Field(None, alias="vlan-id")]
+
+
+class NokiaEncapConfig(BaseConfigModel):
+    single_tagged: Annotated[NokiaVlanIdConfig, Field(None, alias="single-tagged")]
+
+
+class NokiaVlanConfig(BaseConfigModel):
+    encap: NokiaEncapConfig
+
+
+class NokiaIpPrefixConfig(BaseConfigModel):
+    ip_prefix: Annotated[str, Field(None, alias="ip-prefix")]
+
+
+class NokiaIpAddressConfig(BaseConfigModel):
+    address: list[NokiaIpPrefixConfig]
+
+
+class NokiaSubinterfaceConfig(BaseConfigModel):
+    match_field: str = "index"
+    index: int
+    type: Literal["bridged"] | None = None
+    admin_state: Annotated[Literal["enable", "disable"] | None, Field(None, alias="admin-state")] = None
+    vlan: NokiaVlanConfig | None = None
+    ipv4: NokiaIpAddressConfig | None = None
+    ipv6: NokiaIpAddressConfig | None = None
+
+
+class NokiaInterfaceConfig(BaseConfigModel):
+    match_field: str = "name"
+    name: str
+    description: str = ""
+    admin_state: Annotated[Literal["enable", "disable"] | None, Field(None, alias="admin-state")] = None
+    vlan_tagging: Annotated[bool | None, Field(None, alias="vlan-tagging")] = None
+    subinterface: list[NokiaSubinterfaceConfig] | None = None
+
+    @classmethod
+    def create(cls, device_data: DeviceData) -> list[Self]:
+        interfaces: list[Self] = []
+
+        for interface in device_data.interfaces:
+            match interface.role:
+                case "uplink":
+                    interfaces.append(
+                        cls(
+                            name=interface.name,
+                            description=interface.description or "",
+                            admin_state="enable" if interface.status == "active" else "disable",
+                        )
+                    )
+                case "loopback":
+                    interfaces.append(
+                        cls(
+                            name=interface.name,
+                            subinterface=[
+                                NokiaSubinterfaceConfig(
+                                    index=0,
+                                    ipv4=NokiaIpAddressConfig(
+                                        address=[
+                                            NokiaIpPrefixConfig(
+                                                ip_prefix=address,
+                                            )
+                                            for address in interface.ipv4_host_addresses
+                                        ]
+                                    ),
+                                    ipv6=NokiaIpAddressConfig(
+                                        address=[
+                                            NokiaIpPrefixConfig(
+                                                ip_prefix=address,
+                                            )
+                                            for address in interface.ipv6_host_addresses
+                                        ]
+                                    ),
+                                )
+                            ],
+                        )
+                    )
+
+        return interfaces
+
+    @classmethod
+    def emit(cls, device_data: DeviceData) -> list[dict[str, Any]]:
+        interfaces: list[dict[str, Any]] = []
+
+        for interface in device_data.interfaces:
+            match interface.role:
+                case "uplink":
+                    config: dict[str, Any] = {"name": interface.name}
+                    if interface.description:
+                        config["description"] = interface.description
+                    config["admin-state"] = "enable" if interface.status == "active" else "disable"
+                    interfaces.append(config)
+                case "loopback":
+                    interfaces.append(
+                        {
+                            "name": interface.name,
+                            "subinterface": [
+                                {
+                                    "index": 0,
+                                    "ipv4": {
+                                        "address": [{"ip-prefix": address} for address in interface.ipv4_host_addresses]
+                                    },
+                                    "ipv6": {
+                                        "address": [{"ip-prefix": address} for address in interface.ipv6_host_addresses]
+                                    },
+                                }
+                            ],
+                        }
+                    )
+
+        return interfaces
+
+
+class NokiaIsisInstanceConfig(BaseConfigModel):
+    name: str
+    net: list[str]
+
+
+class NokiaIsisConfig(BaseConfigModel):
+    instance: list[NokiaIsisInstanceConfig]
+
+
+class NokiaBgpNeighborConfig(BaseConfigModel):
+    peer_address: Annotated[str, Field(None, alias="peer-address")]
+    admin_state: Annotated[Literal["enable", "disable"], Field(None, alias="admin-state")]
+    peer_group: Annotated[str, Field(None, alias="peer-group")]
+
+
+class NokiaBgpGroupConfig(BaseConfigModel):
+    group_name: Annotated[str, Field(None, alias="group-name")]
+    peer_as: Annotated[int, Field(None, alias="peer-as")]
+
+
+class NokiaBgpConfig(BaseConfigModel):
+    router_id: Annotated[str, Field(None, alias="router-id")]
+    autonomous_system: Annotated[int, Field(None, alias="autonomous-system")]
+    neighbor: list[NokiaBgpNeighborConfig]
+    group: list[NokiaBgpGroupConfig]
+
+
+class NokiaProtocolsConfig(BaseConfigModel):
+    bgp: Annotated[NokiaBgpConfig, Field(None, alias="srl_nokia-bgp:bgp")]
+    isis: Annotated[NokiaIsisConfig, Field(None, alias="srl_nokia-isis:isis")]
+
+
+class NokiaNetworkInstanceConfig(BaseConfigModel):
+    match_field: str = "name"
+    name: str
+    protocols: NokiaProtocolsConfig
+
+    @classmethod
+    def create(cls, device_data: DeviceData) -> list[Self]:
+        network_instances: list[Self] = []
+        router_id = ""
+        isis_net_id = ""
+
+        for interface in device_data.interfaces:
+            if interface.role == "loopback":
+                for address in interface.ipv4_host_addresses:
+                    router_id = address.removesuffix("/32")
+                    last_octet = router_id.split(".")[-1]
+                    isis_net_id = f"49.0001.0000.0000.{last_octet.zfill(4)}.00"
+                    break
+
+        # One group per peer group, the last active session of the group setting its peer AS.
+        groups: dict[str, NokiaBgpGroupConfig] = {}
+        for bgp_session in device_data.bgp_sessions:
+            if bgp_session.status == "active":
+                groups[bgp_session.peer_group] = NokiaBgpGroupConfig(
+                    group_name=bgp_session.peer_group,
+                    peer_as=bgp_session.remote_as,
+                )
+
+        if device_data.bgp_sessions:
+            network_instances.append(
+                cls(
+                    name="default",
+                    protocols=NokiaProtocolsConfig(
+                        isis=NokiaIsisConfig(
+                            instance=[NokiaIsisInstanceConfig(name="ISIS", net=[isis_net_id])],
+                        ),
+                        bgp=NokiaBgpConfig(
+                            router_id=router_id,
+                            autonomous_system=device_data.bgp_sessions[0].local_as,
+                            group=list(groups.values()),
+                            neighbor=[
+                                NokiaBgpNeighborConfig(
+                                    admin_state="enable",
+                                    peer_address=bgp_session.remote_ip.replace("/128", ""),
+                                    peer_group=bgp_session.peer_group,
+                                )
+                                for bgp_session in device_data.bgp_sessions
+                                if bgp_session.status == "active"
+                            ],
+                        ),
+                    ),
+                )
+            )
+
+        return network_instances
+
+    @classmethod
+    def emit(cls, device_data: DeviceData) -> list[dict[str, Any]]:
+        network_instances: list[dict[str, Any]] = []
+        router_id = device_data.router_id
+        isis_net_id = f"49.0001.0000.0000.{router_id.split('.')[-1].zfill(4)}.00" if router_id else ""
+
+        if device_data.bgp_sessions:
+            network_instances.append(
+                {
+                    "name": "default",
+                    "protocols": {
+                        "srl_nokia-bgp:bgp": {
+                            "router-id": router_id,
+                            "autonomous-system": device_data.bgp_sessions[0].local_as,
+                            "neighbor": [
+                                {
+                                    "peer-address": bgp_session.remote_ip.replace("/128", ""),
+                                    "admin-state": "enable",
+                                    "peer-group": bgp_session.peer_group,
+                                }
+                                for bgp_session in device_data.active_bgp_sessions
+                            ],
+                            # One group per peer group; the last session wins, as when merging one group per session.
+                            "group": [
+                                {
+                                    "group-name": peer_group,
+                                    "peer-as": bgp_sessions[-1].remote_as,
+                                }
+                                for peer_group, bgp_sessions in device_data.active_bgp_sessions_by_peer_group.items()
+                            ],
+                        },
+                        "srl_nokia-isis:isis": {
+                            "instance": [{"name": "ISIS", "net": [isis_net_id]}],
+                        },
+                    },
+                }
+            )
+
+        return network_instances
+
+
+class NokiaDeviceConfig(BaseDeviceConfigModel):
+    interface: Annotated[list[NokiaInterfaceConfig], Field(None, alias="srl_nokia-interfaces:interface")]
+    network_instance: Annotated[
+        list[NokiaNetworkInstanceConfig], Field(None, alias="srl_nokia-network-instance:network-instance")
+    ]
+
+    @classmethod
+    def create(cls, device_data: DeviceData) -> Self:
+        interface: list[NokiaInterfaceConfig] = NokiaInterfaceConfig.create(device_data=device_data)
+        network_instance: list[NokiaNetworkInstanceConfig] = NokiaNetworkInstanceConfig.create(device_data=device_data)
+        return cls(interface=interface, network_instance=network_instance)
+
+    @classmethod
+    def emit(cls, device_data: DeviceData) -> dict[str, Any]:
+        return {
+            "srl_nokia-interfaces:interface": NokiaInterfaceConfig.emit(device_data=device_data),
+            "srl_nokia-network-instance:network-instance": NokiaNetworkInstanceConfig.emit(device_data=device_data),
+        }
@@ -0,0 +1,141 @@
+"""
+Generates the device queries from the fields the data models read, and checks the checked-in ones.
+
+    python -m src.models.queries [--check]
+
+Without `--check` the `.gql` files are rewritten. With it, nothing is written and the command fails
+if a checked-in query selects a field the models do not read (over-fetch) or misses one they read.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from graphql import FieldNode, GraphQLSyntaxError, OperationDefinitionNode, parse
+
+from ..helpers.queries import Selection, edges, format_selection, parse_selection, selection_paths
+from .data import BgpSessionData, DeviceData, InterfaceData
+
+QUERIES_PATH = Path(__file__).resolve().parents[1] / "queries"
+
+
+@dataclass
+class DeviceQuery:
+    """
+    A query of `root` nodes whose node selection is `node_selection`, by default `InfraDevice`
+    nodes read by `DeviceData`.
+    """
+
+    name: str
+    operation: str
+    variables: str
+    arguments: str
+    fields: Selection = field(default_factory=dict)
+    root: str = "InfraDevice"
+    node_selection: Selection = field(default_factory=lambda: DeviceData.selection)
+
+    @property
+    def path(self) -> Path:
+        return QUERIES_PATH / f"{self.name}.gql"
+
+    @property
+    def selection(self) -> Selection:
+        """Selection of the root field."""
+        return {**self.fields, **edges(self.node_selection)}
+
+    def generate(self) -> str:
+        lines = [
+            f"query {self.operation}({self.variables}) {{",
+            f"  {self.root}({self.arguments}) {{",
+            *format_selection(self.selection, indent=2),
+            "  }",
+            "}",
+        ]
+        return "\n".join(lines)
+
+    def check(self) -> list[str]:
+        """Returns a description of every difference between the checked-in query and the generated one."""
+        try:
+            text = self.path.read_text()
+            document = parse(text)
+        except (OSError, GraphQLSyntaxError) as exc:
+            return [f"{self.path.name}: {exc}"]
+
+        duplicates: list[str] = []
+        selection: Selection = {}
+        for definition in document.definitions:
+            if isinstance(definition, OperationDefinitionNode):
+                for root in definition.selection_set.selections:
+                    if isinstance(root, FieldNode) and root.name.value == self.root and root.selection_set:
+                        selection = parse_selection(root.selection_set, duplicates)
+
+        expected = selection_paths(self.selection)
+        actual = selection_paths(selection)
+        problems = [f"{self.path.name}: over-fetches {path}" for path in sorted(actual - expected)]
+        problems += [f"{self.path.name}: misses {path}" for path in sorted(expected - actual)]
+        problems += [f"{self.path.name}: selects {path} more than once" for path in duplicates]
+        if not problems and text != self.generate():
+            problems.append(f"{self.path.name}: differs from the generated query")
+        return problems
+
+
+DEVICE_QUERIES = [
+    DeviceQuery(
+        name="device_query", operation="DeviceQuery", variables="$device: String!", arguments="name__value: $device"
+    ),
+    DeviceQuery(
+        name="device_bulk_query",
+        operation="DeviceBulkQuery",
+        variables="$offset: Int, $limit: Int",
+        arguments="offset: $offset, limit: $limit",
+        fields={"count": None},
+    ),
+    # The paged fetch mode: the device without its children, then pages of interfaces and BGP sessions.
+    DeviceQuery(
+        name="device_header_query",
+        operation="DeviceHeaderQuery",
+        variables="$device: String!",
+        arguments="name__value: $device",
+        node_selection=DeviceData.header_selection,
+    ),
+    DeviceQuery(
+        name="device_interfaces_query",
+        operation="DeviceInterfacesQuery",
+        variables="$device: String!, $offset: Int, $limit: Int",
+        arguments="device__name__value: $device, offset: $offset, limit: $limit",
+        fields={"count": None},
+        root="InfraInterface",
+        node_selection=InterfaceData.selection,
+    ),
+    DeviceQuery(
+        name="device_bgp_sessions_query",
+        operation="DeviceBgpSessionsQuery",
+        variables="$device: String!, $offset: Int, $limit: Int",
+        arguments="device__name__value: $device, offset: $offset, limit: $limit",
+        fields={"count": None},
+        root="InfraBGPSession",
+        node_selection=BgpSessionData.selection,
+    ),
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Check the checked-in queries instead of writing them.")
+    args = parser.parse_args()
+
+    if not args.check:
+        for query in DEVICE_QUERIES:
+            query.path.write_text(query.generate())
+            print(f"Generated {query.path}")
+        return 0
+
+    problems = [problem for query in DEVICE_QUERIES for problem in query.check()]
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import logging
 
 from lib.example import print_nodes
+from lib.schema_cache import schema_cache
 
 from infrahub_sdk import InfrahubClient
 
@@ -11,5 +12,5 @@ async def run(
     branch: str,
 ):
     log.info(f"Running example script on {branch}...")
-    nodes = await client.schema.all()
+    nodes = await schema_cache.load(client, branch=branch)
     print_nodes(log, nodes)
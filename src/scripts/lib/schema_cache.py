@@ -0,0 +1,221 @@
+"""
+Fetches the schema of a branch into the on-disk schema cache, to warm it before running scripts.
+
+    python -m src.scripts.lib.schema_cache [--branch BRANCH] [--namespace NAMESPACE ...]
+
+Scripts import it as `lib.schema_cache`, as `infrahubctl run` puts the directory of the script on
+the import path.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+from dataclasses import dataclass
+from typing import Any, MutableMapping
+from urllib.parse import quote, urlencode
+
+from infrahub_sdk import InfrahubClient
+from infrahub_sdk.exceptions import BranchNotFoundError
+from infrahub_sdk.schema import (
+    BranchSchema,
+    GenericSchemaAPI,
+    MainSchemaTypesAPI,
+    NodeSchemaAPI,
+    ProfileSchemaAPI,
+    TemplateSchemaAPI,
+)
+
+# Directory of the on-disk schema cache, relative to the working directory unless absolute.
+SCHEMA_CACHE_PATH = os.getenv("INFRAHUB_SCHEMA_CACHE", ".schema_cache")
+
+# Sections of an `/api/schema` response, each a list of schemas with their `namespace`, and their schema type.
+SCHEMA_SECTIONS = {
+    "nodes": NodeSchemaAPI,
+    "generics": GenericSchemaAPI,
+    "profiles": ProfileSchemaAPI,
+    "templates": TemplateSchemaAPI,
+}
+
+
+async def fetch_schema_hash(client: InfrahubClient, branch: str) -> str | None:
+    """
+    Returns the schema hash of `branch` from `/api/schema/summary`, which returns the hashes of the
+    schema without the schema itself, or None if the client cannot request it.
+
+    The SDK has no public call for the summary, so it is requested with the client's HTTP method,
+    which carries its address and credentials. A client without it, or with a different one, does
+    not fail: the schema is then fetched every time, as without the schema cache.
+    """
+    get = getattr(client, "_get", None)
+    if get is None:
+        return None
+    try:
+        response = await get(url=f"{client.address}/api/schema/summary?{urlencode({'branch': branch})}")
+    except TypeError:
+        return None
+    if response.status_code == 400:
+        raise BranchNotFoundError(
+            identifier=branch, message=f"The requested branch was not found on the server [{branch}]"
+        )
+    response.raise_for_status()
+    return response.json().get("main") or None
+
+
+async def fetch_schema(client: InfrahubClient, branch: str, namespaces: list[str] | None) -> dict[str, Any]:
+    """
+    Returns the schema of `branch`, limited to `namespaces` when given, in the form of an
+    `/api/schema` response. The schema is fetched with the public SDK call, which keeps the hash of
+    the schema in the client's schema cache only.
+    """
+    nodes = await client.schema.fetch(branch=branch, namespaces=namespaces)
+    sections = {schema_type: section for section, schema_type in SCHEMA_SECTIONS.items()}
+    data: dict[str, Any] = {"main": client.schema.cache[branch].hash, **_empty_part()}
+    for schema in nodes.values():
+        data[sections[type(schema)]].append(schema.model_dump(mode="json"))
+    return data
+
+
+@dataclass
+class SchemaCacheStats:
+    hits: int = 0
+    fetches: int = 0
+
+
+def _empty_part() -> dict[str, list]:
+    return {section: [] for section in SCHEMA_SECTIONS}
+
+
+class SchemaCache:
+    """
+    On-disk cache of the schema of each branch, one file per namespace, under a directory per
+    branch and schema hash.
+
+    Loading revalidates the cache with the schema hash of the branch, from `fetch_schema_hash`.
+    While the hash is unchanged, the namespaces are read from disk and nothing else is fetched; once
+    it changes, the namespaces are fetched again under the new hash and the previous ones are
+    removed. Only the namespaces asked for are fetched and read, so a script using a couple of them
+    does not pay for the rest. When the hash cannot be requested, the namespaces are always fetched.
+    """
+
+    def __init__(self, path: str = SCHEMA_CACHE_PATH) -> None:
+        self.path: str = path
+        self.stats: SchemaCacheStats = SchemaCacheStats()
+
+    async def load(
+        self, client: InfrahubClient, branch: str | None = None, namespaces: list[str] | None = None
+    ) -> MutableMapping[str, MainSchemaTypesAPI]:
+        """
+        Returns the schemas of `namespaces` in `branch` by kind, every namespace when none is given,
+        and adds them to the schema cache of `client` so that its queries do not fetch them again.
+        """
+        branch = branch or client.default_branch
+        # Fetching replaces the client's schema of the branch, the namespaces it has are kept below.
+        cached = client.schema.cache.get(branch)
+        schema_hash = await self.schema_hash(client, branch)
+        directory = None if schema_hash is None else self._directory(branch, schema_hash)
+
+        wanted = namespaces or (None if directory is None else self._read_index(directory))
+        data: dict[str, Any] = {"main": schema_hash, **_empty_part()}
+        missing: list[str] | None = None if wanted is None else []
+        for namespace in wanted or ():
+            part = None if directory is None else self._read(directory, namespace)
+            if part is None:
+                missing.append(namespace)
+                continue
+            for section in SCHEMA_SECTIONS:
+                data[section].extend(part[section])
+
+        if missing is None or missing:
+            fetched = await self._fetch(client, branch, missing)
+            self._store(branch, fetched, namespaces=missing)
+            if schema_hash is not None and fetched["main"] != schema_hash:
+                # The schema changed since its hash was checked: the namespaces read from disk are stale.
+                return await self.load(client, branch=branch, namespaces=namespaces)
+            for section in SCHEMA_SECTIONS:
+                data[section].extend(fetched[section])
+            data["main"] = fetched["main"]
+        else:
+            self.stats.hits += 1
+
+        schema = BranchSchema.from_api_response(data=data)
+        if cached is not None and cached.hash == schema.hash:
+            # Namespaces loaded earlier for the same schema stay in the client's cache.
+            client.schema.set_cache(BranchSchema(hash=schema.hash, nodes={**cached.nodes, **schema.nodes}), branch)
+        else:
+            client.schema.set_cache(schema, branch)
+        return schema.nodes
+
+    async def schema_hash(self, client: InfrahubClient, branch: str) -> str | None:
+        return await fetch_schema_hash(client, branch)
+
+    def clear(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    async def _fetch(self, client: InfrahubClient, branch: str, namespaces: list[str] | None) -> dict[str, Any]:
+        self.stats.fetches += 1
+        return await fetch_schema(client, branch, namespaces)
+
+    def _store(self, branch: str, data: dict[str, Any], namespaces: list[str] | None) -> None:
+        """Writes the namespaces of `data`, and the index of every namespace when it is the whole schema."""
+        directory = self._directory(branch, data["main"])
+        os.makedirs(directory, exist_ok=True)
+
+        # Namespaces asked for but without any schema are stored empty, so that they are not fetched again.
+        parts = {namespace: _empty_part() for namespace in namespaces or ()}
+        for section in SCHEMA_SECTIONS:
+            for schema in data[section]:
+                parts.setdefault(schema["namespace"], _empty_part())[section].append(schema)
+
+        for namespace, part in parts.items():
+            self._write(os.path.join(directory, f"{quote(namespace, safe='')}.json"), part)
+        if namespaces is None:
+            self._write(os.path.join(directory, "index.json"), sorted(parts))
+
+        # Schemas cached under a previous hash of the branch are stale.
+        for entry in os.scandir(os.path.dirname(directory)):
+            if entry.is_dir() and entry.path != directory:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _directory(self, branch: str, schema_hash: str) -> str:
+        return os.path.join(self.path, quote(branch, safe=""), schema_hash)
+
+    def _read_index(self, directory: str) -> list[str] | None:
+        try:
+            with open(os.path.join(directory, "index.json")) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def _read(self, directory: str, namespace: str) -> dict[str, list] | None:
+        try:
+            with open(os.path.join(directory, f"{quote(namespace, safe='')}.json")) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _write(path: str, content: Any) -> None:
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(content, file)
+        os.replace(f"{path}.tmp", path)
+
+
+schema_cache = SchemaCache()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--branch", help="Branch to fetch the schema of, the default branch when not given.")
+    parser.add_argument("--namespace", action="append", help="Namespace to fetch, every namespace when not given.")
+    args = parser.parse_args()
+
+    nodes = asyncio.run(schema_cache.load(InfrahubClient(), branch=args.branch, namespaces=args.namespace))
+    print(f"{len(nodes)} schemas cached in {schema_cache.path} ({schema_cache.stats})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,311 @@
-from typing import Any
+"""
+Renders every device of a branch from Infrahub, paging through the devices with the bulk query.
 
+    python -m src.transforms.device_transform [--branch BRANCH] [--output DIRECTORY] [--format yaml|json]
+
+Every device is written to `<output>/<device name>.<format>`.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+from infrahub_sdk import InfrahubClient
+from infrahub_sdk.node import InfrahubNode
 from infrahub_sdk.transforms import InfrahubTransform
 
+from ..helpers.dependencies import DependencyIndex, node_ids, open_dependency_index
+from ..helpers.metrics import metrics
+from ..helpers.pages import fetch_pages
+from ..helpers.query_cache import QUERY_AT, query_cache, repository_commit
+from ..helpers.render_store import RenderStore, open_render_store
+from ..helpers.templates import template_cache
+from ..models.config import platforms
+from ..models.data import BgpSessionData, DeviceData, InterfaceData
 from ..models.device import Device
 
+log = logging.getLogger(__name__)
+
+DEVICE_PAGE_SIZE = 100
+
+# Path of the persistent store used to skip renders whose inputs have not changed, disabled when unset.
+RENDER_STORE_PATH = os.getenv("DEVICE_RENDER_STORE", "")
+
+# Path of the index of the objects and templates each device was rendered from, disabled when unset.
+DEPENDENCY_INDEX_PATH = os.getenv("DEVICE_DEPENDENCY_INDEX", "")
+
+# Query responses have been validated against the schema by Infrahub, set to skip re-validating them.
+TRUSTED_INPUT = os.getenv("DEVICE_TRUSTED_INPUT", "").lower() in ("1", "true", "yes")
+
+# Build the device config through the validating config models instead of emitting it directly, for debugging.
+VALIDATE_CONFIG = os.getenv("DEVICE_VALIDATE_CONFIG", "").lower() in ("1", "true", "yes")
+
+# "full" returns the whole config, "delta" the changes since the device was last rendered, which needs the render store.
+OUTPUT_MODE = os.getenv("DEVICE_OUTPUT_MODE", "full")
+
+# "single" fetches a device with all its children in one response. "paged" fetches the device alone,
+# then its interfaces and BGP sessions page by page, for devices with thousands of them.
+FETCH_MODE = os.getenv("DEVICE_FETCH_MODE", "single")
+
+# Interfaces or BGP sessions per page in the paged fetch mode, and pages in flight per relationship.
+CHILD_PAGE_SIZE = int(os.getenv("DEVICE_CHILD_PAGE_SIZE", "500"))
+FETCH_CONCURRENCY = int(os.getenv("DEVICE_FETCH_CONCURRENCY", "4"))
+
+# Platform builders to import when the transform is loaded rather than on first use: comma-separated names, or "all".
+WARM_PLATFORMS = os.getenv("DEVICE_WARM_PLATFORMS", "")
+
+if WARM_PLATFORMS == "all":
+    platforms.warm()
+elif WARM_PLATFORMS:
+    platforms.warm(*(platform.strip() for platform in WARM_PLATFORMS.split(",")))
+
 
 class DeviceTransformYaml(InfrahubTransform):
-    query: str = "device_query"
+    query: str = "device_header_query" if FETCH_MODE == "paged" else "device_query"
+    bulk_query: str = "device_bulk_query"
+    interfaces_query: str = "device_interfaces_query"
+    bgp_sessions_query: str = "device_bgp_sessions_query"
     url: str = "device-yaml"
+    render_store_path: str = RENDER_STORE_PATH
+    dependency_index_path: str = DEPENDENCY_INDEX_PATH
+    trusted_input: bool = TRUSTED_INPUT
+    validate_config: bool = VALIDATE_CONFIG
+    output_mode: str = OUTPUT_MODE
+    output_format: str = "yaml"
+    fetch_mode: str = FETCH_MODE
+    child_page_size: int = CHILD_PAGE_SIZE
+    fetch_concurrency: int = FETCH_CONCURRENCY
+    at: str | None = QUERY_AT
+
+    @property
+    def templates_path(self) -> str:
+        return f"{self.root_directory}/src/transforms/templates"
+
+    @property
+    def revision(self) -> str | None:
+        """The commit of the repository the transform runs from, which the query responses are cached under."""
+        return repository_commit(self.root_directory)
+
+    @property
+    def render_store(self) -> RenderStore | None:
+        return open_render_store(self.render_store_path) if self.render_store_path else None
+
+    @property
+    def dependency_index(self) -> DependencyIndex | None:
+        return open_dependency_index(self.dependency_index_path) if self.dependency_index_path else None
+
+    async def collect_data(self) -> dict[str, Any]:
+        return await query_cache.query(
+            client=self.client, name=self.query, branch_name=self.branch_name, revision=self.revision, at=self.at
+        )
 
     async def transform(self, data: dict[str, Any]) -> dict[str, Any]:
-        templates_path = f"{self.root_directory}/src/transforms/templates"
-        device: Device = Device.create(data=data, templates_path=templates_path)
-        return device.yaml_config()
+        # The ids of the objects the device is rendered from, collected only to be indexed.
+        object_ids: set[str] | None = None if self.dependency_index is None else set()
+        with metrics.stage("transform") as stage:
+            match self.fetch_mode:
+                case "single":
+                    device: Device = Device.create(
+                        data=data,
+                        templates_path=self.templates_path,
+                        validate=not self.trusted_input,
+                        validate_config=self.validate_config,
+                    )
+                    if object_ids is not None:
+                        object_ids |= node_ids(data)
+                case "paged":
+                    device = Device(
+                        device_data=await self.collect_device(
+                            infra_device=data["InfraDevice"]["edges"][0]["node"], object_ids=object_ids
+                        ),
+                        templates_path=self.templates_path,
+                        validate_config=self.validate_config,
+                    )
+                case _:
+                    raise ValueError(f"Unknown fetch mode {self.fetch_mode!r}, expected single or paged")
+            stage.device = device.name
+            config = self.render(device)
+        self.record_dependencies(device, object_ids)
+        self.log_stats()
+        return config
+
+    def render(self, device: Device) -> str:
+        match self.output_mode:
+            case "full":
+                return device.output(output_format=self.output_format, render_store=self.render_store)
+            case "delta" if self.render_store is not None:
+                return device.yaml_delta(render_store=self.render_store)
+            case "delta":
+                raise ValueError("The delta output mode needs a render store, set DEVICE_RENDER_STORE")
+            case _:
+                raise ValueError(f"Unknown output mode {self.output_mode!r}, expected full or delta")
+
+    def record_dependencies(self, device: Device, object_ids: set[str] | None) -> None:
+        index = self.dependency_index
+        if index is not None and object_ids is not None:
+            index.record(artifact=device.name, object_ids=object_ids, templates=device.template_dependencies)
+
+    def log_stats(self) -> None:
+        log.debug("Template cache: %s", template_cache.stats)
+        if self.render_store is not None:
+            log.debug("Render store: %s", self.render_store.stats)
+
+    async def collect_device(self, infra_device: dict[str, Any], object_ids: set[str] | None = None) -> DeviceData:
+        """
+        Builds the device of a `device_header_query` response, fetching its interfaces and BGP
+        sessions page by page. Both relationships are fetched concurrently and every page is decoded
+        as soon as it arrives, so only the decoded models are kept instead of the whole response.
+        The ids of the nodes fetched are added to `object_ids` when it is given.
+        """
+        name = infra_device["name"]["value"]
+        if object_ids is not None:
+            object_ids |= node_ids(infra_device)
+        with metrics.stage("fetch", device=name) as stage:
+            interfaces, bgp_sessions = await asyncio.gather(
+                self.collect_children(
+                    self.interfaces_query, "InfraInterface", name, InterfaceData.create_all, object_ids
+                ),
+                self.collect_children(
+                    self.bgp_sessions_query, "InfraBGPSession", name, BgpSessionData.create_all, object_ids
+                ),
+            )
+            stage.size(interfaces=len(interfaces), bgp_sessions=len(bgp_sessions))
+            return DeviceData.assemble(
+                infra_device=infra_device,
+                interfaces=interfaces,
+                bgp_sessions=bgp_sessions,
+                validate=not self.trusted_input,
+            )
+
+    async def collect_children(
+        self,
+        query: str,
+        kind: str,
+        device: str,
+        create_all: Callable[[list[dict[str, Any]], bool], list[Any]],
+        object_ids: set[str] | None = None,
+    ) -> list[Any]:
+        """Fetches and decodes the `kind` nodes of `device` with `query`, in the order of the pages."""
+
+        async def fetch_page(offset: int, limit: int) -> dict[str, Any]:
+            data = await query_cache.query(
+                client=self.client,
+                name=query,
+                branch_name=self.branch_name,
+                variables={"device": device, "offset": offset, "limit": limit},
+                revision=self.revision,
+                at=self.at,
+            )
+            return (data.get("data") or data)[kind]
+
+        pages: dict[int, list[Any]] = {}
+        async for offset, edges in fetch_pages(fetch_page, self.child_page_size, self.fetch_concurrency):
+            pages[offset] = create_all(edges, not self.trusted_input)
+            if object_ids is not None:
+                object_ids |= node_ids(edges)
+        return [child for offset in sorted(pages) for child in pages[offset]]
+
+    async def collect_devices(self, offset: int, limit: int) -> dict[str, Any]:
+        """Query one page of devices with the bulk variant of the device query."""
+        data = await query_cache.query(
+            client=self.client,
+            name=self.bulk_query,
+            branch_name=self.branch_name,
+            variables={"offset": offset, "limit": limit},
+            revision=self.revision,
+            at=self.at,
+        )
+        return data.get("data") or data
+
+    async def render_fleet(self, page_size: int = DEVICE_PAGE_SIZE) -> AsyncIterator[tuple[str, str]]:
+        """
+        Render every device, yielding `(device name, config)` as each one completes.
+
+        The next page is requested before the current one is rendered, so fetching and
+        rendering overlap instead of paying one round-trip per device. Each device is decoded and
+        rendered by one call in the default executor, leaving the event loop free to fetch the
+        next page meanwhile; devices are still decoded and rendered one at a time.
+        """
+        offset = 0
+        next_page = asyncio.create_task(self.collect_devices(offset=offset, limit=page_size))
+
+        try:
+            while next_page is not None:
+                data = await next_page
+                edges = data["InfraDevice"]["edges"]
+                offset += len(edges)
+
+                next_page = None
+                if edges and offset < data["InfraDevice"]["count"]:
+                    next_page = asyncio.create_task(self.collect_devices(offset=offset, limit=page_size))
+
+                for edge in edges:
+                    yield await asyncio.to_thread(self.render_fleet_device, edge["node"])
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+        self.log_stats()
+
+    def render_fleet_device(self, infra_device: dict[str, Any]) -> tuple[str, str]:
+        """Decodes and renders one device of a `device_bulk_query` page, returning its name and config."""
+        device = Device(
+            device_data=Device.decode(infra_device=infra_device, validate=not self.trusted_input),
+            templates_path=self.templates_path,
+            validate_config=self.validate_config,
+        )
+        config = self.render(device)
+        if self.dependency_index is not None:
+            self.record_dependencies(device, node_ids(infra_device))
+        return device.name, config
+
+
+class DeviceTransformJson(DeviceTransformYaml):
+    """The same device config as `DeviceTransformYaml`, as compact JSON for machine consumers."""
+
+    url: str = "device-json"
+    output_format: str = "json"
+
+
+async def render_branch(branch: str | None, output: str, output_format: str, page_size: int) -> int:
+    """Renders every device of `branch` into `output`, returning the number of devices rendered."""
+    transform_class = DeviceTransformJson if output_format == "json" else DeviceTransformYaml
+    transform = transform_class(
+        client=InfrahubClient(),
+        infrahub_node=InfrahubNode,
+        branch=branch or "",
+        root_directory=str(Path(__file__).resolve().parents[2]),
+    )
+    directory = Path(output)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    rendered = 0
+    async for name, config in transform.render_fleet(page_size=page_size):
+        (directory / f"{name}.{output_format}").write_text(config)
+        rendered += 1
+    return rendered
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--branch", help="Branch to render, the default branch when not given.")
+    parser.add_argument("--output", default="rendered", help="Directory the device configs are written to.")
+    parser.add_argument("--format", dest="output_format", choices=("yaml", "json"), default="yaml")
+    parser.add_argument("--page-size", type=int, default=DEVICE_PAGE_SIZE, help="Devices fetched per page.")
+    args = parser.parse_args()
+
+    rendered = asyncio.run(
+        render_branch(
+            branch=args.branch, output=args.output, output_format=args.output_format, page_size=args.page_size
+        )
+    )
+    print(f"{rendered} devices rendered into {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import os
+import shlex
 from pathlib import Path
 
 import httpx
@@ -51,9 +52,10 @@ def restart(context: Context, component: str = "") -> None:
 @task
 def load_schema(ctx: Context) -> None:
     """
-    Load schemas into InfraHub using infrahubctl.
+    Load schemas into InfraHub using infrahubctl, and fetch the new schema into the on-disk schema cache.
     """
     ctx.run("infrahubctl schema load schemas")
+    ctx.run("python -m src.scripts.lib.schema_cache")
 
 
 @task
@@ -64,6 +66,118 @@ def test(ctx: Context) -> None:
     ctx.run("pytest tests")
 
 
+@task(
+    help={
+        "update_baseline": "Store the results as the new baseline instead of checking against it.",
+        "tolerance": "Allowed slowdown over the baseline, as a fraction.",
+        "runs": "Runs of the suite whose median is compared with the baseline.",
+    }
+)
+def benchmark(ctx: Context, update_baseline: bool = False, tolerance: float = 0.5, runs: int = 3) -> None:
+    """
+    Run the offline render benchmarks and check them against the stored baseline.
+    """
+    command = f"python -m tests.benchmarks.suite --tolerance {tolerance} --runs {runs}"
+    if update_baseline:
+        command += " --update-baseline"
+    ctx.run(command)
+
+
+@task(help={"check": "Fail if a checked-in query differs from the models instead of rewriting it."})
+def generate_queries(ctx: Context, check: bool = False) -> None:
+    """
+    Generate the device queries from the fields the data models read.
+    """
+    ctx.run("python -m src.models.queries" + (" --check" if check else ""))
+
+
+@task(
+    help={
+        "source": "JSONL file or directory of recorded device_query responses.",
+        "output": "Directory the device configs are written to.",
+        "output_format": "Format of the device configs: yaml, json or msgpack.",
+        "workers": "Number of worker processes, every core when 0.",
+        "trusted": "Skip validating the recorded responses.",
+    }
+)
+def render_fleet(
+    ctx: Context,
+    source: str,
+    output: str = "rendered",
+    output_format: str = "yaml",
+    workers: int = 0,
+    trusted: bool = False,
+) -> None:
+    """
+    Render every device of recorded device_query responses offline, across every core.
+    """
+    command = f"python -m src.helpers.fleet {shlex.quote(source)} --output {shlex.quote(output)}"
+    command += f" --format {shlex.quote(output_format)} --workers {workers}"
+    if trusted:
+        command += " --trusted"
+    ctx.run(command)
+
+
+@task(
+    help={
+        "branch": "Branch to render, the default branch when not given.",
+        "output": "Directory the device configs are written to.",
+        "output_format": "Format of the device configs: yaml or json.",
+        "page_size": "Devices fetched per page.",
+    }
+)
+def render_branch(
+    ctx: Context, branch: str = "", output: str = "rendered", output_format: str = "yaml", page_size: int = 100
+) -> None:
+    """
+    Render every device of a branch from Infrahub, fetching the next page of devices while rendering.
+    """
+    command = f"python -m src.transforms.device_transform --output {shlex.quote(output)}"
+    command += f" --format {shlex.quote(output_format)} --page-size {page_size}"
+    if branch:
+        command += f" --branch {shlex.quote(branch)}"
+    ctx.run(command)
+
+
+@task(
+    help={
+        "listen": "Address to listen on: HOST:PORT, or unix:PATH for a Unix socket.",
+        "trusted": "Skip validating the device_query responses.",
+        "render_store": "Render store to skip unchanged renders.",
+    }
+)
+def render_service(ctx: Context, listen: str = "127.0.0.1:8765", trusted: bool = False, render_store: str = "") -> None:
+    """
+    Serve device renders from a warm process, for interactive and CI use.
+    """
+    command = f"python -m src.helpers.render_service --listen {shlex.quote(listen)}"
+    if trusted:
+        command += " --trusted"
+    if render_store:
+        command += f" --render-store {shlex.quote(render_store)}"
+    ctx.run(command)
+
+
+@task(
+    help={
+        "index": "Dependency index written by the device transform (DEVICE_DEPENDENCY_INDEX).",
+        "branch": "Branch whose changes to look up.",
+        "template": "Changed template, relative to the templates directory.",
+    },
+    iterable=["template"],
+)
+def impacted_devices(ctx: Context, index: str, branch: str = "", template: list[str] | None = None) -> None:
+    """
+    List the devices whose config depends on the objects changed in a branch or on changed templates.
+    """
+    command = f"python -m src.helpers.dependencies {shlex.quote(index)}"
+    if branch:
+        command += f" --branch {shlex.quote(branch)}"
+    for path in template or []:
+        command += f" --template {shlex.quote(path)}"
+    ctx.run(command)
+
+
 @task(help={"override": "Redownload the compose file even if it already exists."})
 def download_compose_file(context: Context, override: bool = False) -> Path:  # noqa ARG001
     """
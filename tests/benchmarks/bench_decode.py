@@ -0,0 +1,40 @@
+"""
+Compares the validating and trusted decode modes of `DeviceData.create` on large synthetic devices.
+
+    python -m tests.benchmarks.bench_decode [--repeat 5]
+"""
+
+import argparse
+import time
+
+from src.models.data import DeviceData
+
+from .synthetic import synthetic_device_node
+
+DEVICE_SIZES = [(48, 4), (512, 128), (4096, 2000)]
+
+
+def measure(infra_device: dict, validate: bool, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        DeviceData.create(infra_device=infra_device, validate=validate)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'interfaces':>12}{'bgp sessions':>14}{'validated (ms)':>16}{'trusted (ms)':>14}{'speedup':>9}")
+    for interfaces, bgp_sessions in DEVICE_SIZES:
+        infra_device = synthetic_device_node(role="spine", interfaces=interfaces, bgp_sessions=bgp_sessions)
+        assert DeviceData.create(infra_device, validate=False) == DeviceData.create(infra_device)
+
+        validated = measure(infra_device, validate=True, repeat=args.repeat)
+        trusted = measure(infra_device, validate=False, repeat=args.repeat)
+        print(f"{interfaces:>12}{bgp_sessions:>14}{validated:>16.3f}{trusted:>14.3f}{validated / trusted:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
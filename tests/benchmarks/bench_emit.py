@@ -0,0 +1,51 @@
+"""
+Compares the serialisation time per device of `yaml.dump` and the fragment-cached template emitter.
+
+    python -m tests.benchmarks.bench_emit [--ports 48] [--repeat 20]
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+from src.helpers.emit import YamlTemplateEmitter, dump_yaml
+from src.helpers.templates import load_compiled_template
+from tests.unit.merge_reference import device_override
+
+TEMPLATES_PATH = Path(__file__).resolve().parents[2] / "src" / "transforms" / "templates"
+
+
+def measure(dump: Callable[[Any], str], merged: Any, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        dump(merged)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ports", type=int, default=48)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    compiled = load_compiled_template(str(TEMPLATES_PATH / "leaf.yaml"))
+    emitter = YamlTemplateEmitter(compiled)
+    merged = compiled.merge(device_override(args.ports))
+    expected = yaml.dump(merged, sort_keys=False)
+    assert dump_yaml(merged) == emitter.dump(merged) == expected
+
+    dumps = (
+        ("yaml.dump", lambda merged: yaml.dump(merged, sort_keys=False)),
+        ("dump_yaml", dump_yaml),
+        ("emitter", emitter.dump),
+    )
+    print(f"{'emitter':<12}{'time per device (ms)':>22}")
+    for label, dump in dumps:
+        print(f"{label:<12}{measure(dump, merged, args.repeat):>22.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compares `deep_merge` and `CompiledTemplate.merge` against the legacy deepcopy-per-level merge
+on `leaf.yaml`.
+
+    python -m tests.benchmarks.bench_merge [--ports 48] [--repeat 20]
+"""
+
+import argparse
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable
+
+from src.helpers.merge import deep_merge
+from src.helpers.templates import load_compiled_template, load_template
+from tests.unit.merge_reference import device_override, legacy_deep_merge
+
+TEMPLATES_PATH = Path(__file__).resolve().parents[2] / "src" / "transforms" / "templates"
+
+
+def measure(merge: Callable[[Any, Any], Any], template: Any, override: Any, repeat: int) -> dict[str, float]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        merge(template, override)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    result = merge(template, override)
+    allocated, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return {"ms": elapsed * 1000, "allocated_kib": allocated / 1024, "peak_kib": peak / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ports", type=int, default=48)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    template = load_template(str(TEMPLATES_PATH / "leaf.yaml"), copy_tree=False)
+    compiled = load_compiled_template(str(TEMPLATES_PATH / "leaf.yaml"))
+    override = device_override(args.ports)
+    assert deep_merge(template, override) == legacy_deep_merge(template, override) == compiled.merge(override)
+
+    merges = (
+        ("legacy", legacy_deep_merge),
+        ("deep_merge", deep_merge),
+        ("compiled", lambda _, override: compiled.merge(override)),
+    )
+    print(f"{'merge':<12}{'time (ms)':>12}{'retained (KiB)':>16}{'peak (KiB)':>12}")
+    for label, merge in merges:
+        result = measure(merge, template, override, args.repeat)
+        print(f"{label:<12}{result['ms']:>12.3f}{result['allocated_kib']:>16.1f}{result['peak_kib']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
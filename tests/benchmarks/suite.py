@@ -0,0 +1,273 @@
+"""
+Offline benchmark of the device render pipeline on synthetic devices.
+
+Every scenario renders one synthetic `device_query` response and times each stage of the pipeline
+(decode, config, template load, merge, dump) as well as the peak memory of a full render. Each stage
+is timed as the median of repeated calls, and the suite is run several times with the median of the
+runs kept, as a whole run can be slowed by the machine. Results are compared with `baseline.json`, scaled by a
+calibration workload so that a baseline recorded on one machine can be checked on another, and the
+run fails when a stage regresses past the tolerance by more than the noise of its own samples.
+
+    python -m tests.benchmarks.suite [--update-baseline] [--tolerance 0.5] [--scenario NAME] [--runs 3]
+"""
+
+import argparse
+import copy
+import gc
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import yaml
+
+from src.helpers.templates import load_template_emitter, template_cache
+from src.models.config import DeviceConfig
+from src.models.data import DeviceData
+from src.models.device import Device
+
+from .synthetic import synthetic_device_query
+
+TEMPLATES_PATH = Path(__file__).resolve().parents[2] / "src" / "transforms" / "templates"
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+STAGES = ["decode", "config", "template", "merge", "dump", "total"]
+
+# Slowdowns smaller than this, or than the spread of the stage's samples in the run, are measurement noise.
+NOISE_FLOOR_MS = 1.0
+
+# Allowed slowdown of the stages whose tolerance differs from the command line one. The cold template
+# load reads and parses a file, and varies with the file system cache and the allocator far more than
+# the in-memory stages, so it is only gated against gross regressions.
+STAGE_TOLERANCES = {"template": 2.0}
+
+# Fast stages are repeated for at least this many seconds, up to MAX_CALLS times, for a stable median.
+MIN_DURATION = 0.25
+MAX_CALLS = 200
+
+
+@dataclass
+class Scenario:
+    name: str
+    role: str
+    interfaces: int
+    bgp_sessions: int
+
+
+SCENARIOS = [
+    Scenario(name="leaf-10", role="leaf", interfaces=10, bgp_sessions=0),
+    Scenario(name="leaf-48", role="leaf", interfaces=48, bgp_sessions=4),
+    Scenario(name="leaf-1000", role="leaf", interfaces=1000, bgp_sessions=200),
+    Scenario(name="border-48", role="border", interfaces=48, bgp_sessions=16),
+    Scenario(name="spine-10000", role="spine", interfaces=10000, bgp_sessions=2000),
+]
+
+
+def write_templates(directory: Path) -> str:
+    """
+    Writes the templates of the scenarios: `leaf.yaml` as shipped, `border.yaml` an ACL-heavy
+    variant of it and `spine.yaml` a copy of it.
+    """
+    shutil.copy(TEMPLATES_PATH / "leaf.yaml", directory / "leaf.yaml")
+    shutil.copy(TEMPLATES_PATH / "leaf.yaml", directory / "spine.yaml")
+
+    with open(TEMPLATES_PATH / "leaf.yaml") as file:
+        border = yaml.safe_load(file)
+    for acl_filter in border["srl_nokia-acl:acl"]["acl-filter"]:
+        entries = acl_filter["entry"]
+        for sequence_id in range(10000, 12000, 2):
+            entry = copy.deepcopy(entries[sequence_id % len(entries)])
+            entry["sequence-id"] = sequence_id
+            entries.append(entry)
+    with open(directory / "border.yaml", "w") as file:
+        yaml.dump(border, file, sort_keys=False)
+
+    return str(directory)
+
+
+@dataclass
+class Timing:
+    median_ms: float
+    spread_ms: float
+
+
+def time_calls(func: Callable[[], Any], repeat: int) -> Timing:
+    """
+    Times at least `repeat` calls of `func` and, for fast functions, as many calls as fit in
+    `MIN_DURATION`, and returns their median and spread (10th to 90th percentile) in milliseconds.
+    The median is stable across runs where the fastest call is not. The collector is paused, as
+    `timeit` does.
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        samples = []
+        deadline = time.perf_counter() + MIN_DURATION
+        while len(samples) < repeat or (time.perf_counter() < deadline and len(samples) < MAX_CALLS):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    deciles = statistics.quantiles(samples, n=10) if len(samples) > 1 else [samples[0]]
+    return Timing(median_ms=statistics.median(samples), spread_ms=deciles[-1] - deciles[0])
+
+
+def calibrate() -> float:
+    """Times a fixed pure-Python workload, used to scale baselines recorded on other machines."""
+    data = synthetic_device_query(interfaces=200, bgp_sessions=50)
+    return time_calls(lambda: [json.loads(json.dumps(data)) for _ in range(20)], repeat=9).median_ms
+
+
+def run_scenario(scenario: Scenario, templates_path: str, repeat: int) -> tuple[dict[str, float], dict[str, float]]:
+    """Returns the median duration of every stage and the peak memory, and the spread of every stage."""
+    data = synthetic_device_query(
+        name=scenario.name, role=scenario.role, interfaces=scenario.interfaces, bgp_sessions=scenario.bgp_sessions
+    )
+    infra_device = data["InfraDevice"]["edges"][0]["node"]
+    template_path = f"{templates_path}/{scenario.role}.yaml"
+
+    def load_cold_template() -> None:
+        template_cache.clear()
+        load_template_emitter(template_path)
+
+    timings = {"template": time_calls(load_cold_template, repeat)}
+
+    device_data = DeviceData.create(infra_device=infra_device)
+    config = DeviceConfig.emit(device_data)
+    emitter = load_template_emitter(template_path)
+    merged = emitter.template.merge(config)
+    emitter.dump(merged)
+
+    timings["decode"] = time_calls(lambda: DeviceData.create(infra_device=infra_device), repeat)
+    timings["config"] = time_calls(lambda: DeviceConfig.emit(device_data), repeat)
+    timings["merge"] = time_calls(lambda: emitter.template.merge(config), repeat)
+    timings["dump"] = time_calls(lambda: emitter.dump(merged), repeat)
+    timings["total"] = time_calls(lambda: Device.create(data=data, templates_path=templates_path).yaml_config(), repeat)
+    results = {stage: timing.median_ms for stage, timing in timings.items()}
+
+    tracemalloc.start()
+    Device.create(data=data, templates_path=templates_path).yaml_config()
+    results["peak_kib"] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+
+    return results, {stage: timing.spread_ms for stage, timing in timings.items()}
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, Any],
+    tolerance: float,
+    spreads: dict[str, dict[str, float]] | None = None,
+) -> list[str]:
+    """
+    Returns a description of every stage that regressed past the baseline: slower than its tolerance
+    allows, by more than both `NOISE_FLOOR_MS` and the spread of its samples in this run.
+    """
+    scale = results["calibration"]["ms"] / baseline["calibration_ms"]
+    regressions = []
+
+    for scenario, stages in results.items():
+        expected = baseline["scenarios"].get(scenario)
+        if scenario == "calibration" or expected is None:
+            continue
+
+        for stage in STAGES:
+            limit = expected[stage] * scale * (1 + STAGE_TOLERANCES.get(stage, tolerance))
+            noise = max(NOISE_FLOOR_MS, (spreads or {}).get(scenario, {}).get(stage, 0.0))
+            if stages[stage] > limit and stages[stage] - expected[stage] * scale > noise:
+                regressions.append(f"{scenario} {stage}: {stages[stage]:.3f} ms > {limit:.3f} ms")
+
+        limit = expected["peak_kib"] * (1 + tolerance)
+        if stages["peak_kib"] > limit:
+            regressions.append(f"{scenario} peak memory: {stages['peak_kib']:.1f} KiB > {limit:.1f} KiB")
+
+    return regressions
+
+
+def run_suite(
+    scenarios: list[Scenario], templates_path: str, repeat: int, runs: int
+) -> tuple[dict[str, dict[str, float]], dict[str, dict[str, float]]]:
+    """
+    Runs the calibration and every scenario `runs` times, interleaved, and returns the median of each
+    stage over the runs and its spread: the widest of the range of the runs and of the samples of a run.
+    """
+    measured: dict[str, list[dict[str, float]]] = {"calibration": []}
+    run_spreads: dict[str, list[dict[str, float]]] = {}
+    for _ in range(runs):
+        measured["calibration"].append({"ms": calibrate()})
+        for scenario in scenarios:
+            stages, spreads = run_scenario(scenario, templates_path, repeat)
+            measured.setdefault(scenario.name, []).append(stages)
+            run_spreads.setdefault(scenario.name, []).append(spreads)
+
+    results = {
+        name: {key: statistics.median(run[key] for run in measured_runs) for key in measured_runs[0]}
+        for name, measured_runs in measured.items()
+    }
+    spreads = {
+        name: {
+            stage: max(
+                max(run[stage] for run in measured[name]) - min(run[stage] for run in measured[name]),
+                statistics.median(run[stage] for run in run_spreads[name]),
+            )
+            for stage in STAGES
+        }
+        for name in run_spreads
+    }
+    return results, spreads
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown over the baseline.")
+    parser.add_argument("--scenario", action="append", help="Only run the named scenario(s).")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--runs", type=int, default=3, help="Runs of the suite the median is taken over.")
+    args = parser.parse_args()
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.scenario or scenario.name in args.scenario]
+    with tempfile.TemporaryDirectory() as directory:
+        templates_path = write_templates(Path(directory))
+        results, spreads = run_suite(scenarios, templates_path, args.repeat, args.runs)
+    template_cache.clear()
+
+    print(f"{'scenario':<14}" + "".join(f"{stage + ' (ms)':>14}" for stage in STAGES) + f"{'peak (KiB)':>14}")
+    for scenario in scenarios:
+        stages = results[scenario.name]
+        print(
+            f"{scenario.name:<14}"
+            + "".join(f"{stages[stage]:>14.3f}" for stage in STAGES)
+            + f"{stages['peak_kib']:>14.1f}"
+        )
+
+    if args.update_baseline:
+        baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {"scenarios": {}}
+        baseline["calibration_ms"] = round(results["calibration"]["ms"], 3)
+        baseline["scenarios"].update(
+            {
+                name: {stage: round(value, 3) for stage, value in stages.items()}
+                for name, stages in results.items()
+                if name != "calibration"
+            }
+        )
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+
+    regressions = compare(results, json.loads(BASELINE_PATH.read_text()), args.tolerance, spreads)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
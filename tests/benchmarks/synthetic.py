@@ -0,0 +1,86 @@
+"""
+Synthetic `device_query` responses for benchmarks, shaped like what Infrahub returns.
+"""
+
+from typing import Any
+
+
+def _value(value: Any) -> dict[str, Any]:
+    return {"value": value}
+
+
+def synthetic_interface(index: int, role: str) -> dict[str, Any]:
+    node = {
+        "name": _value(f"ethernet-1/{index}"),
+        "description": _value(f"port {index}"),
+        "enabled": _value(True),
+        "role": _value(role),
+        "status": _value("active" if index % 10 else "maintenance"),
+    }
+    if role == "leaf":
+        node["l2_mode"] = _value("Trunk")
+        node["tagged_vlan"] = {"edges": [{"node": {"vlan_id": _value(vlan_id)}} for vlan_id in (10, 20, 30)]}
+    else:
+        node["ip_addresses"] = {
+            "edges": [{"node": {"address": _value(f"fd00:{index // 65536:x}:{index % 65536:x}::1/127")}}]
+        }
+    return {"node": node}
+
+
+def synthetic_loopback(device_index: int) -> dict[str, Any]:
+    addresses = [f"10.{device_index // 256 % 256}.{device_index % 256}.1/32", f"fd00::{device_index:x}/128"]
+    return {
+        "node": {
+            "name": _value("system0"),
+            "description": _value(None),
+            "enabled": _value(True),
+            "role": _value("loopback"),
+            "status": _value("active"),
+            "ip_addresses": {"edges": [{"node": {"address": _value(address)}} for address in addresses]},
+        }
+    }
+
+
+def synthetic_bgp_session(index: int) -> dict[str, Any]:
+    return {
+        "node": {
+            "status": _value("active" if index % 20 else "provisioning"),
+            "local_ip": {"node": {"address": _value(f"fd00:{index:x}::0/127")}},
+            "remote_ip": {"node": {"address": _value(f"fd00:{index:x}::1/128")}},
+            "local_as": {"node": {"asn": _value(65000)}},
+            "remote_as": {"node": {"asn": _value(65100 + index % 4)}},
+            "peer_group": {"node": {"display_label": f"group-{index % 4}"}},
+        }
+    }
+
+
+def synthetic_device_node(
+    name: str = "leaf1",
+    role: str = "leaf",
+    interfaces: int = 48,
+    bgp_sessions: int = 4,
+    device_index: int = 1,
+) -> dict[str, Any]:
+    """Returns one `InfraDevice` node with `interfaces` ports (plus a loopback) and `bgp_sessions` sessions."""
+    return {
+        "id": f"device-{device_index}",
+        "name": _value(name),
+        "description": _value(f"{role} {name}"),
+        "status": _value("active"),
+        "role": _value(role),
+        "platform": {"node": {"name": _value("Nokia SR Linux")}},
+        "type": _value("7220 IXR-D3L"),
+        "interfaces": {
+            "edges": [
+                synthetic_interface(index, "uplink" if role == "spine" or index <= 4 else "leaf")
+                for index in range(1, interfaces + 1)
+            ]
+            + [synthetic_loopback(device_index)]
+        },
+        "bgp_sessions": {"edges": [synthetic_bgp_session(index) for index in range(bgp_sessions)]},
+    }
+
+
+def synthetic_device_query(**kwargs: Any) -> dict[str, Any]:
+    """Returns a `device_query` response for one synthetic device, see `synthetic_device_node`."""
+    return {"InfraDevice": {"edges": [{"node": synthetic_device_node(**kwargs)}]}}
@@ -8,7 +8,7 @@ from infrahub_sdk.yaml import SchemaFile
 CURRENT_DIRECTORY = Path(__file__).parent.resolve()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def root_directory() -> Path:
     """
     Return the path of the root directory of the repository.
@@ -16,12 +16,12 @@ def root_directory() -> Path:
     return CURRENT_DIRECTORY.parent.parent
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def schemas_directory(root_directory: Path) -> Path:
     return root_directory / "schemas"
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def schemas(schemas_directory: Path) -> list[dict[str, Any]]:
     schema_files = SchemaFile.load_from_disk(paths=[schemas_directory])
     return [item.content for item in schema_files if item.content]
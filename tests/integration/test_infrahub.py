@@ -7,6 +7,8 @@ from infrahub_sdk.protocols import CoreGenericRepository
 from infrahub_sdk.testing.docker import TestInfrahubDockerClient
 from infrahub_sdk.testing.repository import GitRepo
 
+from src.scripts.lib.schema_cache import SchemaCache
+
 
 class TestInfrahub(TestInfrahubDockerClient):
     @pytest.mark.asyncio
@@ -16,6 +18,15 @@ class TestInfrahub(TestInfrahubDockerClient):
         resp = await client.schema.load(schemas=schemas, branch=default_branch, wait_until_converged=True)
         assert resp.errors == {}
 
+    @pytest.mark.asyncio
+    async def test_schema_cache(self, default_branch: str, client: InfrahubClient, tmp_path: Path):
+        nodes = await SchemaCache(str(tmp_path)).load(client, branch=default_branch)
+
+        # The schema loaded above is read from disk, after checking its hash only.
+        cache = SchemaCache(str(tmp_path))
+        assert await cache.load(client.clone(), branch=default_branch) == nodes
+        assert (cache.stats.hits, cache.stats.fetches) == (1, 0)
+
     @pytest.mark.asyncio
     async def test_load_repository(
         self,
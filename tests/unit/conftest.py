@@ -0,0 +1,107 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.helpers.query_cache import query_cache
+
+CURRENT_DIRECTORY = Path(__file__).parent.resolve()
+
+
+def _value(value: Any) -> dict[str, Any]:
+    return {"value": value}
+
+
+def _interface(
+    name: str,
+    role: str,
+    description: str | None = None,
+    status: str = "active",
+    ip_addresses: list[str] | None = None,
+) -> dict[str, Any]:
+    node = {
+        "name": _value(name),
+        "description": _value(description),
+        "enabled": _value(True),
+        "role": _value(role),
+        "status": _value(status),
+    }
+    if ip_addresses is not None:
+        node["ip_addresses"] = {"edges": [{"node": {"address": _value(address)}} for address in ip_addresses]}
+    return {"node": node}
+
+
+def _bgp_session(remote_ip: str, peer_group: str, status: str = "active") -> dict[str, Any]:
+    return {
+        "node": {
+            "status": _value(status),
+            "local_ip": {"node": {"address": _value("10.0.0.1/32")}},
+            "remote_ip": {"node": {"address": _value(remote_ip)}},
+            "local_as": {"node": {"asn": _value(65001)}},
+            "remote_as": {"node": {"asn": _value(65000)}},
+            "peer_group": {"node": {"display_label": peer_group}},
+        }
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_query_cache() -> None:
+    """
+    Clear the process-wide query cache, so that every test queries its own client.
+    """
+    query_cache.clear()
+
+
+@pytest.fixture
+def root_directory() -> Path:
+    """
+    Return the path of the root directory of the repository.
+    """
+    return CURRENT_DIRECTORY.parent.parent
+
+
+@pytest.fixture
+def templates_path(root_directory: Path) -> str:
+    return str(root_directory / "src" / "transforms" / "templates")
+
+
+@pytest.fixture
+def fixtures_directory() -> Path:
+    return CURRENT_DIRECTORY / "fixtures"
+
+
+@pytest.fixture
+def device_query_data() -> dict[str, Any]:
+    """
+    Return a `device_query` response for a Nokia SR Linux leaf.
+    """
+    return {
+        "InfraDevice": {
+            "edges": [
+                {
+                    "node": {
+                        "name": _value("leaf1"),
+                        "description": _value("Leaf switch 1"),
+                        "status": _value("active"),
+                        "role": _value("leaf"),
+                        "platform": {"node": {"name": _value("Nokia SR Linux")}},
+                        "type": _value("7220 IXR-D2L"),
+                        "interfaces": {
+                            "edges": [
+                                _interface("ethernet-1/49", "uplink", description="to spine1"),
+                                _interface("ethernet-1/50", "uplink", description="to spine2", status="maintenance"),
+                                _interface("system0", "loopback", ip_addresses=["10.0.0.1/32", "fd00::1/128"]),
+                            ]
+                        },
+                        "bgp_sessions": {
+                            "edges": [
+                                _bgp_session("fd00:0:0:1::1/128", "underlay"),
+                                _bgp_session("fd00:0:0:2::1/128", "underlay"),
+                                _bgp_session("fd00:0:0:3::1/128", "underlay", status="provisioning"),
+                            ]
+                        },
+                    }
+                }
+            ]
+        }
+    }
@@ -0,0 +1,97 @@
+"""
+Reference implementations of the render pipeline as it was before the performance work, and the
+device configs merged with them.
+
+They are kept verbatim so the optimised code paths can be checked for identical output and
+benchmarked against what they replaced.
+"""
+
+import copy
+from typing import Any
+
+from src.helpers.merge import find_id_key
+
+
+def legacy_merge_lists(base_list, override_list):
+    if not override_list:
+        return base_list
+
+    id_key = find_id_key(override_list)
+
+    if not id_key:
+        return override_list
+
+    override_map = {item.get(id_key): item for item in override_list if isinstance(item, dict) and id_key in item}
+
+    final_list = []
+
+    for base_item in base_list:
+        if not isinstance(base_item, dict):
+            final_list.append(base_item)
+            continue
+
+        item_id = base_item.get(id_key)
+
+        if item_id is not None and item_id in override_map:
+            override_item = override_map.pop(item_id)
+            final_list.append(legacy_deep_merge(base_item, override_item))
+        else:
+            final_list.append(base_item)
+
+    final_list.extend(override_map.values())
+
+    return final_list
+
+
+def legacy_deep_merge(base, override):
+    merged = copy.deepcopy(base)
+
+    for key, override_value in override.items():
+        if key in merged:
+            base_value = merged[key]
+            if isinstance(base_value, dict) and isinstance(override_value, dict):
+                merged[key] = legacy_deep_merge(base_value, override_value)
+            elif isinstance(base_value, list) and isinstance(override_value, list):
+                merged[key] = legacy_merge_lists(base_value, override_value)
+            else:
+                merged[key] = override_value
+        else:
+            merged[key] = override_value
+
+    return merged
+
+
+def device_override(ports: int) -> dict[str, Any]:
+    """Returns an alias-keyed device config shaped like `NokiaDeviceConfig` output."""
+    interfaces = [
+        {"name": f"ethernet-1/{port}", "description": f"port {port}", "admin-state": "enable"}
+        for port in range(1, ports + 1)
+    ]
+    interfaces.append(
+        {
+            "name": "system0",
+            "subinterface": [
+                {"index": 0, "ipv4": {"address": [{"ip-prefix": "10.0.0.1/32"}]}, "ipv6": {"address": []}}
+            ],
+        }
+    )
+    return {
+        "srl_nokia-interfaces:interface": interfaces,
+        "srl_nokia-network-instance:network-instance": [
+            {
+                "name": "default",
+                "protocols": {
+                    "srl_nokia-bgp:bgp": {
+                        "router-id": "10.0.0.1",
+                        "autonomous-system": 65001,
+                        "neighbor": [
+                            {"peer-address": f"fd00::{port}", "admin-state": "enable", "peer-group": "underlay"}
+                            for port in range(1, ports + 1)
+                        ],
+                        "group": [{"group-name": "underlay", "peer-as": 65000}],
+                    },
+                    "srl_nokia-isis:isis": {"instance": [{"name": "ISIS", "net": ["49.0001.0000.0000.0001.00"]}]},
+                },
+            }
+        ],
+    }
@@ -0,0 +1,119 @@
+import copy
+from typing import Any
+
+import pytest
+
+from src.models.config import DeviceConfig
+from src.models.data import DeviceData
+from tests.benchmarks.synthetic import synthetic_bgp_session, synthetic_device_node
+
+
+@pytest.mark.parametrize(
+    "infra_device",
+    [
+        synthetic_device_node(role="leaf", interfaces=8, bgp_sessions=0),
+        synthetic_device_node(role="spine", interfaces=64, bgp_sessions=40),
+    ],
+)
+def test_device_config_emit_matches_models(infra_device: dict[str, Any]):
+    device_data = DeviceData.create(infra_device=infra_device)
+
+    expected = DeviceConfig.create(device_data).model_dump(by_alias=True, exclude_defaults=True)
+
+    assert DeviceConfig.emit(device_data) == expected
+
+
+def test_device_config_emit_matches_models_fixture(device_query_data: dict[str, Any]):
+    device_data = DeviceData.create(infra_device=device_query_data["InfraDevice"]["edges"][0]["node"])
+
+    expected = DeviceConfig.create(device_data).model_dump(by_alias=True, exclude_defaults=True)
+
+    assert DeviceConfig.emit(device_data) == expected
+    assert list(DeviceConfig.emit(device_data)["srl_nokia-interfaces:interface"][0]) == list(
+        expected["srl_nokia-interfaces:interface"][0]
+    )
+
+
+def test_device_config_without_loopback():
+    infra_device = synthetic_device_node(interfaces=2, bgp_sessions=2)
+    infra_device["interfaces"]["edges"].pop()
+    device_data = DeviceData.create(infra_device=infra_device)
+
+    expected = DeviceConfig.create(device_data).model_dump(by_alias=True, exclude_defaults=True)
+
+    assert DeviceConfig.emit(device_data) == expected
+
+
+def _addresses(values: list[str]) -> dict[str, Any]:
+    return {"edges": [{"node": {"address": {"value": value}}} for value in values]}
+
+
+def _uplinks_without_description() -> dict[str, Any]:
+    infra_device = synthetic_device_node(role="spine", interfaces=6, bgp_sessions=4)
+    for edge in infra_device["interfaces"]["edges"][::2]:
+        edge["node"]["description"]["value"] = None
+    infra_device["interfaces"]["edges"][1]["node"]["status"]["value"] = "provisioning"
+    return infra_device
+
+
+def _several_loopbacks() -> dict[str, Any]:
+    infra_device = synthetic_device_node(interfaces=2, bgp_sessions=3)
+    loopback = infra_device["interfaces"]["edges"][-1]
+    loopback["node"]["ip_addresses"] = _addresses(["10.0.1.1/32", "10.0.1.1/24", "invalid/32", "fd00::1/64"])
+    second = copy.deepcopy(loopback)
+    second["node"]["name"]["value"] = "system1"
+    second["node"]["ip_addresses"] = _addresses(["fd00::9/128", "192.0.2.9/32", "192.0.2.10/32"])
+    infra_device["interfaces"]["edges"].append(second)
+    return infra_device
+
+
+def _loopback_without_host_address() -> dict[str, Any]:
+    infra_device = synthetic_device_node(interfaces=2, bgp_sessions=2)
+    infra_device["interfaces"]["edges"][-1]["node"]["ip_addresses"] = _addresses(["10.0.0.1/24"])
+    return infra_device
+
+
+def _inactive_bgp_sessions() -> dict[str, Any]:
+    infra_device = synthetic_device_node(interfaces=2, bgp_sessions=3)
+    for edge in infra_device["bgp_sessions"]["edges"]:
+        edge["node"]["status"]["value"] = "maintenance"
+    return infra_device
+
+
+def _peer_group_with_several_peer_as() -> dict[str, Any]:
+    infra_device = synthetic_device_node(interfaces=2, bgp_sessions=0)
+    sessions = [synthetic_bgp_session(index) for index in range(1, 6)]
+    for index, session in enumerate(sessions):
+        session["node"]["peer_group"]["node"]["display_label"] = "underlay" if index % 2 else "overlay"
+    sessions[-1]["node"]["status"]["value"] = "provisioning"
+    infra_device["bgp_sessions"]["edges"] = sessions
+    return infra_device
+
+
+@pytest.mark.parametrize(
+    "infra_device",
+    [
+        _uplinks_without_description(),
+        _several_loopbacks(),
+        _loopback_without_host_address(),
+        _inactive_bgp_sessions(),
+        _peer_group_with_several_peer_as(),
+        synthetic_device_node(role="leaf", interfaces=0, bgp_sessions=0),
+        synthetic_device_node(role="spine", interfaces=200, bgp_sessions=120, device_index=300),
+    ],
+    ids=[
+        "uplinks-without-description",
+        "several-loopbacks",
+        "loopback-without-host-address",
+        "inactive-bgp-sessions",
+        "peer-group-with-several-peer-as",
+        "loopback-only",
+        "large-spine",
+    ],
+)
+def test_device_config_emit_matches_models_varied(infra_device: dict[str, Any]):
+    device_data = DeviceData.create(infra_device=infra_device)
+
+    expected = DeviceConfig.create(device_data).model_dump(by_alias=True, exclude_defaults=True)
+
+    assert DeviceConfig.emit(device_data) == expected
@@ -0,0 +1,99 @@
+import copy
+from typing import Any
+
+import pytest
+from pydantic import ValidationError
+
+from src.models.data import DeviceData
+from src.models.platforms.nokia_srl import NokiaNetworkInstanceConfig
+from tests.benchmarks.synthetic import synthetic_device_node
+
+
+@pytest.mark.parametrize("role", ["leaf", "spine"])
+def test_device_data_trusted_matches_validated(role: str):
+    infra_device = synthetic_device_node(role=role, interfaces=64, bgp_sessions=32)
+
+    validated = DeviceData.create(infra_device=infra_device)
+    trusted = DeviceData.create(infra_device=infra_device, validate=False)
+
+    assert trusted == validated
+    assert trusted.model_dump() == validated.model_dump()
+
+
+def test_device_data_trusted_fixture(device_query_data: dict[str, Any]):
+    infra_device = device_query_data["InfraDevice"]["edges"][0]["node"]
+
+    assert DeviceData.create(infra_device=infra_device, validate=False) == DeviceData.create(infra_device=infra_device)
+
+
+def test_device_data_validation():
+    infra_device = synthetic_device_node(interfaces=1)
+    infra_device["interfaces"]["edges"][0]["node"]["role"]["value"] = "core"
+
+    with pytest.raises(ValidationError):
+        DeviceData.create(infra_device=infra_device)
+
+    assert DeviceData.create(infra_device=infra_device, validate=False).interfaces[0].role == "core"
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_device_data_indexes(device_query_data: dict[str, Any], validate: bool):
+    infra_device = device_query_data["InfraDevice"]["edges"][0]["node"]
+    device_data = DeviceData.create(infra_device=infra_device, validate=validate)
+
+    assert [interface.name for interface in device_data.interfaces_by_role["uplink"]] == [
+        "ethernet-1/49",
+        "ethernet-1/50",
+    ]
+    loopback = device_data.interfaces_by_role["loopback"][0]
+    assert loopback.ipv4_host_addresses == ["10.0.0.1/32"]
+    assert loopback.ipv6_host_addresses == ["fd00::1/128"]
+    assert device_data.router_id == "10.0.0.1"
+    assert [session.remote_ip for session in device_data.active_bgp_sessions_by_peer_group["underlay"]] == [
+        "fd00:0:0:1::1/128",
+        "fd00:0:0:2::1/128",
+    ]
+    assert device_data.interfaces_by_role is device_data.interfaces_by_role
+    assert device_data.model_dump() == DeviceData.create(infra_device=infra_device).model_dump()
+
+
+@pytest.mark.parametrize(
+    ("addresses", "host_addresses", "router_id"),
+    [
+        (["10.0.0.1/24", "invalid/32", "10.0.0.9/32"], ["10.0.0.9/32"], "10.0.0.9"),
+        (["10.0.0.3", "fd00::3", "10.0.0.9/32"], ["10.0.0.9/32"], "10.0.0.9"),
+        (["10.0.0.3", "invalid/32", "10.0.0.3/320"], [], ""),
+    ],
+)
+def test_device_data_indexes_skip_invalid_addresses(addresses: list[str], host_addresses: list[str], router_id: str):
+    infra_device = synthetic_device_node(interfaces=0)
+    edges = infra_device["interfaces"]["edges"][0]["node"]["ip_addresses"]["edges"]
+    edges[:] = [{"node": {"address": {"value": value}}} for value in addresses]
+
+    device_data = DeviceData.create(infra_device=infra_device)
+
+    # Host addresses need an explicit prefix length, the router ID is taken from them.
+    assert device_data.interfaces[0].ipv4_host_addresses == host_addresses
+    assert device_data.interfaces[0].ipv6_host_addresses == []
+    assert device_data.router_id == router_id
+
+
+def test_device_data_router_id_last_loopback():
+    infra_device = synthetic_device_node(interfaces=0)
+    loopback = infra_device["interfaces"]["edges"][0]
+    loopback["node"]["ip_addresses"]["edges"] = [{"node": {"address": {"value": "10.0.1.1/32"}}}]
+    second = copy.deepcopy(loopback)
+    second["node"]["name"]["value"] = "system1"
+    second["node"]["ip_addresses"]["edges"] = [
+        {"node": {"address": {"value": value}}} for value in ["fd00::9/128", "192.0.2.9/32", "192.0.2.10/32"]
+    ]
+    infra_device["interfaces"]["edges"].append(second)
+
+    device_data = DeviceData.create(infra_device=infra_device)
+    network_instance = NokiaNetworkInstanceConfig.emit(device_data)
+
+    # The last loopback with a /32 wins, and its first /32 address.
+    assert device_data.router_id == "192.0.2.9"
+    assert network_instance[0]["protocols"]["srl_nokia-isis:isis"]["instance"][0]["net"] == [
+        "49.0001.0000.0000.0009.00"
+    ]
@@ -0,0 +1,87 @@
+import copy
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+from infrahub_sdk import InfrahubClient
+from infrahub_sdk.node import InfrahubNode
+
+from src.helpers.delta import apply_delta, diff_trees
+from src.helpers.render_store import RenderStore
+from src.models.device import Device
+from src.transforms.device_transform import DeviceTransformYaml
+
+INTERFACES = "srl_nokia-interfaces:interface"
+
+
+def test_diff_trees_keyed_lists():
+    old = {
+        INTERFACES: [
+            {"name": "ethernet-1/1", "description": "to spine1", "admin-state": "enable"},
+            {"name": "ethernet-1/2", "description": "to spine2"},
+        ],
+        "system": {"name": "leaf1", "ntp": ["10.0.0.1"]},
+    }
+    new = copy.deepcopy(old)
+    new[INTERFACES][0]["description"] = "to spine3"
+    del new[INTERFACES][1]
+    new[INTERFACES].append({"name": "ethernet-1/3"})
+    new["system"]["ntp"].append("10.0.0.2")
+    del new["system"]["name"]
+
+    operations = diff_trees(old, new)
+
+    assert operations == [
+        {"op": "replace", "path": [INTERFACES, {"name": "ethernet-1/1"}, "description"], "value": "to spine3"},
+        {"op": "add", "path": [INTERFACES, {"name": "ethernet-1/3"}], "value": {"name": "ethernet-1/3"}},
+        {"op": "remove", "path": [INTERFACES, {"name": "ethernet-1/2"}]},
+        {"op": "replace", "path": ["system", "ntp"], "value": ["10.0.0.1", "10.0.0.2"]},
+        {"op": "remove", "path": ["system", "name"]},
+    ]
+    assert apply_delta(old, operations) == new
+    assert diff_trees(new, copy.deepcopy(new)) == []
+
+
+def test_apply_delta_remove_missing():
+    tree = {INTERFACES: [{"name": "ethernet-1/1"}], "system": {"name": "leaf1"}}
+    operations = [
+        {"op": "remove", "path": [INTERFACES, {"name": "ethernet-1/9"}]},
+        {"op": "remove", "path": [INTERFACES, {"name": "ethernet-1/9"}, "description"]},
+        {"op": "remove", "path": ["system", "ntp"]},
+        {"op": "remove", "path": ["bgp", "neighbor"]},
+        {"op": "remove", "path": ["bgp", "neighbor", {"peer-address": "fd00::1"}]},
+    ]
+
+    assert apply_delta(tree, operations) == tree
+
+
+def test_device_yaml_delta(device_query_data: dict[str, Any], templates_path: str, tmp_path: Path):
+    store = RenderStore(str(tmp_path / "renders.sqlite3"))
+    device = Device.create(data=device_query_data, templates_path=templates_path)
+
+    (operation,) = yaml.safe_load(device.yaml_delta(render_store=store))
+    assert operation["op"] == "replace" and operation["path"] == []
+    assert device.yaml_delta(render_store=store) == "[]\n"
+
+    changed = copy.deepcopy(device_query_data)
+    changed["InfraDevice"]["edges"][0]["node"]["interfaces"]["edges"][0]["node"]["description"]["value"] = "to spine9"
+    device = Device.create(data=changed, templates_path=templates_path)
+
+    assert yaml.safe_load(device.yaml_delta(render_store=store)) == [
+        {"op": "replace", "path": [INTERFACES, {"name": "ethernet-1/49"}, "description"], "value": "to spine9"}
+    ]
+    assert store.last("leaf1")[1] == device.yaml_config()
+    assert store.stats.rendered == 2 and store.stats.skipped == 1
+
+
+async def test_device_transform_delta_needs_render_store(device_query_data: dict[str, Any], root_directory: Path):
+    transform = DeviceTransformYaml(
+        client=InfrahubClient(), infrahub_node=InfrahubNode, branch="main", root_directory=str(root_directory)
+    )
+    transform.output_mode = "delta"
+    transform.render_store_path = ""
+
+    with pytest.raises(ValueError, match="needs a render store"):
+        await transform.transform(data=device_query_data)
@@ -0,0 +1,88 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from infrahub_sdk import InfrahubClient
+from infrahub_sdk.node import InfrahubNode
+
+from src.helpers import dependencies
+from src.helpers.dependencies import DependencyIndex, impacted_by_branch, node_ids
+from src.transforms.device_transform import DeviceTransformYaml
+
+
+class FakeDiffClient:
+    def __init__(self, changed: list[str]) -> None:
+        self.changed = changed
+
+    async def get_diff_summary(self, branch: str) -> list[dict[str, Any]]:
+        return [{"branch": branch, "kind": "InfraInterfaceL3", "id": node_id} for node_id in self.changed]
+
+
+def test_node_ids():
+    response = {
+        "InfraDevice": {
+            "edges": [
+                {
+                    "node": {
+                        "id": "device",
+                        "name": {"value": "leaf1"},
+                        "interfaces": {"edges": [{"node": {"id": "interface", "ip_addresses": {"edges": []}}}]},
+                        "site": {"node": None},
+                    }
+                }
+            ]
+        }
+    }
+
+    assert node_ids(response) == {"device", "interface"}
+
+
+def test_dependency_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(dependencies, "LOOKUP_CHUNK_SIZE", 2)
+    index = DependencyIndex(str(tmp_path / "dependencies.sqlite3"))
+    index.record("leaf1", object_ids={"device1", "interface1", "bgp"}, templates=["leaf.yaml", "devices/leaf1.yaml"])
+    index.record("leaf2", object_ids={"device2", "interface2", "bgp"}, templates=["leaf.yaml", "devices/leaf2.yaml"])
+
+    assert index.impacted(object_ids=["interface1"]) == {"leaf1"}
+    assert index.impacted(object_ids=["bgp", "unknown"]) == {"leaf1", "leaf2"}
+    assert index.impacted(templates=["devices/leaf2.yaml"]) == {"leaf2"}
+    assert index.impacted(object_ids=["a", "b", "c", "interface2"], templates=["spine.yaml"]) == {"leaf2"}
+
+    # A render replaces the dependencies of its artifact.
+    index.record("leaf1", object_ids={"device1"}, templates=["leaf.yaml"])
+    assert index.impacted(object_ids=["interface1", "bgp"]) == {"leaf2"}
+    assert DependencyIndex(index.path).dependencies("leaf1") == ({"device1"}, {"leaf.yaml"})
+
+
+async def test_impacted_by_branch(tmp_path: Path):
+    index = DependencyIndex(str(tmp_path / "dependencies.sqlite3"))
+    index.record("leaf1", object_ids={"interface1"}, templates=["leaf.yaml"])
+    index.record("leaf2", object_ids={"interface2"}, templates=["leaf.yaml"])
+
+    assert await impacted_by_branch(FakeDiffClient(["interface2"]), branch="change", index=index) == {"leaf2"}
+    assert await impacted_by_branch(FakeDiffClient([]), branch="change", index=index, templates=["leaf.yaml"]) == {
+        "leaf1",
+        "leaf2",
+    }
+
+
+async def test_device_transform_records_dependencies(
+    device_query_data: dict[str, Any], root_directory: Path, tmp_path: Path
+):
+    node = device_query_data["InfraDevice"]["edges"][0]["node"]
+    node["id"] = "device1"
+    for index, edge in enumerate(node["interfaces"]["edges"]):
+        edge["node"]["id"] = f"interface{index}"
+    node["bgp_sessions"]["edges"][0]["node"]["remote_ip"]["node"]["id"] = "remote-ip"
+    transform = DeviceTransformYaml(
+        client=InfrahubClient(), infrahub_node=InfrahubNode, branch="main", root_directory=str(root_directory)
+    )
+    transform.dependency_index_path = str(tmp_path / "dependencies.sqlite3")
+
+    await transform.transform(data=device_query_data)
+
+    object_ids, templates = transform.dependency_index.dependencies("leaf1")
+    assert object_ids == {"device1", "interface0", "interface1", "interface2", "remote-ip"}
+    assert templates == {"global.yaml", "leaf.yaml", "platforms/nokia-sr-linux.yaml", "devices/leaf1.yaml"}
+    assert transform.dependency_index.impacted(object_ids=["remote-ip"]) == {"leaf1"}
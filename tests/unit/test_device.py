@@ -0,0 +1,253 @@
+import asyncio
+import copy
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+from infrahub_sdk import InfrahubClient
+from infrahub_sdk.node import InfrahubNode
+
+from src.helpers.render_store import RenderStore
+from src.helpers.templates import template_cache
+from src.models.data import DeviceData
+from src.models.device import Device
+from src.transforms import device_transform
+from src.transforms.device_transform import DeviceTransformJson, DeviceTransformYaml
+
+
+class FakeBulkClient:
+    """Serves `device_bulk_query` pages from a list of device nodes."""
+
+    def __init__(self, nodes: list[dict[str, Any]]) -> None:
+        self.nodes = nodes
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+
+    def clone(self, branch: str | None = None) -> "FakeBulkClient":
+        return self
+
+    async def query_gql_query(self, name: str, variables: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        self.requests.append((name, variables))
+        page = self.nodes[variables["offset"] : variables["offset"] + variables["limit"]]
+        return {"data": {"InfraDevice": {"count": len(self.nodes), "edges": [{"node": node} for node in page]}}}
+
+
+class FakePagedClient:
+    """Serves `device_interfaces_query` and `device_bgp_sessions_query` pages of one device node."""
+
+    def __init__(self, node: dict[str, Any]) -> None:
+        self.children = {
+            "InfraInterface": node["interfaces"]["edges"],
+            "InfraBGPSession": node["bgp_sessions"]["edges"],
+        }
+        self.requests: list[tuple[str, dict[str, Any]]] = []
+
+    def clone(self, branch: str | None = None) -> "FakePagedClient":
+        return self
+
+    async def query_gql_query(self, name: str, variables: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        self.requests.append((name, variables))
+        kind = "InfraInterface" if name == "device_interfaces_query" else "InfraBGPSession"
+        page = self.children[kind][variables["offset"] : variables["offset"] + variables["limit"]]
+        # Answer out of order to check that the pages are assembled by offset.
+        await asyncio.sleep(0.01 * (3 - variables["offset"]))
+        return {"data": {kind: {"count": len(self.children[kind]), "edges": page}}}
+
+
+@pytest.mark.parametrize("validate_config", [False, True])
+def test_device_yaml_config(
+    device_query_data: dict[str, Any], templates_path: str, fixtures_directory: Path, validate_config: bool
+):
+    device = Device.create(data=device_query_data, templates_path=templates_path, validate_config=validate_config)
+
+    assert device.yaml_config() == (fixtures_directory / "leaf1.yaml").read_text()
+
+
+def test_device_yaml_config_missing_template(device_query_data: dict[str, Any], tmp_path: Path):
+    device = Device.create(data=device_query_data, templates_path=str(tmp_path))
+
+    assert device.yaml_config() == "---"
+
+
+def test_device_yaml_config_missing_role_template(device_query_data: dict[str, Any], tmp_path: Path):
+    (tmp_path / "global.yaml").write_text("system:\n  banner:\n    login-banner: global\n")
+    (tmp_path / "devices").mkdir()
+    (tmp_path / "devices" / "leaf1.yaml").write_text("system:\n  name: leaf1\n")
+    device = Device.create(data=device_query_data, templates_path=str(tmp_path))
+
+    assert device.yaml_config() == "---"
+    assert json.loads(device.json_config()) is None
+
+
+def test_device_yaml_config_render_store(
+    device_query_data: dict[str, Any], templates_path: str, fixtures_directory: Path, tmp_path: Path
+):
+    store = RenderStore(str(tmp_path / "renders.sqlite3"))
+    expected = (fixtures_directory / "leaf1.yaml").read_text()
+
+    for _ in range(3):
+        device = Device.create(data=device_query_data, templates_path=templates_path)
+        assert device.yaml_config(render_store=store) == expected
+    assert (store.stats.rendered, store.stats.skipped) == (1, 2)
+
+    interface = device_query_data["InfraDevice"]["edges"][0]["node"]["interfaces"]["edges"][0]["node"]
+    interface["description"]["value"] = "to spine9"
+    device = Device.create(data=device_query_data, templates_path=templates_path)
+    assert "to spine9" in device.yaml_config(render_store=store)
+    assert (store.stats.rendered, store.stats.skipped) == (2, 2)
+
+    # The store persists across processes.
+    assert RenderStore(store.path).get(device.name, device.fingerprint()) is not None
+
+
+def test_device_fingerprint_covers_template(device_query_data: dict[str, Any], tmp_path: Path):
+    template = tmp_path / "leaf.yaml"
+    template.write_text("system: {}\n")
+    device = Device.create(data=device_query_data, templates_path=str(tmp_path))
+    fingerprint = device.fingerprint()
+
+    template.write_text("system: {name: leaf}\n")
+
+    assert device.fingerprint() != fingerprint
+
+
+async def test_device_transform_uses_template_cache(
+    device_query_data: dict[str, Any], root_directory: Path, fixtures_directory: Path
+):
+    transform = DeviceTransformYaml(
+        client=InfrahubClient(), infrahub_node=InfrahubNode, branch="main", root_directory=str(root_directory)
+    )
+    template_cache.clear()
+
+    for _ in range(3):
+        assert await transform.transform(data=device_query_data) == (fixtures_directory / "leaf1.yaml").read_text()
+
+    assert template_cache.stats.misses == 1
+    assert template_cache.stats.hits == 2
+
+
+async def test_device_transform_json(device_query_data: dict[str, Any], root_directory: Path, fixtures_directory: Path):
+    transform = DeviceTransformJson(
+        client=InfrahubClient(), infrahub_node=InfrahubNode, branch="main", root_directory=str(root_directory)
+    )
+
+    output = await transform.transform(data=device_query_data)
+
+    assert json.loads(output) == yaml.safe_load((fixtures_directory / "leaf1.yaml").read_text())
+
+
+async def test_device_transform_render_fleet(device_query_data: dict[str, Any], root_directory: Path):
+    nodes = []
+    for index in range(5):
+        node = copy.deepcopy(device_query_data["InfraDevice"]["edges"][0]["node"])
+        node["name"]["value"] = f"leaf{index}"
+        nodes.append(node)
+    client = FakeBulkClient(nodes)
+    transform = DeviceTransformYaml(
+        client=client, infrahub_node=InfrahubNode, branch="main", root_directory=str(root_directory)
+    )
+
+    rendered = [item async for item in transform.render_fleet(page_size=2)]
+
+    assert [name for name, _ in rendered] == [f"leaf{index}" for index in range(5)]
+    expected = await transform.transform(data=device_query_data)
+    assert all(config == expected for _, config in rendered)
+    assert client.requests == [
+        ("device_bulk_query", {"offset": 0, "limit": 2}),
+        ("device_bulk_query", {"offset": 2, "limit": 2}),
+        ("device_bulk_query", {"offset": 4, "limit": 2}),
+    ]
+
+
+async def test_device_transform_render_fleet_off_event_loop(
+    device_query_data: dict[str, Any], root_directory: Path, monkeypatch: pytest.MonkeyPatch
+):
+    threads: dict[str, list[threading.Thread]] = {"decode": [], "render": []}
+    decode = Device.decode
+    render = DeviceTransformYaml.render
+
+    def decode_in_thread(infra_device: dict[str, Any], validate: bool = True) -> DeviceData:
+        threads["decode"].append(threading.current_thread())
+        return decode(infra_device=infra_device, validate=validate)
+
+    def render_in_thread(self: DeviceTransformYaml, device: Device) -> str:
+        threads["render"].append(threading.current_thread())
+        return render(self, device)
+
+    monkeypatch.setattr(Device, "decode", staticmethod(decode_in_thread))
+    monkeypatch.setattr(DeviceTransformYaml, "render", render_in_thread)
+    transform = DeviceTransformYaml(
+        client=FakeBulkClient([device_query_data["InfraDevice"]["edges"][0]["node"]]),
+        infrahub_node=InfrahubNode,
+        branch="main",
+        root_directory=str(root_directory),
+    )
+
+    assert [name async for name, _ in transform.render_fleet()] == ["leaf1"]
+    for stage in ("decode", "render"):
+        assert threads[stage] and threading.current_thread() not in threads[stage], stage
+
+
+async def test_render_branch(
+    device_query_data: dict[str, Any], fixtures_directory: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    node = device_query_data["InfraDevice"]["edges"][0]["node"]
+    monkeypatch.setattr(device_transform, "InfrahubClient", lambda: FakeBulkClient([node]))
+
+    rendered = await device_transform.render_branch(
+        branch="main", output=str(tmp_path), output_format="yaml", page_size=10
+    )
+
+    assert rendered == 1
+    assert (tmp_path / "leaf1.yaml").read_text() == (fixtures_directory / "leaf1.yaml").read_text()
+
+
+@pytest.mark.parametrize("trusted_input", [False, True])
+async def test_device_transform_paged(
+    device_query_data: dict[str, Any], root_directory: Path, fixtures_directory: Path, trusted_input: bool
+):
+    node = device_query_data["InfraDevice"]["edges"][0]["node"]
+    client = FakePagedClient(node)
+    transform = DeviceTransformYaml(
+        client=client, infrahub_node=InfrahubNode, branch="main", root_directory=str(root_directory)
+    )
+    transform.fetch_mode = "paged"
+    transform.child_page_size = 1
+    transform.fetch_concurrency = 2
+    transform.trusted_input = trusted_input
+    header = {key: value for key, value in node.items() if key not in ("interfaces", "bgp_sessions")}
+
+    config = await transform.transform(data={"InfraDevice": {"edges": [{"node": header}]}})
+
+    assert config == (fixtures_directory / "leaf1.yaml").read_text()
+    assert sorted((name, variables["offset"]) for name, variables in client.requests) == [
+        *(("device_bgp_sessions_query", offset) for offset in range(3)),
+        *(("device_interfaces_query", offset) for offset in range(3)),
+    ]
+
+
+def test_device_template_layers(device_query_data: dict[str, Any], templates_path: str, tmp_path: Path):
+    (tmp_path / "leaf.yaml").write_text(Path(templates_path, "leaf.yaml").read_text())
+    for layer, content in {
+        "global.yaml": "system:\n  banner:\n    login-banner: global\n",
+        "platforms/nokia-sr-linux.yaml": "system:\n  banner:\n    login-banner: srl\n",
+        "sites/paris.yaml": "system:\n  dns:\n    server-list: [10.0.0.53]\n",
+        "devices/leaf1.yaml": "srl_nokia-interfaces:interface:\n  - name: ethernet-1/49\n    mtu: 9000\n",
+    }.items():
+        (tmp_path / layer).parent.mkdir(exist_ok=True)
+        (tmp_path / layer).write_text(content)
+    device_query_data["InfraDevice"]["edges"][0]["node"]["site"] = {"node": {"name": {"value": "paris"}}}
+    device = Device.create(data=device_query_data, templates_path=str(tmp_path))
+
+    config = yaml.safe_load(device.yaml_config())
+
+    assert config["system"]["banner"] == {"login-banner": "srl"}
+    assert config["system"]["dns"] == {"server-list": ["10.0.0.53"]}
+    interface = next(
+        interface for interface in config["srl_nokia-interfaces:interface"] if interface["name"] == "ethernet-1/49"
+    )
+    assert interface["mtu"] == 9000
+    assert interface["description"] == "to spine1"
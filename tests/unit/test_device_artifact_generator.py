@@ -0,0 +1,101 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from infrahub_sdk.batch import InfrahubBatch
+from infrahub_sdk.node import InfrahubNode
+
+from src.generators.device_artifact_generator import DeviceArtifactGenerator
+from src.helpers.artifacts import ArtifactRequestCoalescer
+
+
+class FakeDevice:
+    def __init__(self, name: str) -> None:
+        self.name = SimpleNamespace(value=name)
+        self.generated: list[str] = []
+
+    async def artifact_generate(self, name: str) -> None:
+        self.generated.append(name)
+
+
+class FakeClient:
+    def __init__(self, device_names: list[str]) -> None:
+        self.devices = {name: FakeDevice(name) for name in device_names}
+        self.queries: list[list[str]] = []
+        self.clones: list["FakeClient"] = []
+
+    def clone(self, branch: str | None = None) -> "FakeClient":
+        clone = FakeClient([])
+        clone.devices, clone.queries = self.devices, self.queries
+        self.clones.append(clone)
+        return clone
+
+    async def filters(self, kind: str, name__values: list[str]) -> list[FakeDevice]:
+        self.queries.append(sorted(name__values))
+        return [self.devices[name] for name in name__values if name in self.devices]
+
+    async def create_batch(self, return_exceptions: bool = False) -> InfrahubBatch:
+        return InfrahubBatch(return_exceptions=return_exceptions)
+
+
+def interface_data(device_name: str) -> dict[str, Any]:
+    return {"InfraInterfaceL3": {"edges": [{"node": {"device": {"node": {"name": {"value": device_name}}}}}]}}
+
+
+def make_generator(client: FakeClient) -> DeviceArtifactGenerator:
+    generator = DeviceArtifactGenerator(
+        query="interface_device_query", client=client, infrahub_node=InfrahubNode, branch="main"
+    )
+    generator.client = client
+    generator.coalesce_window = 0.01
+    return generator
+
+
+async def test_device_artifact_generator_coalesces_interfaces():
+    client = FakeClient(["leaf1", "leaf2"])
+
+    await asyncio.gather(
+        *[make_generator(client).generate(data=interface_data("leaf1")) for _ in range(48)],
+        *[make_generator(client).generate(data=interface_data("leaf2")) for _ in range(4)],
+    )
+
+    assert client.queries == [["leaf1", "leaf2"]]
+    assert client.devices["leaf1"].generated == ["Device config YAML"]
+    assert client.devices["leaf2"].generated == ["Device config YAML"]
+
+
+async def test_device_artifact_generator_unknown_device():
+    client = FakeClient(["leaf1"])
+
+    with pytest.raises(ValueError, match="leaf9"):
+        await make_generator(client).generate(data=interface_data("leaf9"))
+
+
+async def test_artifact_coalescer_flushes_with_a_clone():
+    client = FakeClient(["leaf1"])
+    coalescer = ArtifactRequestCoalescer(artifact_name="Device config YAML", window=0.01)
+
+    await asyncio.gather(*[coalescer.request(client=client, device_name="leaf1") for _ in range(3)])
+
+    # The callers' clients may be tracking the nodes of their generator, the flush must not use them.
+    assert len(client.clones) == 1
+    assert client.devices["leaf1"].generated == ["Device config YAML"]
+
+
+async def test_artifact_coalescer_skips_cancelled_requests():
+    client = FakeClient(["leaf1", "leaf2"])
+    coalescer = ArtifactRequestCoalescer(artifact_name="Device config YAML", window=0.01)
+
+    cancelled = asyncio.create_task(coalescer.request(client=client, device_name="leaf1"))
+    shared = [asyncio.create_task(coalescer.request(client=client, device_name="leaf2")) for _ in range(2)]
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    shared[0].cancel()
+    await shared[1]
+
+    assert cancelled.cancelled() and shared[0].cancelled()
+    assert client.queries == [["leaf2"]]
+    assert client.devices["leaf1"].generated == []
+    assert client.devices["leaf2"].generated == ["Device config YAML"]
@@ -0,0 +1,100 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from infrahub_sdk.exceptions import GraphQLError
+from infrahub_sdk.node import InfrahubNode
+
+from src.generators.device_generator import DeviceGenerator
+
+
+class FakeNode:
+    def __init__(self, client: "FakeClient", kind: str, name: str, **kwargs: Any) -> None:
+        self.client = client
+        self.kind = kind
+        self.id = name
+        self.name = type("Attribute", (), {"value": name})()
+        self.saves = 0
+
+    def get_kind(self) -> str:
+        return self.kind
+
+    async def save(self, allow_upsert: bool = False) -> None:
+        self.saves += 1
+        self.client.running += 1
+        self.client.max_running = max(self.client.max_running, self.client.running)
+        try:
+            await asyncio.sleep(0.001)
+            error = self.client.errors.get(self.name.value)
+            if error and self.saves <= self.client.failures.get(self.name.value, 1):
+                raise GraphQLError(errors=[{"message": error}])
+        finally:
+            self.client.running -= 1
+
+
+class FakeClient:
+    def __init__(self, errors: dict[str, str] | None = None, failures: dict[str, int] | None = None) -> None:
+        self.errors = errors or {}
+        self.failures = failures or {}
+        self.nodes: dict[str, FakeNode] = {}
+        self.running = 0
+        self.max_running = 0
+
+    def clone(self, branch: str | None = None) -> "FakeClient":
+        return self
+
+    async def create(self, kind: str, name: str, **kwargs: Any) -> FakeNode:
+        self.nodes[name] = FakeNode(self, kind, name, **kwargs)
+        return self.nodes[name]
+
+
+def sites_data(count: int) -> dict[str, Any]:
+    return {
+        "LocationSite": {
+            "edges": [
+                {"node": {"name": {"value": f"site{index}"}, "city": {"value": "Paris"}}} for index in range(count)
+            ]
+        }
+    }
+
+
+def make_generator(client: FakeClient, concurrency: int = 4) -> DeviceGenerator:
+    generator = DeviceGenerator(query="all_sites_query", client=client, infrahub_node=InfrahubNode, branch="main")
+    generator.client = client
+    generator.concurrency = concurrency
+    generator.retry_backoff = 0
+    return generator
+
+
+async def test_device_generator_saves_sites_concurrently():
+    client = FakeClient()
+    generator = make_generator(client, concurrency=4)
+
+    await generator.generate(data=sites_data(40))
+
+    assert len(client.nodes) == 40
+    assert all(node.saves == 1 for node in client.nodes.values())
+    assert client.max_running == 4
+    assert all(result.ok and result.attempts == 1 for result in generator.results)
+
+
+async def test_device_generator_retries_conflicts():
+    client = FakeClient(errors={"site1-core5": "Unable to acquire lock on node"}, failures={"site1-core5": 2})
+    generator = make_generator(client)
+
+    await generator.generate(data=sites_data(3))
+
+    assert client.nodes["site1-core5"].saves == 3
+    assert {result.node.name.value: result.attempts for result in generator.results}["site1-core5"] == 3
+
+
+async def test_device_generator_reports_failures():
+    client = FakeClient(errors={"site2-core5": "Invalid value for status"})
+    generator = make_generator(client)
+
+    with pytest.raises(RuntimeError, match="1 of 5 objects could not be saved: InfraDevice site2-core5"):
+        await generator.generate(data=sites_data(5))
+
+    assert client.nodes["site2-core5"].saves == 1
+    assert sum(result.ok for result in generator.results) == 4
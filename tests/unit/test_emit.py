@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+import yaml
+
+from src.helpers import emit
+from src.helpers.emit import YamlTemplateEmitter, dump_json, dump_msgpack, dump_yaml
+from src.helpers.merge import CompiledTemplate
+from src.helpers.templates import load_compiled_template
+from src.models.device import Device
+from tests.unit.merge_reference import device_override
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {},
+        {"description": "plain ascii", "vlans": [10, 20], "enabled": True, "mtu": None},
+        {"description": "café " * 30},
+        {"description": "tab\tseparated " * 10},
+        {"banner": "line one\nline two\n" * 10},
+    ],
+)
+def test_dump_yaml_matches_pyyaml(data: dict[str, Any]):
+    assert dump_yaml(data) == yaml.dump(data, sort_keys=False)
+
+
+@pytest.mark.parametrize("ports", [0, 4, 48])
+def test_template_emitter_matches_pyyaml(templates_path: str, ports: int):
+    compiled = load_compiled_template(f"{templates_path}/leaf.yaml")
+    emitter = YamlTemplateEmitter(compiled)
+    override = device_override(ports=ports)
+    override["srl_nokia-interfaces:interface"][0]["description"] = "uplink to spine é " * 10
+
+    for _ in range(2):
+        merged = compiled.merge(override)
+        assert emitter.dump(merged) == yaml.dump(merged, sort_keys=False)
+
+
+def test_template_emitter_with_anchors():
+    shared = {"servers": ["10.0.0.1"]}
+    compiled = CompiledTemplate({"dns": shared, "ntp": shared})
+    merged = compiled.merge({"name": "leaf1"})
+
+    assert YamlTemplateEmitter(compiled).dump(merged) == yaml.dump(merged, sort_keys=False)
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_dump_json(monkeypatch: pytest.MonkeyPatch, fast: bool):
+    if not fast:
+        monkeypatch.setattr(emit, "orjson", None)
+    data = {"description": "café", "vlans": [10, 20], "enabled": True, "mtu": None}
+
+    assert json.loads(dump_json(data)) == data
+    assert "\n" not in dump_json(data)
+
+
+def test_dump_msgpack_missing(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(emit, "msgpack", None)
+
+    with pytest.raises(ImportError, match="msgpack"):
+        dump_msgpack({})
+
+
+def test_device_output_formats(device_query_data: dict[str, Any], templates_path: str, fixtures_directory: Path):
+    device = Device.create(data=device_query_data, templates_path=templates_path)
+    expected = yaml.safe_load((fixtures_directory / "leaf1.yaml").read_text())
+
+    assert json.loads(device.json_config()) == expected
+    if emit.msgpack is not None:
+        assert emit.msgpack.unpackb(device.msgpack_config()) == expected
+
+    with pytest.raises(ValueError, match="Unknown output format 'xml'"):
+        device.output(output_format="xml")
@@ -0,0 +1,68 @@
+import copy
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.helpers.fleet import read_snapshots, render_snapshots
+
+
+def _renamed(data: dict[str, Any], name: str) -> dict[str, Any]:
+    data = copy.deepcopy(data)
+    data["InfraDevice"]["edges"][0]["node"]["name"]["value"] = name
+    return data
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_render_snapshots_jsonl(
+    tmp_path: Path, device_query_data: dict[str, Any], templates_path: str, fixtures_directory: Path, workers: int
+):
+    source = tmp_path / "snapshots.jsonl"
+    responses = [{"data": _renamed(device_query_data, f"leaf{index}")} for index in range(1, 21)]
+    source.write_text("".join(json.dumps(response) + "\n" for response in responses))
+
+    summary = render_snapshots(
+        source=str(source), output=str(tmp_path / "rendered"), templates_path=templates_path, workers=workers
+    )
+
+    assert summary.rendered == 20
+    assert not summary.failures
+    assert summary.devices_per_second > 0
+    assert len(list((tmp_path / "rendered").iterdir())) == 20
+    assert (tmp_path / "rendered" / "leaf1.yaml").read_text() == (fixtures_directory / "leaf1.yaml").read_text()
+
+
+def test_render_snapshots_directory(tmp_path: Path, device_query_data: dict[str, Any], templates_path: str):
+    source = tmp_path / "snapshots"
+    source.mkdir()
+    (source / "leaf1.json").write_text(json.dumps(device_query_data))
+    (source / "leaf2.json").write_text(json.dumps(_renamed(device_query_data, "leaf2")))
+    (source / "broken.json").write_text("{}")
+
+    assert len(list(read_snapshots(str(source)))) == 3
+
+    summary = render_snapshots(
+        source=str(source), output=str(tmp_path / "rendered"), templates_path=templates_path, workers=1
+    )
+
+    assert summary.rendered == 2
+    assert [failure.name for failure in summary.failures] == ["<snapshot>"]
+    assert sorted(path.name for path in (tmp_path / "rendered").iterdir()) == ["leaf1.yaml", "leaf2.yaml"]
+
+
+def test_render_snapshots_device_failure(tmp_path: Path, device_query_data: dict[str, Any], templates_path: str):
+    data = copy.deepcopy(device_query_data)
+    data["InfraDevice"]["edges"].append(_renamed(device_query_data, "leaf2")["InfraDevice"]["edges"][0])
+    del data["InfraDevice"]["edges"][1]["node"]["role"]
+    (tmp_path / "snapshots.jsonl").write_text(json.dumps(data) + "\n")
+
+    summary = render_snapshots(
+        source=str(tmp_path / "snapshots.jsonl"),
+        output=str(tmp_path / "rendered"),
+        templates_path=templates_path,
+        workers=1,
+    )
+
+    assert summary.rendered == 1
+    assert [failure.name for failure in summary.failures] == ["leaf2"]
@@ -0,0 +1,70 @@
+from typing import Any
+
+from src.checks.loopback_check import LoopbackCheck, LoopbackFleetCheck
+
+
+def _loopback(device: str, name: str, addresses: list[str]) -> dict[str, Any]:
+    return {
+        "node": {
+            "name": {"value": name},
+            "device": {"node": {"name": {"value": device}}},
+            "ip_addresses": {"edges": [{"node": {"address": {"value": address}}} for address in addresses]},
+        }
+    }
+
+
+class FakeLoopbackClient:
+    """Serves `loopback_query` pages from a list of loopback interfaces."""
+
+    def __init__(self, interfaces: list[dict[str, Any]]) -> None:
+        self.interfaces = interfaces
+        self.requests: list[dict[str, Any]] = []
+
+    async def query_gql_query(self, name: str, variables: dict[str, Any], **kwargs: Any) -> dict[str, Any]:
+        self.requests.append(variables)
+        page = self.interfaces[variables["offset"] : variables["offset"] + variables["limit"]]
+        return {"data": {"InfraInterfaceL3": {"count": len(self.interfaces), "edges": page}}}
+
+
+def test_loopback_check_validates_every_address():
+    check = LoopbackCheck(branch="main")
+    interface = _loopback("leaf1", "system0", ["10.0.0.1/24", "fd00::1/128", "10.0.0.2/31"])
+
+    check.validate(
+        data={"InfraDevice": {"edges": [{"node": {"name": {"value": "leaf1"}, "interfaces": {"edges": [interface]}}}]}}
+    )
+
+    assert [error["message"] for error in check.errors] == [
+        "Loopback IP 10.0.0.1/24 on device leaf1 must be a /32",
+        "Loopback IP 10.0.0.2/31 on device leaf1 must be a /32",
+    ]
+
+
+async def test_loopback_fleet_check_pages():
+    interfaces = [
+        _loopback(f"leaf{index}", "system0", [f"10.0.{index // 250}.{index % 250}/32"]) for index in range(2000)
+    ]
+    client = FakeLoopbackClient(interfaces)
+    check = LoopbackFleetCheck(branch="main", client=client)
+
+    assert await check.run()
+    assert [request["offset"] for request in client.requests] == [0, 1000]
+
+
+async def test_loopback_fleet_check_duplicates():
+    client = FakeLoopbackClient(
+        [
+            _loopback("leaf1", "system0", ["10.0.0.1/32", "fd00::1/128"]),
+            _loopback("leaf2", "system0", ["10.0.0.1/32", "fd00::2/128"]),
+            _loopback("leaf3", "system0", ["fd00::1/64", "not-an-ip"]),
+        ]
+    )
+    check = LoopbackFleetCheck(branch="main", client=client)
+
+    assert not await check.run()
+    assert [error["message"] for error in check.errors] == [
+        "Loopback IP fd00::1/64 on device leaf3 must be a /128",
+        "Loopback IP not-an-ip on device leaf3 is not a valid IP address",
+        "Loopback IP 10.0.0.1 is configured more than once: leaf1 system0, leaf2 system0",
+        "Loopback IP fd00::1 is configured more than once: leaf1 system0, leaf3 system0",
+    ]
@@ -0,0 +1,100 @@
+import copy
+from typing import Any
+
+import pytest
+
+from src.helpers.merge import CompiledTemplate, deep_merge
+from src.helpers.templates import load_compiled_template, load_template
+from tests.unit.merge_reference import device_override, legacy_deep_merge
+
+BASE = {
+    "system": {"name": "leaf", "dns": {"servers": ["1.1.1.1"]}},
+    "interface": [
+        {"name": "ethernet-1/1", "admin-state": "disable", "subinterface": [{"index": 0, "type": "routed"}]},
+        {"name": "ethernet-1/2", "admin-state": "disable"},
+    ],
+    "acl": {"entry": [{"sequence-id": 10, "action": "accept"}, {"sequence-id": 20, "action": "drop"}]},
+}
+
+
+@pytest.mark.parametrize(
+    "override",
+    [
+        {},
+        {"system": {"name": "spine"}},
+        {"system": {"dns": {"servers": ["8.8.8.8"]}}},
+        {"interface": [{"name": "ethernet-1/2", "admin-state": "enable"}, {"name": "ethernet-1/3"}]},
+        {"interface": [{"name": "ethernet-1/1", "subinterface": [{"index": 0, "type": "bridged"}, {"index": 1}]}]},
+        {"interface": []},
+        {"acl": {"entry": [{"sequence-id": 20, "action": "accept"}, {"description": "no key"}]}},
+        {"acl": "replaced", "new": {"key": "value"}},
+    ],
+)
+def test_deep_merge_matches_legacy(override: dict[str, Any]):
+    base = copy.deepcopy(BASE)
+
+    assert deep_merge(base, override) == legacy_deep_merge(BASE, override)
+    assert base == BASE
+
+
+def test_deep_merge_matches_legacy_on_leaf_template(templates_path: str):
+    template = load_template(f"{templates_path}/leaf.yaml", copy_tree=False)
+    override = device_override(ports=48)
+
+    assert deep_merge(template, override) == legacy_deep_merge(template, override)
+
+
+def test_compiled_template_matches_deep_merge_on_leaf_template(templates_path: str):
+    template = load_template(f"{templates_path}/leaf.yaml", copy_tree=False)
+    compiled = load_compiled_template(f"{templates_path}/leaf.yaml")
+
+    for ports in (0, 4, 48):
+        override = device_override(ports=ports)
+        assert compiled.merge(override) == deep_merge(template, override)
+
+
+@pytest.mark.parametrize(
+    "override",
+    [
+        {"interface": [{"name": "ethernet-1/2", "admin-state": "enable"}, {"name": "ethernet-1/3"}]},
+        {"interface": [{"name": "ethernet-1/1", "subinterface": [{"index": 0, "type": "bridged"}, {"index": 1}]}]},
+        {"acl": {"entry": [{"sequence-id": 20, "action": "accept"}, {"sequence-id": 30}, {"sequence-id": 20}]}},
+        {"system": {"dns": {"servers": ["8.8.8.8"]}}},
+    ],
+)
+def test_compiled_template_matches_deep_merge(override: dict[str, Any]):
+    list_keys = {("interface",): "name", ("interface", "subinterface"): "index", ("acl", "entry"): "sequence-id"}
+    compiled = CompiledTemplate(BASE, list_keys=list_keys)
+
+    assert compiled.merge(override) == deep_merge(BASE, override)
+
+
+def test_compiled_template_declared_keys():
+    compiled = CompiledTemplate(
+        {"servers": [{"address": "10.0.0.1", "port": 53}], "net": ["49.0001"]},
+        list_keys={("servers",): "address", ("net",): None},
+    )
+
+    merged = compiled.merge({"servers": [{"address": "10.0.0.1", "port": 5353}], "net": ["49.0002"]})
+
+    assert merged == {"servers": [{"address": "10.0.0.1", "port": 5353}], "net": ["49.0002"]}
+
+
+def test_deep_merge_shares_untouched_subtrees():
+    merged = deep_merge(BASE, {"interface": [{"name": "ethernet-1/2", "admin-state": "enable"}]})
+
+    assert merged["system"] is BASE["system"]
+    assert merged["acl"] is BASE["acl"]
+    assert merged["interface"][0] is BASE["interface"][0]
+    assert merged["interface"][1] is not BASE["interface"][1]
+
+
+def test_deep_merge_independent():
+    override = {"interface": [{"name": "ethernet-1/3", "vlans": [10]}]}
+    merged = deep_merge(BASE, override, independent=True)
+
+    merged["system"]["dns"]["servers"].append("8.8.8.8")
+    merged["interface"][-1]["vlans"].append(20)
+
+    assert BASE["system"]["dns"]["servers"] == ["1.1.1.1"]
+    assert override["interface"][0]["vlans"] == [10]
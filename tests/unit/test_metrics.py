@@ -0,0 +1,66 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from src.helpers.metrics import NULL_STAGE, MemorySink, PrometheusFileSink, metrics
+from src.models.device import Device
+
+
+@pytest.fixture
+def memory_sink() -> Iterator[MemorySink]:
+    sink = MemorySink()
+    metrics.enable(sink)
+    yield sink
+    metrics.disable()
+
+
+def test_metrics_disabled():
+    assert not metrics.enabled
+    assert metrics.stage("merge") is NULL_STAGE
+
+
+def test_metrics_render_stages(memory_sink: MemorySink, device_query_data: dict[str, Any], templates_path: str):
+    for _ in range(4):
+        Device.create(data=device_query_data, templates_path=templates_path).yaml_config()
+
+    summary = memory_sink.summary()
+    assert list(summary) == ["decode", "template", "config", "merge", "dump"]
+    assert all(stage["count"] == 4 for stage in summary.values())
+    assert summary["dump"]["p50_ms"] <= summary["dump"]["max_ms"]
+
+
+def test_metrics_log_sink(caplog: pytest.LogCaptureFixture, device_query_data: dict[str, Any], templates_path: str):
+    metrics.configure("log")
+    try:
+        with caplog.at_level(logging.INFO, logger="src.helpers.metrics"):
+            Device.create(data=device_query_data, templates_path=templates_path)
+    finally:
+        metrics.configure("")
+
+    record = json.loads(caplog.records[0].getMessage())
+    assert record["stage"] == "decode"
+    assert record["device"] == "leaf1"
+    assert record["sizes"] == {"interfaces": 3, "bgp_sessions": 3}
+
+
+def test_metrics_prometheus_sink(tmp_path: Path, device_query_data: dict[str, Any], templates_path: str):
+    path = tmp_path / "render.prom"
+    sink = PrometheusFileSink(path=str(path), interval=3600)
+    metrics.enable(sink)
+    try:
+        Device.create(data=device_query_data, templates_path=templates_path).yaml_config()
+    finally:
+        metrics.disable()
+    sink.flush()
+
+    content = path.read_text()
+    assert 'device_render_stage_seconds_count{stage="merge"} 1' in content
+    assert 'device_render_stage_seconds{stage="dump",quantile="0.95"}' in content
+
+
+def test_metrics_configure_invalid():
+    with pytest.raises(ValueError, match="Unknown metrics sink"):
+        metrics.configure("statsd")
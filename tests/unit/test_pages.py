@@ -0,0 +1,43 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from src.helpers.pages import fetch_pages
+
+
+class FakePages:
+    """Serves pages of `count` nodes, recording the most requests in flight at once."""
+
+    def __init__(self, count: int) -> None:
+        self.nodes = [{"node": {"index": index}} for index in range(count)]
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch_page(self, offset: int, limit: int) -> dict[str, Any]:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001 * (offset % 3))
+        self.in_flight -= 1
+        return {"count": len(self.nodes), "edges": self.nodes[offset : offset + limit]}
+
+
+async def test_fetch_pages():
+    pages = FakePages(count=23)
+
+    fetched = {offset: edges async for offset, edges in fetch_pages(pages.fetch_page, page_size=5, concurrency=2)}
+
+    assert sorted(fetched) == [0, 5, 10, 15, 20]
+    assert [edge for offset in sorted(fetched) for edge in fetched[offset]] == pages.nodes
+    assert pages.max_in_flight == 2
+
+
+async def test_fetch_pages_empty():
+    pages = FakePages(count=0)
+
+    assert [page async for page in fetch_pages(pages.fetch_page, page_size=5, concurrency=2)] == []
+
+
+async def test_fetch_pages_invalid():
+    with pytest.raises(ValueError):
+        [page async for page in fetch_pages(FakePages(count=1).fetch_page, page_size=0, concurrency=2)]
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.models.config import PlatformRegistry, platforms
+from src.models.platforms.nokia_srl import NokiaDeviceConfig
+
+
+def test_platform_registry_builder():
+    registry = PlatformRegistry({"Nokia SR Linux": ".platforms.nokia_srl:NokiaDeviceConfig"})
+
+    assert registry.builder("Nokia SR Linux") is NokiaDeviceConfig
+    assert registry.builder("Arista EOS") is None
+    assert registry.source_paths() == [str(Path(sys.modules[NokiaDeviceConfig.__module__].__file__))]
+
+
+def test_platform_registry_warm():
+    registry = PlatformRegistry({"Nokia SR Linux": ".platforms.nokia_srl:NokiaDeviceConfig"})
+
+    registry.warm()
+
+    with pytest.raises(ValueError, match="Unknown platform 'Arista EOS'"):
+        registry.warm("Arista EOS")
+
+
+def test_platform_builders_imported_lazily(root_directory: Path):
+    """Loading the transform imports no platform builder until a device of that platform is built."""
+    script = (
+        "import sys\n"
+        "from src.transforms.device_transform import DeviceTransformYaml\n"
+        "assert not [name for name in sys.modules if name.startswith('src.models.platforms.')]\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=root_directory, check=True)
+
+    assert "Nokia SR Linux" in platforms.platforms
@@ -0,0 +1,80 @@
+import re
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from src.helpers.queries import selection_paths
+from src.models import queries
+from src.models.data import DeviceData
+from src.models.queries import DEVICE_QUERIES
+from tests.benchmarks.synthetic import synthetic_device_node
+
+
+class RecordingDict(dict):
+    """Dict recording the path of every key read from it or from the dicts nested in it."""
+
+    def __init__(self, data: dict[str, Any], reads: set[str], path: str = "") -> None:
+        super().__init__(data)
+        self.reads = reads
+        self.path = path
+
+    def _wrap(self, key: str, value: Any) -> Any:
+        path = f"{self.path}.{key}" if self.path else key
+        self.reads.add(path)
+        if isinstance(value, dict):
+            return RecordingDict(value, self.reads, path)
+        if isinstance(value, list):
+            return [RecordingDict(item, self.reads, path) if isinstance(item, dict) else item for item in value]
+        return value
+
+    def __getitem__(self, key: str) -> Any:
+        return self._wrap(key, super().__getitem__(key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._wrap(key, super().__getitem__(key)) if key in self else default
+
+
+def test_checked_in_queries_match_models():
+    assert [problem for query in DEVICE_QUERIES for problem in query.check()] == []
+
+
+def _selected_leaves() -> set[str]:
+    """The leaf fields of the device selection, without inline fragments nor the ids selected for the dependency index."""
+    paths = {re.sub(r"\.\.\. on \w+\.", "", path) for path in selection_paths(DeviceData.selection)}
+    return {path for path in paths if path.rsplit(".", 1)[-1] != "id"}
+
+
+def _read_leaves(infra_device: dict[str, Any], validate: bool) -> set[str]:
+    reads: set[str] = set()
+    DeviceData.create(infra_device=RecordingDict(infra_device, reads), validate=validate)
+    return {path for path in reads if not any(other.startswith(f"{path}.") for other in reads)}
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_device_selection_covers_reads(device_query_data: dict[str, Any], validate: bool):
+    infra_device = device_query_data["InfraDevice"]["edges"][0]["node"]
+
+    assert _read_leaves(infra_device, validate) <= _selected_leaves()
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_device_selection_is_read(validate: bool):
+    # A device with every relationship and interface type of the selection, so that every field is present to be read.
+    infra_device = synthetic_device_node(role="leaf", interfaces=6, bgp_sessions=2)
+    infra_device["site"] = {"node": {"id": "site-1", "name": {"value": "paris"}}}
+
+    assert _read_leaves(infra_device, validate) == _selected_leaves()
+
+
+def test_query_check_reports_over_fetch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(queries, "QUERIES_PATH", tmp_path)
+    query = DEVICE_QUERIES[0]
+    query.path.write_text(
+        query.generate().replace("        type {", "        status {\n          value\n        }\n        type {", 1)
+    )
+
+    assert query.check() == ["device_query.gql: over-fetches edges.node.status.value"]
+
+    query.path.write_text(query.generate())
+    assert query.check() == []
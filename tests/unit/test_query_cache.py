@@ -0,0 +1,146 @@
+import asyncio
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from infrahub_sdk.node import InfrahubNode
+
+from src.helpers.query_cache import QueryCache, query_cache, repository_commit
+from src.transforms.device_transform import DeviceTransformYaml
+
+
+class FakeQueryClient:
+    def __init__(self, response: dict[str, Any] | None = None) -> None:
+        self.response = response or {"data": {}}
+        self.requests: list[tuple[str, str | None, dict[str, Any]]] = []
+        self.kwargs: list[dict[str, Any]] = []
+
+    def clone(self, branch: str | None = None) -> "FakeQueryClient":
+        return self
+
+    async def query_gql_query(self, name: str, branch_name: str | None, variables: dict[str, Any], **kwargs: Any):
+        self.requests.append((name, branch_name, variables))
+        self.kwargs.append(kwargs)
+        await asyncio.sleep(0.001)
+        return self.response
+
+
+class OfflineClient(FakeQueryClient):
+    async def query_gql_query(self, *args: Any, **kwargs: Any):
+        raise AssertionError("The replay mode must not query the server")
+
+
+@pytest.fixture
+def replay_directory(tmp_path: Path) -> Iterator[Path]:
+    yield tmp_path
+    query_cache.configure()
+
+
+async def test_query_cache_hits():
+    client = FakeQueryClient()
+    cache = QueryCache(ttl=60)
+
+    for _ in range(3):
+        await cache.query(client=client, name="device_query", branch_name="main", variables={"device": "leaf1"})
+    await cache.query(client=client, name="device_query", branch_name="main", variables={"device": "leaf2"})
+    await cache.query(client=client, name="device_query", branch_name="feature", variables={"device": "leaf1"})
+
+    assert len(client.requests) == 3
+    assert cache.stats.hits == 2
+
+
+async def test_query_cache_keyed_by_revision_and_time():
+    client = FakeQueryClient()
+    cache = QueryCache(ttl=60)
+
+    for revision, at in [("abc", None), ("abc", None), ("def", None), ("abc", "2024-01-01T00:00:00Z")]:
+        await cache.query(client=client, name="device_query", branch_name="main", revision=revision, at=at)
+
+    assert len(client.requests) == 3
+    assert [kwargs["at"] for kwargs in client.kwargs] == [None, None, "2024-01-01T00:00:00Z"]
+
+
+async def test_query_cache_serves_branch_changes():
+    client = FakeQueryClient(response={"data": {"description": "before"}})
+    cache = QueryCache()
+
+    assert await cache.query(client=client, name="device_query", branch_name="main", revision="abc") == {
+        "data": {"description": "before"}
+    }
+    client.response = {"data": {"description": "after"}}
+
+    # Nothing in the key changes with the data of the branch: the latest data is never reused by default.
+    assert await cache.query(client=client, name="device_query", branch_name="main", revision="abc") == {
+        "data": {"description": "after"}
+    }
+    # Data read at a given time does not change, so it is reused.
+    for _ in range(2):
+        await cache.query(client=client, name="device_query", branch_name="main", at="2024-01-01T00:00:00Z")
+    assert len(client.requests) == 3
+
+
+async def test_query_cache_unshared_fetch_is_reused():
+    client = FakeQueryClient()
+    cache = QueryCache(ttl=60)
+
+    for _ in range(2):
+        await cache.query(client=client, name="sites_query", shared=False, update_group=True)
+    await cache.query(client=client, name="sites_query")
+
+    assert len(client.requests) == 2
+    assert client.kwargs[0]["update_group"] is True
+    assert cache.stats.hits == 1
+
+
+def test_repository_commit(root_directory: Path, tmp_path: Path):
+    assert repository_commit(str(root_directory)) is not None
+    assert repository_commit(str(tmp_path)) is None
+    assert repository_commit("") is None
+
+
+async def test_query_cache_expiry_and_eviction():
+    client = FakeQueryClient()
+    cache = QueryCache(maxsize=2, ttl=0.05)
+
+    for device in ["leaf1", "leaf2", "leaf3", "leaf1"]:
+        await cache.query(client=client, name="device_query", variables={"device": device})
+    assert cache.stats.evictions == 2
+
+    await asyncio.sleep(0.06)
+    await cache.query(client=client, name="device_query", variables={"device": "leaf1"})
+    assert len(client.requests) == 5
+
+
+async def test_query_cache_shares_concurrent_requests():
+    client = FakeQueryClient()
+    cache = QueryCache(ttl=0)
+
+    responses = await asyncio.gather(*[cache.query(client=client, name="device_query") for _ in range(5)])
+
+    assert len(client.requests) == 1
+    assert all(response is client.response for response in responses)
+    await cache.query(client=client, name="device_query")
+    assert len(client.requests) == 2
+
+
+async def test_query_cache_record_replay(
+    device_query_data: dict[str, Any], root_directory: Path, fixtures_directory: Path, replay_directory: Path
+):
+    query_cache.configure(mode="record", path=str(replay_directory))
+    client = FakeQueryClient(response={"data": device_query_data})
+    transform = DeviceTransformYaml(
+        client=client, infrahub_node=InfrahubNode, branch="main", root_directory=str(root_directory)
+    )
+    recorded = await transform.run()
+
+    query_cache.configure(mode="replay", path=str(replay_directory))
+    transform = DeviceTransformYaml(
+        client=OfflineClient(), infrahub_node=InfrahubNode, branch="main", root_directory=str(root_directory)
+    )
+
+    assert await transform.run() == recorded == (fixtures_directory / "leaf1.yaml").read_text()
+    # Recordings are replayed whatever the revision of the code replaying them.
+    assert await query_cache.query(client=OfflineClient(), name="device_query", branch_name="main", revision="other")
+    with pytest.raises(LookupError, match="No recorded response for query device_query"):
+        await query_cache.query(client=OfflineClient(), name="device_query", branch_name="feature")
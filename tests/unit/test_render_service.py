@@ -0,0 +1,54 @@
+import threading
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+from src.helpers.render_service import RenderService, create_server, request
+
+
+@pytest.fixture(scope="module")
+def service(tmp_path_factory: pytest.TempPathFactory) -> RenderService:
+    return RenderService(render_store_path=str(tmp_path_factory.mktemp("store") / "renders.sqlite3"))
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def address(request: pytest.FixtureRequest, service: RenderService, tmp_path: Path) -> Iterator[str]:
+    server = create_server("127.0.0.1:0" if request.param == "tcp" else f"unix:{tmp_path / 'render.sock'}", service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"unix:{server.server_address}" if request.param == "unix" else f"127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_render_service(address: str, device_query_data: dict[str, Any], fixtures_directory: Path):
+    expected = (fixtures_directory / "leaf1.yaml").read_text()
+
+    assert request(address, "GET", "/health") == (200, {"status": "ok"})
+    status, result = request(address, "POST", "/render", {"data": device_query_data})
+    assert status == 200
+    assert result == {"configs": {"leaf1": expected}, "errors": {}}
+
+    status, stats = request(address, "GET", "/stats")
+    assert status == 200
+    assert stats["latency"]["device"]["count"] >= 1
+    assert stats["latency"]["device"]["p99_ms"] >= stats["latency"]["device"]["p50_ms"] > 0
+
+
+def test_render_service_batch(service: RenderService, device_query_data: dict[str, Any]):
+    broken = {"InfraDevice": {"edges": [{"node": {"name": {"value": "broken"}}}]}}
+
+    result = service.render([device_query_data, broken], output_format="json")
+
+    assert list(result["configs"]) == ["leaf1"]
+    assert result["configs"]["leaf1"].startswith("{")
+    assert list(result["errors"]) == ["broken"]
+
+
+def test_render_service_invalid_request(address: str):
+    assert request(address, "POST", "/render", {"InfraDevice": {}})[0] == 400
+    assert request(address, "POST", "/render?format=xml", {"InfraDevice": {"edges": []}})[0] == 400
+    assert request(address, "GET", "/unknown")[0] == 404
@@ -0,0 +1,109 @@
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from infrahub_sdk import InfrahubClient
+
+from src.scripts.lib import schema_cache
+from src.scripts.lib.schema_cache import SchemaCache
+
+
+class FakeSchemaServer:
+    """Serves `/api/schema` and `/api/schema/summary` for a schema of nodes by namespace."""
+
+    def __init__(self, schema_hash: str, kinds: dict[str, list[str]]) -> None:
+        self.schema_hash = schema_hash
+        self.kinds = kinds
+        self.requests: list[tuple[str, list[str]]] = []
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        parsed = urlparse(url)
+        namespaces = parse_qs(parsed.query).get("namespaces", [])
+        self.requests.append((parsed.path, namespaces))
+        if parsed.path.endswith("/summary"):
+            content: dict[str, Any] = {"main": self.schema_hash, "nodes": {}, "generics": {}}
+        else:
+            content = {
+                "main": self.schema_hash,
+                "nodes": [
+                    {"name": kind[len(namespace) :], "namespace": namespace, "kind": kind}
+                    for namespace, kinds in self.kinds.items()
+                    if not namespaces or namespace in namespaces
+                    for kind in kinds
+                ],
+                "generics": [],
+            }
+        return httpx.Response(200, json=content, request=httpx.Request("GET", url))
+
+    @property
+    def schema_fetches(self) -> list[list[str]]:
+        return [namespaces for path, namespaces in self.requests if path == "/api/schema"]
+
+
+@pytest.fixture
+def server() -> FakeSchemaServer:
+    return FakeSchemaServer("hash1", {"Infra": ["InfraDevice", "InfraInterface"], "Core": ["CoreAccount"]})
+
+
+def make_client(server: FakeSchemaServer) -> InfrahubClient:
+    client = InfrahubClient()
+    client._get = server.get
+    return client
+
+
+async def test_schema_cache_revalidates_by_hash(server: FakeSchemaServer, tmp_path: Path):
+    cache = SchemaCache(str(tmp_path))
+
+    nodes = await cache.load(make_client(server))
+    assert sorted(nodes) == ["CoreAccount", "InfraDevice", "InfraInterface"]
+
+    # A new process with the same schema hash reads the schema from disk.
+    client = make_client(server)
+    assert sorted(await SchemaCache(str(tmp_path)).load(client)) == sorted(nodes)
+    assert server.schema_fetches == [[]]
+    assert "InfraDevice" in client.schema.cache["main"].nodes
+
+    server.schema_hash = "hash2"
+    server.kinds["Infra"].append("InfraBGPSession")
+    assert "InfraBGPSession" in await cache.load(make_client(server))
+    assert server.schema_fetches == [[], []]
+    assert [path.name for path in (tmp_path / "main").iterdir()] == ["hash2"]
+
+
+async def test_schema_cache_namespaces(server: FakeSchemaServer, tmp_path: Path):
+    cache = SchemaCache(str(tmp_path))
+    client = make_client(server)
+
+    assert sorted(await cache.load(client, namespaces=["Infra"])) == ["InfraDevice", "InfraInterface"]
+    assert sorted(await cache.load(client, namespaces=["Infra", "Core"])) == [
+        "CoreAccount",
+        "InfraDevice",
+        "InfraInterface",
+    ]
+    assert await cache.load(client, namespaces=["Infra", "Missing"], branch="change") != {}
+    await cache.load(client, namespaces=["Missing"], branch="change")
+
+    assert server.schema_fetches == [["Infra"], ["Core"], ["Infra", "Missing"]]
+    assert sorted(client.schema.cache["main"].nodes) == ["CoreAccount", "InfraDevice", "InfraInterface"]
+    assert (cache.stats.hits, cache.stats.fetches) == (1, 3)
+
+
+async def test_schema_cache_without_schema_hash(
+    server: FakeSchemaServer, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    async def no_schema_hash(client: InfrahubClient, branch: str) -> None:
+        return None
+
+    monkeypatch.setattr(schema_cache, "fetch_schema_hash", no_schema_hash)
+    cache = SchemaCache(str(tmp_path))
+    client = make_client(server)
+
+    assert sorted(await cache.load(client, namespaces=["Infra"])) == ["InfraDevice", "InfraInterface"]
+    assert sorted(await cache.load(client)) == ["CoreAccount", "InfraDevice", "InfraInterface"]
+
+    # Without the hash to revalidate it, the schema on disk is never read.
+    assert server.schema_fetches == [["Infra"], []]
+    assert client.schema.cache["main"].hash == "hash1"
@@ -0,0 +1,133 @@
+import copy
+import os
+from pathlib import Path
+
+import pytest
+
+from src.helpers.emit import dump_yaml
+from src.helpers.merge import CompiledTemplate
+from src.helpers.templates import TemplateCache
+
+
+@pytest.fixture
+def template_file(tmp_path: Path) -> Path:
+    path = tmp_path / "leaf.yaml"
+    path.write_text("system:\n  name: leaf\n  servers:\n    - 10.0.0.1\n")
+    return path
+
+
+def test_template_cache_hit_and_miss(template_file: Path):
+    cache = TemplateCache()
+
+    first = cache.load(str(template_file))
+    second = cache.load(str(template_file))
+
+    assert first == second == {"system": {"name": "leaf", "servers": ["10.0.0.1"]}}
+    assert cache.stats.misses == 1
+    assert cache.stats.hits == 1
+
+
+def test_template_cache_copy_on_read(template_file: Path):
+    cache = TemplateCache()
+
+    cache.load(str(template_file))["system"]["servers"].append("10.0.0.2")
+
+    assert cache.load(str(template_file))["system"]["servers"] == ["10.0.0.1"]
+    assert cache.load(str(template_file), copy_tree=False) is cache.load(str(template_file), copy_tree=False)
+
+
+def test_template_cache_invalidation(template_file: Path):
+    cache = TemplateCache()
+    cache.load(str(template_file))
+    stat = template_file.stat()
+
+    # Touched without a content change: revalidated by hash, not re-parsed.
+    os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    cache.load(str(template_file))
+    assert cache.stats.misses == 1
+    assert cache.stats.revalidations == 1
+
+    template_file.write_text("system:\n  name: spine\n")
+    os.utime(template_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000))
+    assert cache.load(str(template_file)) == {"system": {"name": "spine"}}
+    assert cache.stats.misses == 2
+
+
+def test_template_cache_bounded(tmp_path: Path):
+    cache = TemplateCache(maxsize=2)
+    for role in ("leaf", "spine", "border"):
+        (tmp_path / f"{role}.yaml").write_text(f"role: {role}\n")
+        cache.load(str(tmp_path / f"{role}.yaml"))
+
+    assert len(cache) == 2
+    assert cache.stats.evictions == 1
+
+
+def test_template_cache_missing_file(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        TemplateCache().load(str(tmp_path / "missing.yaml"))
+
+
+def test_template_cache_stack(tmp_path: Path):
+    (tmp_path / "global.yaml").write_text("system:\n  name: default\n  ntp: 10.0.0.1\nbanner: global\n")
+    (tmp_path / "leaf.yaml").write_text("system:\n  name: leaf\n")
+    (tmp_path / "leaf1.yaml").write_text("banner: leaf1\n")
+    cache = TemplateCache()
+    paths = [str(tmp_path / name) for name in ("global.yaml", "leaf.yaml", "missing.yaml", "leaf1.yaml")]
+
+    stack = cache.stack(paths)
+
+    assert stack.tree == {"system": {"name": "leaf", "ntp": "10.0.0.1"}, "banner": "leaf1"}
+    assert cache.stack(paths) is stack
+    # The prefix shared with other devices is merged once and reused.
+    assert cache.stack(paths[:2]) is cache.stack(paths[:3])
+    assert cache.stack(paths[:1]) is cache.entry(paths[0])
+
+
+def test_template_cache_stack_required(tmp_path: Path):
+    (tmp_path / "global.yaml").write_text("banner: global\n")
+    paths = [str(tmp_path / "global.yaml"), str(tmp_path / "leaf.yaml")]
+
+    with pytest.raises(FileNotFoundError):
+        TemplateCache().stack(paths, required=(paths[1],))
+
+
+def test_template_cache_stack_compiled_from_base(tmp_path: Path):
+    interfaces = "srl_nokia-interfaces:interface"
+    (tmp_path / "leaf.yaml").write_text(
+        f"system:\n  name: leaf\n{interfaces}:\n  - name: e1\n  - name: e2\n    mtu: 1500\n"
+    )
+    (tmp_path / "leaf1.yaml").write_text("system:\n  name: leaf1\n")
+    cache = TemplateCache()
+    base = cache.entry(str(tmp_path / "leaf.yaml"))
+    stack = cache.stack([str(tmp_path / "leaf.yaml"), str(tmp_path / "leaf1.yaml")])
+    override = {interfaces: [{"name": "e2", "mtu": 9000}]}
+
+    merged = stack.compiled().merge(override)
+
+    assert merged == CompiledTemplate(copy.deepcopy(stack.tree)).merge(override)
+    # The sections the device layer does not change keep the indexes and YAML of the base stack.
+    assert stack.compiled()._indexes[id(stack.tree[interfaces])] is base.compiled()._indexes[id(base.tree[interfaces])]
+    assert stack.emitter().fragment(interfaces) is base.emitter().fragment(interfaces)
+    assert stack.emitter().dump(merged) == dump_yaml(merged)
+
+
+def test_template_cache_stack_invalidation(tmp_path: Path):
+    (tmp_path / "global.yaml").write_text("banner: global\n")
+    layer = tmp_path / "leaf.yaml"
+    layer.write_text("system: {}\n")
+    cache = TemplateCache()
+    paths = [str(tmp_path / "global.yaml"), str(layer)]
+    digest = cache.stack(paths).digest
+
+    stat = layer.stat()
+    layer.write_text("system: {name: leaf}\n")
+    os.utime(layer, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert cache.stack(paths).digest != digest
+    assert cache.stack(paths).tree == {"banner": "global", "system": {"name": "leaf"}}
+
+
+def test_template_cache_stack_missing(tmp_path: Path):
+    with pytest.raises(FileNotFoundError):
+        TemplateCache().stack([str(tmp_path / "global.yaml"), str(tmp_path / "leaf.yaml")])